@@ -0,0 +1,246 @@
+"""Change feed benchmark: fanning list changes out to 1k subscribers vs. polling.
+
+"broker" publishes events straight to in-process subscriptions, measuring the publish
+(fan-out) cost and the delivery latency, plus how many events the bounded queues of
+subscribers that never read drop. "push" serves server.main:app under uvicorn against a
+throwaway SQLite file, connects the subscribers to GET /shopping-lists/{id}/events (and
+a share of them to the WebSocket variant), toggles items at a fixed rate and measures
+how long each change takes to reach every subscriber. "poll" runs the same writes with
+as many clients polling GET /shopping-lists/{id} with If-None-Match instead. Server and
+clients share the process, so the CPU time covers both sides:
+
+    uv run python -m benchmarks.change_feed --subscribers 1000 --writes 50
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from .common import use_temp_database
+
+if __name__ == "__main__":
+    use_temp_database()
+
+import httpx
+import websockets
+
+from .common import create_schema, latency_summary
+from .load import free_port, seed
+
+class WriteClock:
+    """Start time of each write by the list version it produces; a single writer bumps the version by one per write."""
+
+    def __init__(self):
+        self.base_version = None
+        self.started = {}
+        self.latencies = []
+
+    def seen(self, version: int) -> None:
+        if version in self.started:
+            self.latencies.append(time.perf_counter() - self.started[version])
+
+async def write(client: httpx.AsyncClient, clock: WriteClock, config: argparse.Namespace) -> list:
+    latencies = []
+    for i in range(config.writes):
+        clock.started[clock.base_version + i + 1] = start = time.perf_counter()
+        response = await client.patch(f"/shopping-items/{i + 1}/toggle")
+        response.raise_for_status()
+        latencies.append(time.perf_counter() - start)
+        await asyncio.sleep(config.write_interval)
+    # Let the last change reach everyone
+    await asyncio.sleep(max(1.0, config.poll_interval * 2))
+    return latencies
+
+async def run_broker(config: argparse.Namespace) -> dict:
+    from server.events import EventBroker, SubscriptionClosed, list_event
+
+    broker = EventBroker(max_queue=config.queue_size, policy=config.policy)
+    received = [0]
+    latencies = []
+
+    async def consume(subscription):
+        try:
+            while True:
+                event = await subscription.get()
+                if event.type != "resync":
+                    latencies.append(time.perf_counter() - json.loads(event.data)["sent"])
+                    received[0] += 1
+        except SubscriptionClosed:
+            pass
+
+    subscriptions = [broker.subscribe(1) for _ in range(config.subscribers)]
+    slow = [broker.subscribe(1) for _ in range(config.slow_subscribers)]
+    consumers = [asyncio.create_task(consume(subscription)) for subscription in subscriptions]
+    await asyncio.sleep(0)
+
+    publish_seconds = 0.0
+    for version in range(config.broker_events):
+        event = list_event("item_toggled", 1, version, item={"id": 1, "is_completed": version % 2 == 0}, sent=time.perf_counter())
+        start = time.perf_counter()
+        broker.publish(1, event)
+        publish_seconds += time.perf_counter() - start
+        if version % 10 == 9:
+            await asyncio.sleep(0)
+    while received[0] < config.broker_events * config.subscribers:
+        await asyncio.sleep(0.01)
+    broker.close_list(1)
+    await asyncio.gather(*consumers)
+    return {
+        "events": config.broker_events,
+        "publish_us_per_event": round(publish_seconds / config.broker_events * 1e6, 1),
+        "publish_us_per_delivery": round(publish_seconds / config.broker_events / config.subscribers * 1e6, 3),
+        "delivery_ms": latency_summary(latencies),
+        "slow_subscribers_dropped": sum(subscription.dropped for subscription in slow),
+        "stats": broker.stats(),
+    }
+
+async def subscribe_sse(client: httpx.AsyncClient, list_id: int, clock: WriteClock, ready: asyncio.Event, counts: list):
+    async with client.stream("GET", f"/shopping-lists/{list_id}/events") as response:
+        async for line in response.aiter_lines():
+            if not line.startswith("data: "):
+                continue
+            event = json.loads(line[6:])
+            if event["type"] == "subscribed":
+                clock.base_version = event["version"]
+                counts[0] += 1
+                if counts[0] == counts[1]:
+                    ready.set()
+            elif event["type"] == "item_toggled":
+                clock.seen(event["version"])
+
+async def subscribe_websocket(url: str, clock: WriteClock, ready: asyncio.Event, counts: list):
+    async with websockets.connect(url, max_queue=None) as websocket:
+        async for message in websocket:
+            event = json.loads(message)
+            if event["type"] == "subscribed":
+                clock.base_version = event["version"]
+                counts[0] += 1
+                if counts[0] == counts[1]:
+                    ready.set()
+            elif event["type"] == "item_toggled":
+                clock.seen(event["version"])
+
+async def run_push(base_url: str, config: argparse.Namespace) -> dict:
+    from server.events import event_broker
+
+    clock = WriteClock()
+    ready = asyncio.Event()
+    counts = [0, config.subscribers]
+    websocket_subscribers = int(config.subscribers * config.websocket_share)
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=None) as client:
+        subscribers = [
+            asyncio.create_task(subscribe_sse(client, 1, clock, ready, counts)) for _ in range(config.subscribers - websocket_subscribers)
+        ] + [
+            asyncio.create_task(subscribe_websocket(base_url.replace("http", "ws") + "/shopping-lists/1/ws", clock, ready, counts))
+            for _ in range(websocket_subscribers)
+        ]
+        connect_start = time.perf_counter()
+        await asyncio.wait_for(ready.wait(), 120)
+        connect_s = time.perf_counter() - connect_start
+
+        cpu_start = time.process_time()
+        write_latencies = await write(client, clock, config)
+        cpu = time.process_time() - cpu_start
+        for subscriber in subscribers:
+            subscriber.cancel()
+        await asyncio.gather(*subscribers, return_exceptions=True)
+    return {
+        "sse_subscribers": config.subscribers - websocket_subscribers,
+        "websocket_subscribers": websocket_subscribers,
+        "connect_s": round(connect_s, 2),
+        "write_ms": latency_summary(write_latencies),
+        "changes_delivered": len(clock.latencies),
+        "changes_expected": config.writes * config.subscribers,
+        "change_to_client_ms": latency_summary(clock.latencies),
+        "cpu_s": round(cpu, 2),
+        "stats": event_broker.stats(),
+    }
+
+async def run_poll(base_url: str, config: argparse.Namespace) -> dict:
+    clock = WriteClock()
+    requests, errors = [0], [0]
+    done = asyncio.Event()
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=None) as client:
+        etag = (await client.get("/shopping-lists/1")).headers["ETag"]
+        clock.base_version = int(etag.strip('"').split("-")[0])
+
+        async def poll(offset: float):
+            current = etag
+            await asyncio.sleep(offset)
+            while not done.is_set():
+                try:
+                    response = await client.get("/shopping-lists/1", headers={"If-None-Match": current})
+                except httpx.HTTPError:
+                    errors[0] += 1
+                else:
+                    requests[0] += 1
+                    if response.status_code == 200:
+                        current = response.headers["ETag"]
+                        clock.seen(int(current.strip('"').split("-")[0]))
+                await asyncio.sleep(config.poll_interval)
+
+        pollers = [asyncio.create_task(poll(config.poll_interval * i / config.subscribers)) for i in range(config.subscribers)]
+        cpu_start, start = time.process_time(), time.perf_counter()
+        write_latencies = await write(client, clock, config)
+        cpu, elapsed = time.process_time() - cpu_start, time.perf_counter() - start
+        done.set()
+        await asyncio.gather(*pollers)
+    return {
+        "pollers": config.subscribers,
+        "poll_interval_s": config.poll_interval,
+        "write_ms": latency_summary(write_latencies),
+        "get_requests_per_s": round(requests[0] / elapsed, 1),
+        "get_errors": errors[0],
+        # Only the newest version is seen when several writes land between two polls
+        "changes_seen": len(clock.latencies),
+        "change_to_client_ms": latency_summary(clock.latencies),
+        "cpu_s": round(cpu, 2),
+    }
+
+async def run(config: argparse.Namespace) -> dict:
+    import uvicorn
+
+    from server.main import app
+
+    results = {"broker": await run_broker(config)}
+
+    await create_schema()
+    await seed(1, max(config.writes, 10))
+    port = free_port()
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning", backlog=4096))
+    server_task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.05)
+    base_url = f"http://127.0.0.1:{port}"
+
+    results["push"] = await run_push(base_url, config)
+    if config.poll_interval > 0:
+        results["poll"] = await run_poll(base_url, config)
+
+    server.should_exit = True
+    await server_task
+    return {
+        "config": {key: getattr(config, key) for key in ("subscribers", "writes", "write_interval", "poll_interval", "websocket_share", "queue_size", "policy")},
+        **results,
+    }
+
+def main():
+    from server.events import DROP_POLICIES, EVENT_DROP_POLICY, EVENT_QUEUE_SIZE
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--subscribers", type=int, default=1000, help="clients following the list")
+    parser.add_argument("--websocket-share", type=float, default=0.2, help="share of the subscribers using the WebSocket instead of SSE")
+    parser.add_argument("--writes", type=int, default=50, help="items toggled, one after the other")
+    parser.add_argument("--write-interval", type=float, default=0.2, help="seconds between writes")
+    parser.add_argument("--poll-interval", type=float, default=2.0, help="seconds between polls of each polling client, 0 skips polling")
+    parser.add_argument("--broker-events", type=int, default=1000, help="events published in the in-process broker run")
+    parser.add_argument("--slow-subscribers", type=int, default=10, help="broker subscribers that never read their queue")
+    parser.add_argument("--queue-size", type=int, default=EVENT_QUEUE_SIZE, help="events queued per subscriber")
+    parser.add_argument("--policy", choices=DROP_POLICIES, default=EVENT_DROP_POLICY, help="what a full subscriber queue does with new events")
+    config = parser.parse_args()
+    print(json.dumps(asyncio.run(run(config)), indent=2))
+
+if __name__ == "__main__":
+    main()
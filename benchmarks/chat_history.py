@@ -0,0 +1,80 @@
+"""Chat history benchmark: per-turn model input size over long conversations.
+
+Drives the chatbot's agent with a stubbed chat model for a few hundred turns and
+records how many tokens (approximate) each turn sends to the model and to the agent.
+Compares the old behaviour of resending the whole history every turn with the
+SQLite checkpointer under each CHAT_HISTORY_POLICY:
+
+    uv run python -m benchmarks.chat_history --turns 200
+"""
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+from typing import Optional
+
+from langchain_core.messages.utils import count_tokens_approximately, convert_to_messages
+from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+
+from chatbot import create_agent
+
+from .common import latency_summary
+from .fake_llm import StubChatModel
+
+def user_message(turn: int) -> str:
+    return f"Please add {turn % 7 + 1} packs of item number {turn} to my weekend shopping list, and tell me what's left to buy."
+
+def summarize(run: dict, turns: int) -> dict:
+    checkpoints = sorted({1, turns // 4, turns // 2, turns} - {0})
+    return {
+        "model_input_tokens": {f"turn_{turn}": run["model"][turn - 1] for turn in checkpoints},
+        "request_tokens": {f"turn_{turn}": run["request"][turn - 1] for turn in checkpoints},
+        "latency_ms_first_20": latency_summary(run["latency"][:20]),
+        "latency_ms_last_20": latency_summary(run["latency"][-20:]),
+        "summaries": run["summaries"],
+    }
+
+async def run_conversation(policy: Optional[str], turns: int, max_tokens: int) -> dict:
+    """policy None is the old behaviour: no checkpointer, the full history is sent every turn."""
+    llm, summary_llm = StubChatModel(input_tokens=[]), StubChatModel(input_tokens=[], reply="The user is building a weekend shopping list.")
+    run = {"model": [], "request": [], "latency": [], "summaries": 0}
+
+    async def converse(agent, config, resend_history: bool):
+        history = []
+        for turn in range(1, turns + 1):
+            messages = history + [{"role": "user", "content": user_message(turn)}] if resend_history else [{"role": "user", "content": user_message(turn)}]
+            start = time.perf_counter()
+            result = await agent.ainvoke({"messages": messages}, config)
+            run["latency"].append(time.perf_counter() - start)
+            run["model"].append(llm.input_tokens[-1])
+            run["request"].append(count_tokens_approximately(convert_to_messages(messages)))
+            if resend_history:
+                history = messages + [{"role": "assistant", "content": result["messages"][-1].content}]
+        run["summaries"] = len(summary_llm.input_tokens)
+
+    if policy is None:
+        await converse(create_agent(llm, [], checkpointer=None, policy="none"), {}, resend_history=True)
+    else:
+        with tempfile.TemporaryDirectory() as tmp:
+            async with AsyncSqliteSaver.from_conn_string(os.path.join(tmp, "checkpoints.db")) as checkpointer:
+                agent = create_agent(llm, [], checkpointer, summary_llm=summary_llm, policy=policy, max_tokens=max_tokens)
+                await converse(agent, {"configurable": {"thread_id": "benchmark"}}, resend_history=False)
+    return summarize(run, turns)
+
+async def run(config: argparse.Namespace) -> dict:
+    results = {}
+    for name, policy in (("resend_history", None), ("checkpoint_none", "none"), ("checkpoint_trim", "trim"), ("checkpoint_summarize", "summarize")):
+        results[name] = await run_conversation(policy, config.turns, config.max_tokens)
+    return {"config": {"turns": config.turns, "max_tokens": config.max_tokens}, "runs": results}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--turns", type=int, default=200, help="turns per conversation")
+    parser.add_argument("--max-tokens", type=int, default=2000, help="CHAT_HISTORY_MAX_TOKENS for the trim and summarize policies")
+    config = parser.parse_args()
+    print(json.dumps(asyncio.run(run(config)), indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Chat streaming benchmark: time to first feedback and first token of a chatbot turn.
+
+Runs turns that call one tool and then answer against a scripted, network-free chat
+model, and compares how long the user waits for something to show up when the reply
+is returned in one piece (agent.ainvoke) versus streamed (stream_agent_reply):
+
+    uv run python -m benchmarks.chat_streaming --turns 20
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from langchain_core.messages import AIMessage
+from langchain_core.tools import tool
+from langgraph.checkpoint.memory import InMemorySaver
+
+from chatbot import create_agent, stream_agent_reply
+
+from .common import latency_summary
+from .fake_llm import ScriptedChatModel
+
+ANSWER = "I've added a watermelon to your shopping list. You now have 3 items on it: watermelon, spaghetti and tomato sauce. Anything else?"
+
+def make_agent(config: argparse.Namespace):
+    llm = ScriptedChatModel(
+        script=[
+            AIMessage(content="", tool_calls=[{"name": "create_shopping_item", "args": {"name": "watermelon", "shopping_list_id": 1}, "id": "call_1"}]),
+            AIMessage(content=ANSWER),
+        ],
+        first_token_delay=config.first_token_delay,
+        token_delay=config.token_delay,
+    )
+
+    @tool
+    async def create_shopping_item(name: str, shopping_list_id: int) -> str:
+        """Create a new shopping item."""
+        await asyncio.sleep(config.tool_delay)
+        return json.dumps({"id": 1, "name": name, "shopping_list_id": shopping_list_id, "is_completed": False})
+
+    return create_agent(llm, [create_shopping_item], InMemorySaver(), policy="none")
+
+async def run(config: argparse.Namespace) -> dict:
+    agent = make_agent(config)
+    blocking = []
+    for turn in range(config.turns):
+        start = time.perf_counter()
+        result = await agent.ainvoke({"messages": [{"role": "user", "content": "I need to buy a watermelon"}]}, {"configurable": {"thread_id": f"blocking-{turn}"}})
+        blocking.append(time.perf_counter() - start)
+        assert result["messages"][-1].content == ANSWER
+
+    # The first streamed turn imports gradio, run one unmeasured so that isn't counted as latency
+    async for _ in stream_agent_reply(agent, "I need to buy a watermelon", "streaming-warm-up"):
+        pass
+
+    first_feedback, first_token, total = [], [], []
+    for turn in range(config.turns):
+        start = time.perf_counter()
+        feedback_at = token_at = None
+        async for reply in stream_agent_reply(agent, "I need to buy a watermelon", f"streaming-{turn}"):
+            now = time.perf_counter() - start
+            feedback_at = feedback_at or now
+            if token_at is None and any(not message.metadata for message in reply):
+                token_at = now
+        first_feedback.append(feedback_at)
+        first_token.append(token_at)
+        total.append(time.perf_counter() - start)
+        assert reply[-1].content == ANSWER
+
+    return {
+        "config": {key: getattr(config, key) for key in ("turns", "first_token_delay", "token_delay", "tool_delay")},
+        "invoke": {"first_text_ms": latency_summary(blocking)},
+        "stream": {
+            "first_feedback_ms": latency_summary(first_feedback),
+            "first_token_ms": latency_summary(first_token),
+            "complete_ms": latency_summary(total),
+        },
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--turns", type=int, default=20)
+    parser.add_argument("--first-token-delay", type=float, default=0.3, help="seconds before a model call's first token")
+    parser.add_argument("--token-delay", type=float, default=0.02, help="seconds per generated token")
+    parser.add_argument("--tool-delay", type=float, default=0.2, help="seconds per tool call, standing in for the MCP round trip")
+    config = parser.parse_args()
+    print(json.dumps(asyncio.run(run(config)), indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""Helpers shared by the benchmarks."""
+import os
+import sys
+import tempfile
+from typing import List, Sequence
+
+def use_temp_database() -> str:
+    """Point DATABASE_URL at a fresh SQLite file. Must run before anything imports server."""
+    if "server.database" in sys.modules:
+        raise RuntimeError("use_temp_database() must be called before importing the server package")
+    db_dir = tempfile.mkdtemp(prefix="shopping-bench-")
+    os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{db_dir}/bench.db"
+    return os.environ["DATABASE_URL"]
+
+async def create_schema() -> None:
+    """Create the tables through a separate engine, the app's engine may be read-only (SQLITE_TUNING)."""
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    from server.database import DATABASE_URL
+    from server.models import Base
+
+    engine = create_async_engine(DATABASE_URL)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    await engine.dispose()
+
+def percentile(samples: Sequence[float], fraction: float) -> float:
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * fraction))]
+
+class QueryCounter:
+    """Counts statements (and optionally COMMITs) sent by the app's engines."""
+
+    def __init__(self, include_commits: bool = False):
+        from sqlalchemy import event
+
+        from server.database import async_engine, sqlite_writer
+
+        self.count = 0
+        engines = [async_engine] + ([sqlite_writer.engine] if sqlite_writer is not None else [])
+        for engine in engines:
+            event.listen(engine.sync_engine, "before_cursor_execute", self._increment)
+            if include_commits:
+                event.listen(engine.sync_engine, "commit", self._increment)
+
+    def _increment(self, *args) -> None:
+        self.count += 1
+
+def latency_summary(latencies: List[float]) -> dict:
+    if not latencies:
+        return {"p50": None, "p95": None, "p99": None}
+    return {name: round(percentile(latencies, fraction) * 1000, 3) for name, fraction in (("p50", 0.5), ("p95", 0.95), ("p99", 0.99))}
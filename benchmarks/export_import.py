@@ -0,0 +1,148 @@
+"""Export/import benchmark: round-trips a large dataset through /export and /import.
+
+Seeds a SQLite file with N lists x M items, serves it with uvicorn in a subprocess and
+streams GET /export to a file, then imports that file into a second, empty database
+with a streaming POST /import body. Reports elapsed time, throughput and the server's
+peak RSS for both directions, which should stay flat as the dataset grows:
+
+    uv run python -m benchmarks.export_import --lists 1000 --items 1000
+"""
+import argparse
+import asyncio
+import json
+import os
+import resource
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+from .load import free_port
+
+def create_database(path: str, lists: int, items: int) -> None:
+    """Create the schema and insert the rows with the sync driver, much faster than going through the API."""
+    from sqlalchemy import create_engine
+
+    from server.models import Base
+
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    engine.dispose()
+
+    with sqlite3.connect(path) as conn:
+        conn.executemany(
+            "INSERT INTO shopping_lists (id, name, created_at, updated_at, version) VALUES (?, ?, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP, 1)",
+            ((list_id, f"List {list_id}") for list_id in range(1, lists + 1)),
+        )
+        conn.executemany(
+            "INSERT INTO shopping_items (name, quantity, unit, is_completed, shopping_list_id, created_at, updated_at, version)"
+            " VALUES (?, 1, 'pcs', ?, ?, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP, 1)",
+            ((f"Item {i}", i % 3 == 0, list_id) for list_id in range(1, lists + 1) for i in range(items)),
+        )
+
+def peak_rss_mb(pid: int) -> float:
+    """Peak resident set size of a running process, from VmHWM on Linux."""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    # Not Linux: the max RSS of any waited-for child is the best we can do
+    return resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024
+
+class Server:
+    """uvicorn serving server.main:app against the given database in a subprocess."""
+
+    def __init__(self, database_path: str):
+        self.port = free_port()
+        self.base_url = f"http://127.0.0.1:{self.port}"
+        env = dict(os.environ, DATABASE_URL=f"sqlite+aiosqlite:///{database_path}")
+        self.process = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "server.main:app", "--port", str(self.port), "--log-level", "warning"], env=env,
+        )
+
+    async def __aenter__(self) -> "Server":
+        async with httpx.AsyncClient(base_url=self.base_url) as client:
+            for _ in range(200):
+                try:
+                    await client.get("/openapi.json")
+                    return self
+                except httpx.TransportError:
+                    await asyncio.sleep(0.05)
+        raise RuntimeError("server did not start")
+
+    async def __aexit__(self, *exc_info) -> None:
+        self.process.terminate()
+        self.process.wait()
+
+async def export(database_path: str, output_path: str) -> dict:
+    async with Server(database_path) as server, httpx.AsyncClient(base_url=server.base_url, timeout=None) as client:
+        start = time.perf_counter()
+        records = size = 0
+        with open(output_path, "wb") as f:
+            async with client.stream("GET", "/export") as response:
+                response.raise_for_status()
+                async for chunk in response.aiter_bytes():
+                    f.write(chunk)
+                    size += len(chunk)
+                    records += chunk.count(b"\n")
+        elapsed = time.perf_counter() - start
+        return {
+            "records": records,
+            "bytes": size,
+            "elapsed_s": round(elapsed, 3),
+            "records_per_s": round(records / elapsed),
+            "peak_rss_mb": round(peak_rss_mb(server.process.pid), 1),
+        }
+
+async def import_(database_path: str, input_path: str, chunk_size: int) -> dict:
+    async def body():
+        with open(input_path, "rb") as f:
+            while chunk := f.read(chunk_size):
+                yield chunk
+
+    async with Server(database_path) as server, httpx.AsyncClient(base_url=server.base_url, timeout=None) as client:
+        start = time.perf_counter()
+        response = await client.post("/import", content=body(), headers={"content-type": "application/x-ndjson"})
+        response.raise_for_status()
+        elapsed = time.perf_counter() - start
+        result = response.json()
+        records = result["lists"] + result["items"]
+        return {
+            "records": records,
+            "errors": len(result["errors"]),
+            "elapsed_s": round(elapsed, 3),
+            "records_per_s": round(records / elapsed),
+            "peak_rss_mb": round(peak_rss_mb(server.process.pid), 1),
+        }
+
+async def run(config: argparse.Namespace) -> dict:
+    work_dir = tempfile.mkdtemp(prefix="shopping-bench-")
+    source, target, dump = (os.path.join(work_dir, name) for name in ("source.db", "target.db", "export.ndjson"))
+
+    start = time.perf_counter()
+    create_database(source, config.lists, config.items)
+    create_database(target, 0, 0)
+    print(f"seeded {config.lists * config.items} items in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+
+    return {
+        "config": {"lists": config.lists, "items": config.items, "chunk_size": config.chunk_size},
+        "export": await export(source, dump),
+        "import": await import_(target, dump, config.chunk_size),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lists", type=int, default=1000, help="number of seeded lists")
+    parser.add_argument("--items", type=int, default=1000, help="number of seeded items per list")
+    parser.add_argument("--chunk-size", type=int, default=64 * 1024, help="bytes per chunk of the import request body")
+    config = parser.parse_args()
+    print(json.dumps(asyncio.run(run(config)), indent=2))
+
+if __name__ == "__main__":
+    main()
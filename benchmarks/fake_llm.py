@@ -0,0 +1,73 @@
+"""Offline chat models for the chatbot benchmarks."""
+import asyncio
+import json
+import re
+import time
+from typing import Any, AsyncIterator, List, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.messages.utils import count_tokens_approximately
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+class StubChatModel(BaseChatModel):
+    """Chat model that answers instantly with a fixed reply and records the size of every prompt."""
+    reply: str = "Done! I've updated your shopping list. Anything else you'd like to add or check off?"
+    input_tokens: List[int] = []
+
+    @property
+    def _llm_type(self) -> str:
+        return "stub"
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager: Any = None, **kwargs) -> ChatResult:
+        self.input_tokens.append(count_tokens_approximately(messages))
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(self.reply))])
+
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+class ScriptedChatModel(BaseChatModel):
+    """Chat model that plays back scripted replies in order, streaming them word by word like a real model.
+
+    first_token_delay stands in for prompt processing and token_delay for generation.
+    """
+    script: List[AIMessage]
+    first_token_delay: float = 0.3
+    token_delay: float = 0.02
+    calls: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted"
+
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+    def _next_message(self) -> AIMessage:
+        message = self.script[self.calls % len(self.script)]
+        self.calls += 1
+        return message
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager: Any = None, **kwargs) -> ChatResult:
+        message = self._next_message()
+        time.sleep(self.first_token_delay + self.token_delay * len(message.content.split()))
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    async def _astream(
+        self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager: Any = None, **kwargs
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        message = self._next_message()
+        await asyncio.sleep(self.first_token_delay)
+        for word in re.findall(r"\S+\s*", message.content):
+            yield ChatGenerationChunk(message=AIMessageChunk(content=word))
+            await asyncio.sleep(self.token_delay)
+        if message.tool_calls:
+            yield ChatGenerationChunk(message=AIMessageChunk(content="", tool_call_chunks=[
+                {"name": call["name"], "args": json.dumps(call["args"]), "id": call["id"], "index": index}
+                for index, call in enumerate(message.tool_calls)
+            ]))
+
+    async def _agenerate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager: Any = None, **kwargs) -> ChatResult:
+        chunks = [chunk.message async for chunk in self._astream(messages, stop, run_manager, **kwargs)]
+        message = sum(chunks[1:], chunks[0]) if chunks else AIMessageChunk(content="")
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=message.content, tool_calls=message.tool_calls))])
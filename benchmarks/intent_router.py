@@ -0,0 +1,141 @@
+"""Intent fast path benchmark: corpus accuracy, hit rate and turn latency saved.
+
+Checks parse_intent against the labelled utterances in intent_corpus.jsonl (exits
+non-zero on any mismatch), then replays the corpus as a conversation through the
+chatbot's graph with and without the fast path. The tools work on an in-memory
+shopping list and the agent uses a scripted, network-free chat model that spends two
+model calls per turn (one tool call, one answer):
+
+    uv run python -m benchmarks.intent_router
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Optional
+
+from langchain_core.messages import AIMessage
+from langchain_core.tools import tool
+from langgraph.checkpoint.memory import InMemorySaver
+
+from chatbot import create_agent, stream_agent_reply
+from intent_router import RouterStats, parse_intent
+
+from .common import latency_summary
+from .fake_llm import ScriptedChatModel
+
+CORPUS = Path(__file__).with_name("intent_corpus.jsonl")
+
+def load_corpus() -> list:
+    with open(CORPUS) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def check_corpus(corpus: list) -> dict:
+    mismatches = []
+    start = time.perf_counter()
+    for example in corpus:
+        intent = parse_intent(example["text"])
+        got = {"intent": intent.name, "item": intent.item, "quantity": intent.quantity} if intent else {"intent": None, "item": None, "quantity": 1}
+        if got != {key: example[key] for key in ("intent", "item", "quantity")}:
+            mismatches.append({"text": example["text"], "expected": example["intent"], "got": got})
+    elapsed = time.perf_counter() - start
+    return {
+        "utterances": len(corpus),
+        "matched": sum(example["intent"] is not None for example in corpus),
+        "mismatches": mismatches,
+        "parse_us": round(elapsed / len(corpus) * 1e6, 2),
+    }
+
+def make_tools(tool_delay: float) -> list:
+    """The agent's MCP tools over an in-memory list, answering with the same JSON as the server."""
+    shopping_list = {"id": 1, "name": "Groceries", "description": None}
+    items = {}
+    next_id = iter(range(1, 1_000_000))
+
+    @tool
+    async def get_shopping_lists(limit: int = 100) -> str:
+        """Get all shopping lists."""
+        await asyncio.sleep(tool_delay)
+        return json.dumps({"items": [shopping_list], "next_cursor": None})
+
+    @tool
+    async def get_shopping_list(shopping_list_id: int) -> str:
+        """Get a specific shopping list with items."""
+        await asyncio.sleep(tool_delay)
+        return json.dumps({**shopping_list, "items": list(items.values())})
+
+    @tool
+    async def search_shopping_items(shopping_list_id: int, q: str, limit: int = 5, is_completed: Optional[bool] = None) -> str:
+        """Find items in a shopping list by name."""
+        await asyncio.sleep(tool_delay)
+        matches = [item for item in items.values() if q in item["name"].lower() and is_completed in (None, item["is_completed"])]
+        return json.dumps(matches[:limit])
+
+    @tool
+    async def create_shopping_item(name: str, shopping_list_id: int, quantity: int = 1) -> str:
+        """Add an item to a shopping list."""
+        await asyncio.sleep(tool_delay)
+        item_id = next(next_id)
+        items[item_id] = {"id": item_id, "name": name, "quantity": quantity, "unit": None, "is_completed": False, "shopping_list_id": shopping_list_id}
+        return json.dumps(items[item_id])
+
+    @tool
+    async def toggle_item_completion(item_id: int) -> str:
+        """Toggle item completion status."""
+        await asyncio.sleep(tool_delay)
+        items[item_id]["is_completed"] = not items[item_id]["is_completed"]
+        return json.dumps(items[item_id])
+
+    @tool
+    async def delete_shopping_item(item_id: int) -> str:
+        """Delete a shopping item."""
+        await asyncio.sleep(tool_delay)
+        del items[item_id]
+        return json.dumps({"message": "Shopping item deleted successfully"})
+
+    return [get_shopping_lists, get_shopping_list, search_shopping_items, create_shopping_item, toggle_item_completion, delete_shopping_item]
+
+async def replay(corpus: list, fast_path: bool, config: argparse.Namespace) -> dict:
+    llm = ScriptedChatModel(
+        script=[
+            AIMessage(content="", tool_calls=[{"name": "get_shopping_lists", "args": {}, "id": "call_1"}]),
+            AIMessage(content="Done, your shopping list is up to date."),
+        ],
+        first_token_delay=config.first_token_delay,
+        token_delay=config.token_delay,
+    )
+    agent = create_agent(llm, make_tools(config.tool_delay), InMemorySaver(), policy="none", fast_path=fast_path)
+    stats = RouterStats()
+
+    latencies = []
+    for example in corpus:
+        start = time.perf_counter()
+        async for _ in stream_agent_reply(agent, example["text"], "corpus", stats):
+            pass
+        latencies.append(time.perf_counter() - start)
+    return {"turn_ms": latency_summary(latencies), "total_s": round(sum(latencies), 2), "router": stats.summary(), "model_calls": llm.calls}
+
+async def run(config: argparse.Namespace) -> dict:
+    corpus = load_corpus()
+    return {
+        "config": {key: getattr(config, key) for key in ("first_token_delay", "token_delay", "tool_delay")},
+        "corpus": check_corpus(corpus),
+        "agent_only": await replay(corpus, False, config),
+        "fast_path": await replay(corpus, True, config),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--first-token-delay", type=float, default=0.3, help="seconds before a model call's first token")
+    parser.add_argument("--token-delay", type=float, default=0.02, help="seconds per generated token")
+    parser.add_argument("--tool-delay", type=float, default=0.03, help="seconds per tool call, standing in for the MCP round trip")
+    config = parser.parse_args()
+    results = asyncio.run(run(config))
+    print(json.dumps(results, indent=2))
+    if results["corpus"]["mismatches"]:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
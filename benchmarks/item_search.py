@@ -0,0 +1,123 @@
+"""Item search benchmark: search_shopping_items lookup latency on a 100k item list.
+
+Seeds one list with N items named from a grocery vocabulary, and optionally other
+lists of 1000 items each from the same vocabulary, then times
+GET /shopping-items/search for exact, prefix, misspelt, notes and short queries
+in-process over ASGI. For comparison it also times what the agent had to do before:
+fetch every item of the list with GET /shopping-items/ and match the names itself.
+
+    uv run python -m benchmarks.item_search --items 100000
+    uv run python -m benchmarks.item_search --items 50 --other-items 200000
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+
+from .common import use_temp_database
+
+if __name__ == "__main__":
+    use_temp_database()
+
+import httpx
+
+from .common import create_schema, latency_summary
+
+ADJECTIVES = ["organic", "fresh", "frozen", "red", "green", "whole", "sliced", "smoked", "sweet", "spicy", "dried", "baby", "large", "wild", "free range"]
+NOUNS = [
+    "watermelon", "apples", "bananas", "tomato sauce", "spaghetti", "milk", "oat milk", "eggs", "bread", "butter", "cheddar",
+    "yogurt", "chicken breast", "salmon", "rice", "lentils", "chickpeas", "spinach", "carrots", "onions", "garlic", "potatoes",
+    "peppers", "olive oil", "coffee", "tea", "orange juice", "cereal", "peanut butter", "strawberries", "blueberries", "lemons",
+]
+QUERIES = {
+    "exact": ["watermelon", "peanut butter", "olive oil", "blueberries"],
+    "prefix": ["water", "straw", "chick", "pean"],
+    "typo": ["watermellon", "spagetti", "brocoli rabe", "strawberies"],
+    "notes": ["birthday", "for the party"],
+    "short": ["eg", "te"],
+}
+
+OTHER_LIST_ITEMS = 1000
+
+def _items(rng: random.Random, shopping_list_id: int, start: int, stop: int) -> list:
+    return [
+        {
+            "name": f"{rng.choice(ADJECTIVES)} {rng.choice(NOUNS)} {i}",
+            "notes": "for the birthday party" if i % 500 == 0 else None,
+            "quantity": 1, "is_completed": i % 3 == 0, "shopping_list_id": shopping_list_id,
+        }
+        for i in range(start, stop)
+    ]
+
+async def seed(items: int, other_items: int, seed: int) -> int:
+    from sqlalchemy import insert
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    from server.database import DATABASE_URL
+    from server.models import ShoppingItem, ShoppingList
+
+    rng = random.Random(seed)
+    engine = create_async_engine(DATABASE_URL)
+    async with engine.begin() as conn:
+        other_lists = -(-other_items // OTHER_LIST_ITEMS)
+        await conn.execute(insert(ShoppingList), [{"name": "Everything"}] + [{"name": f"Other {i}"} for i in range(other_lists)])
+        for start in range(0, items, 10_000):
+            await conn.execute(insert(ShoppingItem), _items(rng, 1, start, min(start + 10_000, items)))
+        for start in range(0, other_items, 10_000):
+            await conn.execute(insert(ShoppingItem), [
+                item for i in range(start, min(start + 10_000, other_items), OTHER_LIST_ITEMS)
+                for item in _items(rng, 2 + i // OTHER_LIST_ITEMS, i, min(i + OTHER_LIST_ITEMS, other_items))
+            ])
+    await engine.dispose()
+    return 1
+
+async def run(config: argparse.Namespace) -> dict:
+    from server.database import dispose_engines
+    from server.main import app
+
+    await create_schema()
+    seed_start = time.perf_counter()
+    list_id = await seed(config.items, config.other_items, config.seed)
+    seed_s = time.perf_counter() - seed_start
+
+    results = {}
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=120) as client:
+        for kind, queries in QUERIES.items():
+            latencies, sizes = [], []
+            for _ in range(config.repeat):
+                for query in queries:
+                    start = time.perf_counter()
+                    response = await client.get("/shopping-items/search", params={"shopping_list_id": list_id, "q": query, "limit": config.limit})
+                    latencies.append(time.perf_counter() - start)
+                    response.raise_for_status()
+                    sizes.append(len(response.content))
+            results[kind] = {"latency_ms": latency_summary(latencies), "response_bytes": max(sizes)}
+
+        latencies = []
+        for _ in range(config.full_fetches):
+            start = time.perf_counter()
+            response = await client.get("/shopping-items/", params={"shopping_list_id": list_id, "limit": config.items})
+            latencies.append(time.perf_counter() - start)
+        results["full_list_fetch"] = {"latency_ms": latency_summary(latencies), "response_bytes": len(response.content)}
+
+    await dispose_engines()
+    return {
+        "config": {key: getattr(config, key) for key in ("items", "other_items", "limit", "repeat", "seed")},
+        "seed_s": round(seed_s, 2),
+        "queries": results,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, default=100_000, help="items on the searched list")
+    parser.add_argument("--other-items", type=int, default=0, help=f"items on other lists, {OTHER_LIST_ITEMS} per list")
+    parser.add_argument("--limit", type=int, default=5, help="top-k matches per search")
+    parser.add_argument("--repeat", type=int, default=20, help="times each query is run")
+    parser.add_argument("--full-fetches", type=int, default=3, help="times the whole list is fetched for comparison")
+    parser.add_argument("--seed", type=int, default=42)
+    config = parser.parse_args()
+    print(json.dumps(asyncio.run(run(config)), indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,298 @@
+"""Load test for the REST and MCP surfaces of server.main:app.
+
+Seeds a fresh SQLite file with N lists x M items, serves the app under uvicorn (or
+in-process over ASGI) and drives mixed workloads against it. Every workload reports
+throughput, p50/p95/p99 latency and database queries per request; the full result is
+written as JSON so runs can be compared:
+
+    uv run python -m benchmarks.load --output before.json
+    uv run python -m benchmarks.load --output after.json --baseline before.json
+
+With --baseline the run exits non-zero if a workload's p95 latency or throughput
+regressed by more than --max-regression.
+"""
+import argparse
+import asyncio
+import json
+import random
+import socket
+import sys
+import time
+from contextlib import AsyncExitStack
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from .common import use_temp_database
+
+if __name__ == "__main__":
+    use_temp_database()
+
+import httpx
+
+from .common import QueryCounter, create_schema, latency_summary
+
+class WorkerContext:
+    """Per-worker handle used by workload operations to issue timed requests."""
+
+    def __init__(self, run: "WorkloadRun", client: httpx.AsyncClient, rng: random.Random):
+        self.run = run
+        self.client = client
+        self.rng = rng
+        self.mcp_session = None
+        self.etags: Dict[str, str] = {}
+
+    async def request(self, method: str, url: str, **kwargs) -> Optional[httpx.Response]:
+        start = time.perf_counter()
+        try:
+            response = await self.client.request(method, url, **kwargs)
+        except httpx.HTTPError:
+            self.run.record(time.perf_counter() - start, ok=False)
+            return None
+        self.run.record(time.perf_counter() - start, ok=response.status_code < 400)
+        return response
+
+    async def call_tool(self, name: str, arguments: dict):
+        start = time.perf_counter()
+        try:
+            result = await self.mcp_session.call_tool(name, arguments)
+        except Exception:
+            self.run.record(time.perf_counter() - start, ok=False)
+            return None
+        self.run.record(time.perf_counter() - start, ok=not result.isError)
+        return result
+
+    def random_list_id(self) -> int:
+        return self.rng.randint(1, self.run.config.lists)
+
+    def random_item_id(self) -> int:
+        return self.rng.randint(1, self.run.config.lists * self.run.config.items)
+
+class WorkloadRun:
+    def __init__(self, config: argparse.Namespace):
+        self.config = config
+        self.latencies: List[float] = []
+        self.errors = 0
+
+    def record(self, latency: float, ok: bool) -> None:
+        self.latencies.append(latency)
+        if not ok:
+            self.errors += 1
+
+# Workload operations: each call issues one or more requests through the worker context
+async def agent_polling(ctx: WorkerContext) -> None:
+    """Mostly conditional re-reads of a list, like an agent asking "what's on my list?"."""
+    roll = ctx.rng.random()
+    list_id = ctx.random_list_id()
+    if roll < 0.8:
+        url = f"/shopping-lists/{list_id}"
+        headers = {"If-None-Match": ctx.etags[url]} if url in ctx.etags else {}
+        response = await ctx.request("GET", url, headers=headers)
+        if response is not None and "etag" in response.headers:
+            ctx.etags[url] = response.headers["etag"]
+    elif roll < 0.9:
+        await ctx.request("GET", "/shopping-items/", params={"shopping_list_id": list_id})
+    else:
+        await ctx.request("PATCH", f"/shopping-items/{ctx.random_item_id()}/toggle")
+
+async def bursty_writes(ctx: WorkerContext) -> None:
+    """A burst of concurrent item adds followed by toggling the new items."""
+    list_id = ctx.random_list_id()
+    responses = await asyncio.gather(*(
+        ctx.request("POST", "/shopping-items/", json={"name": f"burst item {i}", "shopping_list_id": list_id})
+        for i in range(ctx.run.config.burst)
+    ))
+    item_ids = [response.json()["id"] for response in responses if response is not None and response.status_code == 200]
+    await asyncio.gather(*(ctx.request("PATCH", f"/shopping-items/{item_id}/toggle") for item_id in item_ids))
+
+async def deep_pagination(ctx: WorkerContext) -> None:
+    """Walk every page of the lists endpoint, then read a deep page of a list's items."""
+    cursor = None
+    while True:
+        params = {"limit": 20} if cursor is None else {"limit": 20, "cursor": cursor}
+        response = await ctx.request("GET", "/shopping-lists/", params=params)
+        if response is None or response.status_code != 200:
+            break
+        cursor = response.json()["next_cursor"]
+        if cursor is None:
+            break
+    skip = max(0, ctx.run.config.items - 20)
+    await ctx.request("GET", "/shopping-items/", params={"shopping_list_id": ctx.random_list_id(), "skip": skip, "limit": 20})
+
+async def mcp_tool_calls(ctx: WorkerContext) -> None:
+    """The agent's tool mix over the MCP SSE transport."""
+    roll = ctx.rng.random()
+    if roll < 0.8:
+        await ctx.call_tool("get_shopping_list", {"shopping_list_id": ctx.random_list_id()})
+    elif roll < 0.9:
+        await ctx.call_tool("create_shopping_item", {"name": "watermelon", "shopping_list_id": ctx.random_list_id()})
+    else:
+        await ctx.call_tool("toggle_item_completion", {"item_id": ctx.random_item_id()})
+
+WORKLOADS: Dict[str, tuple] = {
+    # name: (operation, surface)
+    "agent_polling": (agent_polling, "rest"),
+    "bursty_writes": (bursty_writes, "rest"),
+    "deep_pagination": (deep_pagination, "rest"),
+    "mcp_tool_calls": (mcp_tool_calls, "mcp"),
+}
+
+async def seed(lists: int, items: int) -> None:
+    """Insert the lists and items directly, much faster than going through the API."""
+    from sqlalchemy import insert
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    from server.database import DATABASE_URL
+    from server.models import ShoppingItem, ShoppingList
+
+    engine = create_async_engine(DATABASE_URL)
+    async with engine.begin() as conn:
+        await conn.execute(insert(ShoppingList), [{"name": f"List {i}"} for i in range(lists)])
+        for list_id in range(1, lists + 1):
+            await conn.execute(
+                insert(ShoppingItem),
+                [{"name": f"Item {i}", "quantity": 1, "is_completed": i % 3 == 0, "shopping_list_id": list_id} for i in range(items)],
+            )
+    await engine.dispose()
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+async def run_workload(
+    name: str, operation: Callable[[WorkerContext], Awaitable[None]], surface: str,
+    config: argparse.Namespace, client: httpx.AsyncClient, base_url: Optional[str], counter: QueryCounter,
+) -> dict:
+    run = WorkloadRun(config)
+    remaining = config.operations
+
+    async def worker(worker_id: int):
+        nonlocal remaining
+        ctx = WorkerContext(run, client, random.Random(config.seed * 1000 + worker_id))
+        async with AsyncExitStack() as stack:
+            if surface == "mcp":
+                from mcp import ClientSession
+                from mcp.client.sse import sse_client
+
+                read, write = await stack.enter_async_context(sse_client(f"{base_url}/mcp"))
+                ctx.mcp_session = await stack.enter_async_context(ClientSession(read, write))
+                await ctx.mcp_session.initialize()
+            await start_event.wait()
+            while remaining > 0:
+                remaining -= 1
+                await operation(ctx)
+
+    start_event = asyncio.Event()
+    workers = [asyncio.create_task(worker(worker_id)) for worker_id in range(config.concurrency)]
+    # Let MCP sessions finish their handshake before the clock starts
+    await asyncio.sleep(0.5 if surface == "mcp" else 0)
+    queries_before = counter.count
+    start = time.perf_counter()
+    start_event.set()
+    await asyncio.gather(*workers)
+    elapsed = time.perf_counter() - start
+
+    requests = len(run.latencies)
+    return {
+        "surface": surface,
+        "operations": config.operations,
+        "requests": requests,
+        "errors": run.errors,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(requests / elapsed, 2) if elapsed else None,
+        "latency_ms": latency_summary(run.latencies),
+        "db_queries_per_request": round((counter.count - queries_before) / requests, 2) if requests else None,
+    }
+
+async def run_suite(config: argparse.Namespace) -> dict:
+    from server.database import dispose_engines
+    from server.main import app
+
+    await create_schema()
+    await seed(config.lists, config.items)
+    counter = QueryCounter()
+
+    selected = [name for name in WORKLOADS if name in config.workloads]
+    results = {}
+    async with AsyncExitStack() as stack:
+        if config.server == "uvicorn":
+            import uvicorn
+
+            port = free_port()
+            server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+            server_task = asyncio.create_task(server.serve())
+            while not server.started:
+                await asyncio.sleep(0.05)
+            base_url = f"http://127.0.0.1:{port}"
+            client = await stack.enter_async_context(httpx.AsyncClient(base_url=base_url, timeout=60, limits=httpx.Limits(max_connections=config.concurrency * config.burst)))
+        else:
+            base_url = None
+            client = await stack.enter_async_context(httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=60))
+
+        for name in selected:
+            operation, surface = WORKLOADS[name]
+            if surface == "mcp" and base_url is None:
+                print(f"skipping {name}: the MCP SSE transport needs --server uvicorn", file=sys.stderr)
+                continue
+            results[name] = await run_workload(name, operation, surface, config, client, base_url, counter)
+
+    if config.server == "uvicorn":
+        server.should_exit = True
+        await server_task
+    else:
+        await dispose_engines()
+
+    return {
+        "config": {key: getattr(config, key) for key in ("server", "lists", "items", "operations", "concurrency", "burst", "seed")},
+        "workloads": results,
+    }
+
+def compare(results: dict, baseline: dict, max_regression: float) -> bool:
+    """Print per-workload changes against a baseline run. Returns False if anything regressed too much."""
+    ok = True
+    print(f"{'workload':<18} {'p95 ms':>18} {'req/s':>20}", file=sys.stderr)
+    for name, result in results["workloads"].items():
+        before = baseline.get("workloads", {}).get(name)
+        if before is None:
+            continue
+        p95_before, p95_after = before["latency_ms"]["p95"], result["latency_ms"]["p95"]
+        rps_before, rps_after = before["throughput_rps"], result["throughput_rps"]
+        regressed = (p95_after > p95_before * (1 + max_regression)) or (rps_after < rps_before * (1 - max_regression))
+        ok = ok and not regressed
+        print(
+            f"{name:<18} {p95_before:>8.2f} -> {p95_after:>7.2f} {rps_before:>9.1f} -> {rps_after:>8.1f}"
+            f"{'  REGRESSED' if regressed else ''}",
+            file=sys.stderr,
+        )
+    return ok
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--server", choices=["uvicorn", "asgi"], default="uvicorn", help="serve over real sockets or call the ASGI app in-process")
+    parser.add_argument("--lists", type=int, default=50, help="number of seeded lists")
+    parser.add_argument("--items", type=int, default=200, help="number of seeded items per list")
+    parser.add_argument("--operations", type=int, default=500, help="operations per workload")
+    parser.add_argument("--concurrency", type=int, default=16, help="concurrent workers per workload")
+    parser.add_argument("--burst", type=int, default=5, help="item adds per burst in bursty_writes")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--workloads", nargs="+", choices=list(WORKLOADS), default=list(WORKLOADS))
+    parser.add_argument("--output", help="write the JSON results to this file instead of stdout")
+    parser.add_argument("--baseline", help="JSON results of a previous run to compare against")
+    parser.add_argument("--max-regression", type=float, default=0.2, help="allowed relative p95/throughput regression")
+    config = parser.parse_args()
+
+    results = asyncio.run(run_suite(config))
+    output = json.dumps(results, indent=2)
+    if config.output:
+        with open(config.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+    if config.baseline:
+        with open(config.baseline) as f:
+            baseline = json.load(f)
+        if not compare(results, baseline, config.max_regression):
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""MCP session benchmark: tool-call latency with a session per call vs. pooled sessions.
+
+Serves server.main:app under uvicorn against a throwaway SQLite file and calls the
+get_shopping_list and toggle_item_completion tools through LangChain tools, the way the
+agent does. "per_call" loads the tools with MultiServerMCPClient.get_tools(), which opens
+and initializes a new session for every call; "pooled" uses MCPSessionPool. Both run
+over each network transport, the memory transport (the app's MCP server called in
+process) is pooled only. Server and client share the process, so the CPU time per call
+covers both sides:
+
+    uv run python -m benchmarks.mcp_sessions --calls 200 --concurrency 4
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from .common import use_temp_database
+
+if __name__ == "__main__":
+    use_temp_database()
+
+from langchain_mcp_adapters.client import MultiServerMCPClient
+
+from mcp_pool import TRANSPORT_PATHS, TRANSPORTS, MCPSessionPool
+
+from .common import create_schema, latency_summary
+from .load import free_port, seed
+
+async def time_calls(tools, config: argparse.Namespace) -> dict:
+    tools = {tool.name: tool for tool in tools}
+    latencies = []
+    remaining = config.calls
+
+    async def worker():
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            name, args = ("toggle_item_completion", {"item_id": 1}) if remaining % 10 == 0 else ("get_shopping_list", {"shopping_list_id": 1})
+            start = time.perf_counter()
+            await tools[name].ainvoke(args)
+            latencies.append(time.perf_counter() - start)
+
+    start, cpu_start = time.perf_counter(), time.process_time()
+    await asyncio.gather(*(worker() for _ in range(config.concurrency)))
+    elapsed, cpu = time.perf_counter() - start, time.process_time() - cpu_start
+    return {
+        "throughput_cps": round(len(latencies) / elapsed, 2),
+        "latency_ms": latency_summary(latencies),
+        "cpu_ms_per_call": round(cpu / len(latencies) * 1000, 3),
+    }
+
+async def run(config: argparse.Namespace) -> dict:
+    import uvicorn
+
+    from server.main import app, mcp
+
+    await create_schema()
+    await seed(1, config.items)
+
+    port = free_port()
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    server_task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.05)
+    base_url = f"http://127.0.0.1:{port}"
+
+    results = {}
+    for transport in config.transports:
+        results[transport] = {}
+        if transport in TRANSPORT_PATHS:
+            client = MultiServerMCPClient({"ShoppingList": {"url": base_url + TRANSPORT_PATHS[transport], "transport": transport}})
+            results[transport]["per_call"] = await time_calls(await client.get_tools(), config)
+        server_object = mcp.server if transport == "memory" else None
+        async with MCPSessionPool(base_url, transport=transport, size=config.pool_size, server=server_object) as pool:
+            results[transport]["pooled"] = await time_calls(await pool.get_tools(), config)
+
+    server.should_exit = True
+    await server_task
+    return {
+        "config": {key: getattr(config, key) for key in ("calls", "concurrency", "pool_size", "items")},
+        "transports": results,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=200, help="tool calls per mode and transport")
+    parser.add_argument("--concurrency", type=int, default=4, help="concurrent callers")
+    parser.add_argument("--pool-size", type=int, default=2, help="sessions in the pool")
+    parser.add_argument("--items", type=int, default=20, help="items on the seeded list")
+    parser.add_argument("--transports", nargs="+", choices=TRANSPORTS, default=list(TRANSPORTS))
+    config = parser.parse_args()
+    print(json.dumps(asyncio.run(run(config)), indent=2))
+
+if __name__ == "__main__":
+    main()
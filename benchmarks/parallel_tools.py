@@ -0,0 +1,135 @@
+"""Parallel tool benchmark: wall-clock time of multi-item chatbot turns.
+
+Serves server.main:app under uvicorn against a throwaway SQLite file and runs turns
+like "Add spaghetti, tomato sauce and basil, and remove the watermelon" through the
+chatbot's agent, with its real MCP tools over a session pool and a scripted,
+network-free chat model. Three ways of making the same calls are compared:
+
+- sequential: one tool call per model turn, a LLM -> tool -> LLM cycle per item
+- planned_serial: the calls grouped into as few model turns as their dependencies allow
+  (every create plus the lookup, then the delete), but run one at a time
+- planned: the same turns with each turn's calls run concurrently (TOOL_CONCURRENCY)
+
+After every turn it checks the list holds the new items and not the removed one, and
+that the tool results come back in call order. --tool-latency adds a delay to every
+tool call, standing in for the round trip to a remote MCP server:
+
+    uv run python -m benchmarks.parallel_tools --turns 10 --items 3 --tool-latency 0.1
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from .common import use_temp_database
+
+if __name__ == "__main__":
+    use_temp_database()
+
+import httpx
+from langchain_core.messages import AIMessage, ToolMessage
+from langgraph.checkpoint.memory import InMemorySaver
+
+from chatbot import TOOL_CONCURRENCY, create_agent
+from mcp_pool import MCPSessionPool
+
+from .common import create_schema, latency_summary
+from .fake_llm import ScriptedChatModel
+from .load import free_port, seed
+
+ITEMS = ["spaghetti", "tomato sauce", "basil", "parmesan", "olive oil", "garlic", "onions", "mozzarella"]
+ANSWER = "Done! I've added the items and removed the watermelon from your shopping list."
+
+class RemotePool(MCPSessionPool):
+    """Session pool whose tool calls take latency seconds longer."""
+
+    def __init__(self, *args, latency: float = 0.0, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.latency = latency
+
+    async def call_tool(self, name: str, arguments: dict):
+        await asyncio.sleep(self.latency)
+        return await super().call_tool(name, arguments)
+
+def script(mode: str, items: list, watermelon_id: int) -> list:
+    creates = [
+        {"name": "create_shopping_item", "args": {"name": name, "shopping_list_id": 1}, "id": f"call_add_{i}"} for i, name in enumerate(items)
+    ]
+    lookup = {"name": "search_shopping_items", "args": {"shopping_list_id": 1, "q": "watermelon"}, "id": "call_find"}
+    remove = {"name": "delete_shopping_item", "args": {"item_id": watermelon_id}, "id": "call_remove"}
+    if mode == "sequential":
+        turns = [[call] for call in creates + [lookup, remove]]
+    else:
+        turns = [creates + [lookup], [remove]]
+    return [AIMessage(content="", tool_calls=calls) for calls in turns] + [AIMessage(content=ANSWER)]
+
+def check_turn(messages: list, items: list, shopping_list: dict) -> None:
+    names = [item["name"] for item in shopping_list["items"]]
+    assert "watermelon" not in names and all(name in names for name in items), names
+    for index, message in enumerate(messages):
+        if isinstance(message, AIMessage) and message.tool_calls:
+            results = [result.tool_call_id for result in messages[index + 1:index + 1 + len(message.tool_calls)] if isinstance(result, ToolMessage)]
+            assert results == [call["id"] for call in message.tool_calls], results
+
+async def run_mode(mode: str, tools: list, client: httpx.AsyncClient, config: argparse.Namespace) -> dict:
+    items = ITEMS[:config.items]
+    llm = ScriptedChatModel(script=[AIMessage(content=ANSWER)], first_token_delay=config.first_token_delay, token_delay=config.token_delay)
+    concurrency = 1 if mode == "planned_serial" else config.tool_concurrency
+    agent = create_agent(llm, tools, InMemorySaver(), policy="none", fast_path=False, tool_concurrency=concurrency)
+    latencies, model_calls = [], []
+    for turn in range(config.turns):
+        # Start every turn from a list with just a watermelon on it
+        for item in (await client.get("/shopping-items/", params={"shopping_list_id": 1, "limit": 1000})).json():
+            await client.delete(f"/shopping-items/{item['id']}")
+        watermelon = (await client.post("/shopping-items/", json={"name": "watermelon", "shopping_list_id": 1})).json()
+        llm.script, llm.calls = script(mode, items, watermelon["id"]), 0
+
+        start = time.perf_counter()
+        result = await agent.ainvoke({"messages": [{"role": "user", "content": f"Add {', '.join(items)}, and remove the watermelon"}]}, {"configurable": {"thread_id": f"{mode}-{turn}"}})
+        latencies.append(time.perf_counter() - start)
+        model_calls.append(llm.calls)
+        assert result["messages"][-1].content == ANSWER
+        check_turn(result["messages"], items, (await client.get("/shopping-lists/1")).json())
+    return {"turn_ms": latency_summary(latencies), "model_calls_per_turn": max(model_calls), "tool_concurrency": concurrency}
+
+async def run(config: argparse.Namespace) -> dict:
+    import uvicorn
+
+    from server.main import app
+
+    await create_schema()
+    await seed(1, 1)
+    port = free_port()
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    server_task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.05)
+    base_url = f"http://127.0.0.1:{port}"
+
+    results = {}
+    async with RemotePool(base_url, transport=config.transport, latency=config.tool_latency) as pool, httpx.AsyncClient(base_url=base_url) as client:
+        tools = await pool.get_tools()
+        for mode in ("sequential", "planned_serial", "planned"):
+            results[mode] = await run_mode(mode, tools, client, config)
+
+    server.should_exit = True
+    await server_task
+    return {
+        "config": {key: getattr(config, key) for key in ("turns", "items", "first_token_delay", "token_delay", "tool_latency", "tool_concurrency", "transport")},
+        **results,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--turns", type=int, default=10)
+    parser.add_argument("--items", type=int, default=3, choices=range(1, len(ITEMS) + 1), metavar=f"1-{len(ITEMS)}", help="items added per turn")
+    parser.add_argument("--first-token-delay", type=float, default=0.3, help="seconds before a model call's first token")
+    parser.add_argument("--token-delay", type=float, default=0.02, help="seconds per generated token")
+    parser.add_argument("--tool-latency", type=float, default=0.1, help="seconds added to every tool call, 0 for the bare local server")
+    parser.add_argument("--tool-concurrency", type=int, default=TOOL_CONCURRENCY, help="tool calls run at once in the planned mode")
+    parser.add_argument("--transport", choices=("sse", "streamable_http"), default="sse", help="MCP transport to the local server")
+    config = parser.parse_args()
+    print(json.dumps(asyncio.run(run(config)), indent=2))
+
+if __name__ == "__main__":
+    main()
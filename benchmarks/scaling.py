@@ -0,0 +1,186 @@
+"""Scaling benchmark: throughput of server.main:app under uvicorn with 1, 2 and 4 worker processes.
+
+For each worker count it seeds a fresh database, starts `uvicorn --workers N` with
+WEB_CONCURRENCY=N, waits until /readyz has answered from every worker, then runs a
+read/write mix for a fixed duration. Each client owns one list: it toggles the list's
+items over one connection and reads the list back over a second connection (often
+served by another worker), counting reads that miss its last write and how long they
+took to catch up, i.e. how far cache invalidation lags behind across workers. The
+other reads fetch random lists and item pages.
+
+By default the database is a throwaway SQLite file, where several workers share no
+cache or change feed (the response cache is off). Pass --database-url to run against
+Postgres, where the workers relay invalidations over LISTEN/NOTIFY; its tables are
+dropped and recreated, so point it at a disposable database:
+
+    uv run python -m benchmarks.scaling --workers 1 2 4
+    uv run python -m benchmarks.scaling --database-url postgresql+asyncpg://postgres@localhost/shopping_bench
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+from .common import latency_summary
+from .load import free_port
+
+async def prepare_database(database_url: str, lists: int, items: int) -> None:
+    """Recreate the schema and seed one list per client through a separate engine, outside the server processes."""
+    from sqlalchemy import insert
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    from server.models import Base, ShoppingItem, ShoppingList
+
+    engine = create_async_engine(database_url)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(insert(ShoppingList), [{"name": f"List {i}"} for i in range(lists)])
+        await conn.execute(insert(ShoppingItem), [
+            {"name": f"Item {i}", "quantity": 1, "is_completed": False, "shopping_list_id": list_id}
+            for list_id in range(1, lists + 1) for i in range(items)
+        ])
+    await engine.dispose()
+
+async def wait_until_ready(base_url: str, workers: int, timeout: float = 60) -> int:
+    """Poll /readyz over fresh connections until every worker's pid has answered 200, return how many did."""
+    pids = set()
+    deadline = time.monotonic() + timeout
+    while len(pids) < workers and time.monotonic() < deadline:
+        try:
+            async with httpx.AsyncClient(base_url=base_url, timeout=5) as client:
+                response = await client.get("/readyz")
+            if response.status_code == 200:
+                pids.add(response.json()["pid"])
+        except httpx.HTTPError:
+            await asyncio.sleep(0.1)
+    if not pids:
+        raise RuntimeError(f"server at {base_url} never became ready")
+    return len(pids)
+
+class Results:
+    def __init__(self):
+        self.latencies = {"write": [], "read_own": [], "read_other": []}
+        self.errors = 0
+        self.stale_reads = 0
+        self.staleness = []
+
+async def client_loop(base_url: str, list_id: int, item_ids: list, lists: int, config: argparse.Namespace, results: Results, stop: asyncio.Event):
+    rng = random.Random(list_id)
+    expected = {}
+    async with httpx.AsyncClient(base_url=base_url, timeout=30) as writer, httpx.AsyncClient(base_url=base_url, timeout=30) as reader:
+        while not stop.is_set():
+            roll = rng.random()
+            start = time.perf_counter()
+            try:
+                if roll < config.write_share:
+                    item_id = rng.choice(item_ids)
+                    response = await writer.patch(f"/shopping-items/{item_id}/toggle")
+                    response.raise_for_status()
+                    expected = {"id": item_id, "is_completed": response.json()["is_completed"], "written": time.perf_counter()}
+                    results.latencies["write"].append(time.perf_counter() - start)
+                elif roll < config.write_share + (1 - config.write_share) / 2:
+                    response = await reader.get(f"/shopping-lists/{list_id}")
+                    response.raise_for_status()
+                    results.latencies["read_own"].append(time.perf_counter() - start)
+                    if expected and not _matches(response.json(), expected):
+                        results.stale_reads += 1
+                        await _wait_for_write(reader, list_id, expected, results)
+                else:
+                    other = rng.randint(1, lists)
+                    if rng.random() < 0.5:
+                        response = await reader.get(f"/shopping-lists/{other}")
+                    else:
+                        response = await reader.get("/shopping-items/", params={"shopping_list_id": other, "limit": 20})
+                    response.raise_for_status()
+                    results.latencies["read_other"].append(time.perf_counter() - start)
+            except httpx.HTTPError:
+                results.errors += 1
+
+def _matches(shopping_list: dict, expected: dict) -> bool:
+    return any(item["id"] == expected["id"] and item["is_completed"] == expected["is_completed"] for item in shopping_list["items"])
+
+async def _wait_for_write(reader: httpx.AsyncClient, list_id: int, expected: dict, results: Results) -> None:
+    """Re-read a stale list until it shows the client's last write, recording how long that took after the write returned."""
+    for _ in range(1000):
+        await asyncio.sleep(0.001)
+        if _matches((await reader.get(f"/shopping-lists/{list_id}")).json(), expected):
+            results.staleness.append(time.perf_counter() - expected["written"])
+            return
+
+async def run_workers(workers: int, database_url: str, config: argparse.Namespace) -> dict:
+    await prepare_database(database_url, config.clients, config.items)
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    env = dict(os.environ, DATABASE_URL=database_url, WEB_CONCURRENCY=str(workers))
+    if config.db_max_connections:
+        env["DB_MAX_CONNECTIONS"] = str(config.db_max_connections)
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "server.main:app", "--host", "127.0.0.1", "--port", str(port), "--workers", str(workers), "--log-level", "warning"],
+        env=env,
+    )
+    try:
+        workers_ready = await wait_until_ready(base_url, workers)
+        results = Results()
+        stop = asyncio.Event()
+        clients = [
+            asyncio.create_task(client_loop(base_url, list_id, list(range((list_id - 1) * config.items + 1, list_id * config.items + 1)), config.clients, config, results, stop))
+            for list_id in range(1, config.clients + 1)
+        ]
+        await asyncio.sleep(config.warmup)
+        for latencies in results.latencies.values():
+            latencies.clear()
+        start = time.perf_counter()
+        await asyncio.sleep(config.duration)
+        elapsed = time.perf_counter() - start
+        stop.set()
+        await asyncio.gather(*clients)
+    finally:
+        server.terminate()
+        server.wait()
+    requests = sum(len(latencies) for latencies in results.latencies.values())
+    return {
+        "workers_ready": workers_ready,
+        "requests_per_s": round(requests / elapsed, 1),
+        "errors": results.errors,
+        **{f"{name}_ms": latency_summary(latencies) for name, latencies in results.latencies.items()},
+        "stale_reads": results.stale_reads,
+        "staleness_ms": latency_summary(results.staleness),
+    }
+
+async def run(config: argparse.Namespace) -> dict:
+    results = {}
+    for workers in config.workers:
+        if config.database_url:
+            results[f"{workers} workers"] = await run_workers(workers, config.database_url, config)
+        else:
+            with tempfile.TemporaryDirectory() as db_dir:
+                results[f"{workers} workers"] = await run_workers(workers, f"sqlite+aiosqlite:///{db_dir}/bench.db", config)
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4], help="worker process counts to compare")
+    parser.add_argument("--clients", type=int, default=32, help="concurrent clients, each owning one list")
+    parser.add_argument("--items", type=int, default=20, help="items per list")
+    parser.add_argument("--write-share", type=float, default=0.1, help="share of requests toggling an item")
+    parser.add_argument("--duration", type=float, default=15, help="seconds measured per worker count")
+    parser.add_argument("--warmup", type=float, default=2, help="seconds of load before measuring")
+    parser.add_argument("--database-url", help="disposable database to use instead of a throwaway SQLite file, its tables are dropped")
+    parser.add_argument("--db-max-connections", type=int, help="DB_MAX_CONNECTIONS for the server, split between the workers")
+    config = parser.parse_args()
+    results = asyncio.run(run(config))
+    print(json.dumps({
+        "config": {**{key: getattr(config, key) for key in ("workers", "clients", "items", "write_share", "duration")}, "database": "postgres" if config.database_url else "sqlite", "cpus": os.cpu_count()},
+        **results,
+    }, indent=2))
+
+if __name__ == "__main__":
+    main()
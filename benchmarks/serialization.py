@@ -0,0 +1,120 @@
+"""Serialization benchmark: hot GET routes on large lists with and without LEAN_SERIALIZATION.
+
+Each mode runs in its own process (the mode is read at import time) against a fresh
+SQLite file seeded with the same lists, with the response cache disabled so every
+request serializes. It times GET /shopping-lists/{id}, GET /shopping-items/ for the
+whole list and GET /shopping-items/{id} in-process, and checks that both modes return
+byte-identical bodies and the same OpenAPI schema (exits non-zero if not):
+
+    uv run python -m benchmarks.serialization --items 1000 10000 50000
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from .common import create_schema, latency_summary
+
+MODES = ("default", "lean")
+
+async def seed(sizes: list) -> None:
+    """One list per size, with fixed timestamps (with and without microseconds) so both modes' data is identical."""
+    from sqlalchemy import insert
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    from server.database import DATABASE_URL
+    from server.models import ShoppingItem, ShoppingList
+
+    created_at = datetime(2025, 1, 1, 12, 0, 0)
+    engine = create_async_engine(DATABASE_URL)
+    async with engine.begin() as conn:
+        await conn.execute(insert(ShoppingList), [
+            {"name": f"List of {size}", "description": "Seeded – größer", "created_at": created_at, "updated_at": created_at} for size in sizes
+        ])
+        for list_id, size in enumerate(sizes, start=1):
+            for start in range(0, size, 10_000):
+                await conn.execute(insert(ShoppingItem), [
+                    {
+                        "name": f"Item {i} \"crème\"", "quantity": i % 5 + 1, "unit": "kg" if i % 4 == 0 else None,
+                        "notes": "bio 🍅" if i % 7 == 0 else None, "is_completed": i % 3 == 0, "shopping_list_id": list_id,
+                        "created_at": created_at, "updated_at": created_at.replace(microsecond=i % 1000 * 1000),
+                    }
+                    for i in range(start, min(start + 10_000, size))
+                ])
+    await engine.dispose()
+
+async def time_route(client, path: str, params: dict, repeat: int) -> dict:
+    latencies = []
+    cpu_start = time.process_time()
+    for _ in range(repeat):
+        start = time.perf_counter()
+        response = await client.get(path, params=params)
+        latencies.append(time.perf_counter() - start)
+        response.raise_for_status()
+    cpu = time.process_time() - cpu_start
+    return {
+        "latency_ms": latency_summary(latencies),
+        "cpu_ms": round(cpu / repeat * 1000, 2),
+        "response_bytes": len(response.content),
+        "sha256": hashlib.sha256(response.content).hexdigest(),
+    }
+
+async def run_mode(config: argparse.Namespace) -> dict:
+    import httpx
+
+    from server.database import dispose_engines
+    from server.main import app
+
+    await create_schema()
+    await seed(config.items)
+
+    results = {}
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=300) as client:
+        openapi = (await client.get("/openapi.json")).content
+        for list_id, size in enumerate(config.items, start=1):
+            results[f"get_shopping_list {size} items"] = await time_route(client, f"/shopping-lists/{list_id}", {}, config.repeat)
+            results[f"get_shopping_items {size} items"] = await time_route(client, "/shopping-items/", {"shopping_list_id": list_id, "limit": size}, config.repeat)
+        results["get_shopping_item"] = await time_route(client, "/shopping-items/1", {}, config.repeat * 10)
+    await dispose_engines()
+    return {"openapi_sha256": hashlib.sha256(openapi).hexdigest(), "routes": results}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, nargs="+", default=[1000, 10000, 50000], help="items per list, one list per size")
+    parser.add_argument("--repeat", type=int, default=10, help="requests per route and list")
+    parser.add_argument("--mode", choices=MODES, help=argparse.SUPPRESS)
+    config = parser.parse_args()
+
+    if config.mode:
+        print(json.dumps(asyncio.run(run_mode(config))))
+        return
+
+    results = {}
+    for mode in MODES:
+        with tempfile.TemporaryDirectory() as db_dir:
+            env = dict(
+                os.environ, DATABASE_URL=f"sqlite+aiosqlite:///{db_dir}/bench.db",
+                LEAN_SERIALIZATION="true" if mode == "lean" else "false", RESPONSE_CACHE_MAX_ENTRIES="0",
+            )
+            output = subprocess.run(
+                [sys.executable, "-m", "benchmarks.serialization", "--mode", mode, "--repeat", str(config.repeat), "--items", *map(str, config.items)],
+                env=env, check=True, capture_output=True, text=True,
+            ).stdout
+            results[mode] = json.loads(output.strip().splitlines()[-1])
+
+    default, lean = results["default"], results["lean"]
+    mismatches = [route for route, result in default["routes"].items() if result["sha256"] != lean["routes"][route]["sha256"]]
+    if default["openapi_sha256"] != lean["openapi_sha256"]:
+        mismatches.append("openapi.json")
+    print(json.dumps({"config": {"items": config.items, "repeat": config.repeat}, "mismatches": mismatches, **results}, indent=2))
+    if mismatches:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Concurrency benchmark: write throughput and latency with and without SQLITE_TUNING.
+
+Each mode runs in its own process (the mode is read at import time) against a fresh
+SQLite file, with many concurrent clients adding and toggling items in-process.
+
+    uv run python -m benchmarks.sqlite_concurrency [--clients 64] [--requests 20]
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from .common import create_schema, percentile
+
+async def run_mode(clients: int, requests: int) -> dict:
+    import httpx
+
+    from server.database import dispose_engines
+    from server.main import app
+
+    await create_schema()
+
+    latencies = []
+    errors = 0
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=60) as client:
+        list_id = (await client.post("/shopping-lists/", json={"name": "Groceries"})).json()["id"]
+
+        async def worker(worker_id: int):
+            nonlocal errors
+            item_id = None
+            for i in range(requests):
+                start = time.perf_counter()
+                try:
+                    if item_id is None or i % 2 == 0:
+                        response = await client.post("/shopping-items/", json={"name": f"item {worker_id}-{i}", "shopping_list_id": list_id})
+                        if response.status_code == 200:
+                            item_id = response.json()["id"]
+                    else:
+                        response = await client.patch(f"/shopping-items/{item_id}/toggle")
+                    if response.status_code != 200:
+                        errors += 1
+                except Exception:
+                    errors += 1
+                latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(worker_id) for worker_id in range(clients)))
+        elapsed = time.perf_counter() - start
+
+    await dispose_engines()
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput_rps": len(latencies) / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, default=64)
+    parser.add_argument("--requests", type=int, default=20, help="requests per client")
+    parser.add_argument("--mode", choices=["default", "tuned"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        print(json.dumps(asyncio.run(run_mode(args.clients, args.requests))))
+        return
+
+    results = {}
+    for mode in ("default", "tuned"):
+        with tempfile.TemporaryDirectory() as db_dir:
+            env = dict(os.environ, DATABASE_URL=f"sqlite+aiosqlite:///{db_dir}/bench.db", SQLITE_TUNING="true" if mode == "tuned" else "false")
+            output = subprocess.run(
+                [sys.executable, "-m", "benchmarks.sqlite_concurrency", "--mode", mode, "--clients", str(args.clients), "--requests", str(args.requests)],
+                env=env, check=True, capture_output=True, text=True,
+            ).stdout
+            results[mode] = json.loads(output.strip().splitlines()[-1])
+
+    print(f"{'mode':<8} {'requests':>9} {'errors':>7} {'req/s':>9} {'p50 ms':>9} {'p99 ms':>9}")
+    for mode, result in results.items():
+        print(f"{mode:<8} {result['requests']:>9} {result['errors']:>7} {result['throughput_rps']:>9.1f} {result['p50_ms']:>9.2f} {result['p99_ms']:>9.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""Startup benchmark: import cost and time to first request of the server and chatbot entry points.
+
+For each entry point, with and without FAST_STARTUP, it starts fresh processes and reports:
+
+- import_ms: `import server.main` / `import chatbot` as timed by `python -X importtime`,
+  with the heaviest modules they import directly
+- first_request_ms: from spawning `uvicorn server.main:app` / `python chatbot.py` until
+  GET /healthz / the Gradio page answers
+
+The MCP manifest FAST_STARTUP reads is written by an unmeasured first run. With
+--no-bytecode-cache each default-mode measurement is also taken with an empty bytecode
+cache, as in a fresh container whose image has no precompiled .pyc files:
+
+    uv run python -m benchmarks.startup --runs 5
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+from .common import latency_summary
+from .load import free_port
+
+ENTRY_POINTS = {
+    "server": {"module": "server.main", "command": [sys.executable, "-m", "uvicorn", "server.main:app", "--host", "127.0.0.1", "--port", "{port}"], "path": "/healthz"},
+    "chatbot": {"module": "chatbot", "command": [sys.executable, "chatbot.py"], "path": "/"},
+}
+
+def import_time(module: str, env: dict) -> tuple:
+    """Cumulative import time of module in ms and its direct imports by cumulative time, from python -X importtime."""
+    stderr = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"], env=env, check=True, capture_output=True, text=True).stderr
+    children = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line or line.endswith("| imported package"):
+            continue
+        _, cumulative, name = line.split("|", 2)
+        if not cumulative.strip().isdigit():
+            continue
+        name = name[1:]
+        depth = (len(name) - len(name.lstrip())) // 2
+        if depth == 0 and name == module:
+            return int(cumulative) / 1000, sorted(children, reverse=True)
+        if depth == 0:
+            children = []
+        elif depth == 1:
+            children.append((int(cumulative) / 1000, name.strip()))
+    raise RuntimeError(f"python -X importtime printed no line for {module}")
+
+def first_request(command: list, path: str, env: dict, timeout: float = 120) -> float:
+    """Seconds from spawning command until GET path on its port answers 200."""
+    port = free_port()
+    env = dict(env, GRADIO_SERVER_PORT=str(port))
+    start = time.perf_counter()
+    process = subprocess.Popen([part.format(port=port) for part in command], env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        with httpx.Client(timeout=5) as client:
+            while time.perf_counter() - start < timeout:
+                if process.poll() is not None:
+                    raise RuntimeError(f"{' '.join(command)} exited with {process.returncode}")
+                try:
+                    if client.get(f"http://127.0.0.1:{port}{path}").status_code == 200:
+                        return time.perf_counter() - start
+                except httpx.HTTPError:
+                    pass
+                time.sleep(0.02)
+        raise RuntimeError(f"{' '.join(command)} didn't answer within {timeout}s")
+    finally:
+        process.terminate()
+        process.wait()
+
+def measure(entry_point: dict, env: dict, runs: int) -> dict:
+    imports, first_requests = [], []
+    for _ in range(runs):
+        elapsed, children = import_time(entry_point["module"], env)
+        imports.append(elapsed / 1000)
+        first_requests.append(first_request(entry_point["command"], entry_point["path"], env))
+    return {
+        "import_ms": latency_summary(imports),
+        "heaviest_imports_ms": {name: round(elapsed, 1) for elapsed, name in children[:5]},
+        "first_request_ms": latency_summary(first_requests),
+    }
+
+def run(config: argparse.Namespace) -> dict:
+    work_dir = tempfile.mkdtemp(prefix="shopping-startup-")
+    base_env = dict(
+        os.environ,
+        DATABASE_URL=f"sqlite+aiosqlite:///{work_dir}/bench.db",
+        CHECKPOINT_DB=f"{work_dir}/checkpoints.db",
+        MCP_MANIFEST_PATH=f"{work_dir}/mcp_manifest.json",
+        GRADIO_ANALYTICS_ENABLED="False",
+    )
+    # The chatbot only checks that a key is set, no model is called before the first message
+    base_env.setdefault("OPENAI_API_KEY", "unused")
+
+    results = {}
+    for name in config.entry_points:
+        entry_point = ENTRY_POINTS[name]
+        results[name] = {}
+        for mode in ("default", "fast_startup"):
+            env = dict(base_env, FAST_STARTUP=str(mode == "fast_startup").lower())
+            if mode == "fast_startup":
+                import_time("server.main", env)
+            results[name][mode] = measure(entry_point, env, config.runs)
+        if config.no_bytecode_cache:
+            # Every process gets an empty cache of its own, so none of them reuses what another one compiled
+            caches = iter(range(1_000_000))
+            env = lambda: dict(base_env, FAST_STARTUP="false", PYTHONPYCACHEPREFIX=f"{work_dir}/pycache-{next(caches)}")
+            results[name]["default_no_bytecode_cache"] = {
+                "import_ms": latency_summary([import_time(entry_point["module"], env())[0] / 1000 for _ in range(config.runs)]),
+                "first_request_ms": latency_summary([first_request(entry_point["command"], entry_point["path"], env()) for _ in range(config.runs)]),
+            }
+    return {"config": {"runs": config.runs, "entry_points": config.entry_points}, **results}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5, help="fresh processes per entry point and mode")
+    parser.add_argument("--entry-points", nargs="+", choices=list(ENTRY_POINTS), default=list(ENTRY_POINTS))
+    parser.add_argument("--no-bytecode-cache", action="store_true", help="also measure the default mode with an empty bytecode cache")
+    config = parser.parse_args()
+    print(json.dumps(run(config), indent=2))
+
+if __name__ == "__main__":
+    main()
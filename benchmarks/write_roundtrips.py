@@ -0,0 +1,85 @@
+"""Micro-benchmark: database round trips and latency per write request.
+
+Counts every statement and COMMIT the app sends to the database while handling one
+request, using a fresh SQLite file and the app running in-process.
+
+    uv run python -m benchmarks.write_roundtrips [--iterations 200]
+
+Run it on two revisions to compare them.
+"""
+import argparse
+import asyncio
+import time
+
+from .common import use_temp_database
+
+use_temp_database()
+
+import httpx
+
+from server.database import dispose_engines
+from server.main import app
+
+from .common import QueryCounter, create_schema
+
+async def main(iterations: int):
+    await create_schema()
+    counter = QueryCounter(include_commits=True)
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        list_id = (await client.post("/shopping-lists/", json={"name": "Groceries"})).json()["id"]
+        # Give the parent list some items so loading it isn't free
+        for i in range(50):
+            await client.post("/shopping-items/", json={"name": f"item {i}", "shopping_list_id": list_id})
+
+        state = {}
+
+        async def create_list():
+            state["list_id"] = (await client.post("/shopping-lists/", json={"name": "Weekend"})).json()["id"]
+
+        async def update_list():
+            await client.put(f"/shopping-lists/{list_id}", json={"description": "Weekly shop"})
+
+        async def create_item():
+            state["item_id"] = (await client.post("/shopping-items/", json={"name": "Basil", "shopping_list_id": list_id})).json()["id"]
+
+        async def update_item():
+            await client.put(f"/shopping-items/{state['item_id']}", json={"quantity": 2})
+
+        async def toggle_item():
+            await client.patch(f"/shopping-items/{state['item_id']}/toggle")
+
+        async def delete_item():
+            await client.delete(f"/shopping-items/{state['item_id']}")
+
+        async def delete_list():
+            await client.delete(f"/shopping-lists/{state['list_id']}")
+
+        scenarios = [
+            ("POST /shopping-lists/", create_list),
+            ("PUT /shopping-lists/{id}", update_list),
+            ("POST /shopping-items/", create_item),
+            ("PUT /shopping-items/{id}", update_item),
+            ("PATCH /shopping-items/{id}/toggle", toggle_item),
+            ("DELETE /shopping-items/{id}", delete_item),
+            ("DELETE /shopping-lists/{id}", delete_list),
+        ]
+        totals = {name: [0, 0.0] for name, _ in scenarios}
+        for _ in range(iterations):
+            for name, scenario in scenarios:
+                counter.count = 0
+                start = time.perf_counter()
+                await scenario()
+                totals[name][0] += counter.count
+                totals[name][1] += time.perf_counter() - start
+
+    print(f"{'request':<36} {'round trips':>12} {'mean ms':>9}")
+    for name, (round_trips, elapsed) in totals.items():
+        print(f"{name:<36} {round_trips / iterations:>12.1f} {elapsed / iterations * 1000:>9.2f}")
+    await dispose_engines()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(main(args.iterations))
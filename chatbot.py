@@ -1,72 +1,290 @@
 import os
-import uuid
 from dotenv import load_dotenv
 import asyncio
-from langchain.chat_models import init_chat_model
-from langchain_mcp_adapters.client import MultiServerMCPClient
+import logging
+import threading
+import time
+from concurrent.futures import Future
+from functools import wraps
+from weakref import WeakValueDictionary
+from langchain_core.messages import HumanMessage, RemoveMessage, SystemMessage
+from langchain_core.messages.utils import count_tokens_approximately, trim_messages
+from langgraph.config import get_config
+from langgraph.graph import END, START, MessagesState, StateGraph
+from langgraph.graph.message import REMOVE_ALL_MESSAGES
 from langgraph.prebuilt import create_react_agent
-import gradio as gr
+
+from intent_router import RouterStats, fast_path_node, router_stats
+
+# gradio, the chat model's provider package and the MCP client are imported where they are used:
+# together they take seconds to import and the agent itself (create_agent, stream_agent_reply) needs none of them
 
 load_dotenv()
 
-if not os.getenv("OPENAI_API_KEY"):
-    raise ValueError("Must provide OPENAI_API_KEY environment variable")
+logger = logging.getLogger(__name__)
 
+# Conversations are checkpointed here, one thread per Gradio session
+CHECKPOINT_DB = os.getenv("CHECKPOINT_DB", "chat_checkpoints.db")
 
-llm = init_chat_model(model="gpt-4.1-mini", model_provider="openai")
+# How to keep the model's context bounded as a conversation grows:
+#   trim      - send only the most recent messages that fit in CHAT_HISTORY_MAX_TOKENS (the checkpoint keeps everything)
+#   summarize - once over CHAT_HISTORY_MAX_TOKENS, replace the older messages in the checkpoint with a summary
+#   none      - send the whole conversation every turn
+CHAT_HISTORY_POLICY = os.getenv("CHAT_HISTORY_POLICY", "trim")
+CHAT_HISTORY_MAX_TOKENS = int(os.getenv("CHAT_HISTORY_MAX_TOKENS", "4000"))
 
-async def chatbot():
-    """Create a LangGraph React agent with tools."""
-    mcp_client = MultiServerMCPClient(
-        {
-            "ShoppingList": {
-                "url": "http://localhost:8000/mcp",
-                "transport": "sse",
-            }
-        }
+# The shopping list MCP server, reached through a pool of long-lived sessions over sse or streamable_http,
+# or memory to run server.main in this process and call its MCP server without sockets
+MCP_SERVER_URL = os.getenv("MCP_SERVER_URL", "http://localhost:8000")
+MCP_TRANSPORT = os.getenv("MCP_TRANSPORT", "sse")
+MCP_POOL_SIZE = int(os.getenv("MCP_POOL_SIZE", "2"))
+MCP_KEEPALIVE = float(os.getenv("MCP_KEEPALIVE", "30"))
+
+# The tool calls of a model turn run at the same time, at most this many at once per conversation
+TOOL_CONCURRENCY = int(os.getenv("TOOL_CONCURRENCY", "4"))
+
+# Cold-start budget mode: serve the UI first and load the chat model and MCP client in the background,
+# a message arriving before they are loaded waits for them
+FAST_STARTUP = os.getenv("FAST_STARTUP", "false").lower() in ("1", "true", "yes")
+
+# Answer formulaic commands ("I need to buy X", "Remove X", ...) by calling the tools directly, without the model
+INTENT_FAST_PATH = os.getenv("INTENT_FAST_PATH", "true").lower() in ("1", "true", "yes")
+
+PROMPT = """
+You're a helpful assistant that let's users manage their shopping list using the ShoppingList tool.
+To find an item by name, use search_shopping_items instead of reading the whole list.
+Plan before calling tools: when a request involves several items, make every call that doesn't need another call's result
+in the same turn (e.g. create all new items and look up all items to change at once), then make the calls that needed those results together in the next turn.
+"""
+
+SUMMARY_PROMPT = "Summarize the conversation above in a few sentences. Keep every shopping list, item and quantity that was mentioned."
+
+def _recent_messages(messages, max_tokens: int):
+    # Starting on a human message keeps tool results together with the AI message that called them
+    return trim_messages(
+        messages, max_tokens=max_tokens, strategy="last", token_counter=count_tokens_approximately,
+        start_on="human", end_on=("human", "tool"), include_system=True,
     )
-    tools = await mcp_client.get_tools()
-    prompt = """
-    You're a helpful assistant that let's users manage their shopping list using the ShoppingList tool.
+
+def history_hook(summary_llm, policy: str = CHAT_HISTORY_POLICY, max_tokens: int = CHAT_HISTORY_MAX_TOKENS):
+    """The pre-model hook implementing the history policy, or None for no limit."""
+    if policy == "none":
+        return None
+
+    if policy == "trim":
+        def trim_history(state):
+            return {"llm_input_messages": _recent_messages(state["messages"], max_tokens)}
+        return trim_history
+
+    if policy == "summarize":
+        async def summarize_history(state):
+            messages = state["messages"]
+            if count_tokens_approximately(messages) <= max_tokens:
+                return {}
+            recent = _recent_messages(messages, max_tokens // 2)
+            older = messages[:len(messages) - len(recent)]
+            if not older:
+                return {}
+            summary = await summary_llm.ainvoke(older + [HumanMessage(SUMMARY_PROMPT)])
+            return {
+                "messages": [
+                    RemoveMessage(id=REMOVE_ALL_MESSAGES),
+                    SystemMessage(f"Summary of the earlier conversation: {summary.content}"),
+                    *recent,
+                ]
+            }
+        return summarize_history
+
+    raise ValueError(f"Unknown CHAT_HISTORY_POLICY {policy!r}, expected trim, summarize or none")
+
+# Progress shown while a tool runs, keyed by the verb its MCP tool name starts with
+TOOL_VERBS = {"create": "Adding", "update": "Updating", "toggle": "Checking off", "delete": "Removing", "get": "Looking up"}
+
+def describe_tool_call(name: str, args: dict) -> str:
+    verb, _, subject = name.partition("_")
+    target = args.get("name") or subject.replace("_", " ")
+    return f"{TOOL_VERBS.get(verb, 'Running')} {target}…"
+
+async def stream_agent_reply(agent, message: str, thread_id: str, stats: RouterStats = router_stats):
+    """Run one turn of the agent, yielding the reply so far (tool progress plus the answer) after every token and tool event.
+
+    Records in stats whether the intent fast path answered the turn and how long it took.
     """
-    
-    # Create the React agent
-    agent = create_react_agent(llm, tools, prompt=prompt)
-    thread_id = str(uuid.uuid4())
+    import gradio as gr
+
+    progress = {}
+    answer = ""
+    intent = None
+    agent_input = {"messages": [{"role": "user", "content": message}]}
     config = {"configurable": {"thread_id": thread_id}}
-    
-
-    async def chat_with_agent(message, history):
-        """Chat function that interfaces with the LangGraph agent."""
-        
-        # Prepare the input for the agent
-        agent_input = {
-            "messages": history + [{"role": "user", "content": message}]
-        }
-        
-        # Run the agent
-        result = await agent.ainvoke(agent_input, config)
-        
-        agent_response = result["messages"][-1].content
-        return agent_response
-
-    """Create and return the Gradio chat interface."""
-    # Create the chat interface
-    chat_interface = gr.ChatInterface(
-        fn=chat_with_agent,
-        title="🤖 Shopping List Agent",
-        description="Chat with an AI agent that can manage your shopping list.",
-        examples=[
-            "I need to buy a watermelon",
-            "What's in my shopping list?",
-            "Let's add spaghetti and tomato sauce",
-            "I just bought the watermelon",
-            "Remove the tomato sauce",
-            "I need an extra spaghetti",
-        ],
-        type="messages", 
-    )
-    chat_interface.launch()
+    start = time.perf_counter()
+
+    def reply():
+        return list(progress.values()) + ([gr.ChatMessage(content=answer)] if answer else [])
+
+    async for event in agent.astream_events(agent_input, config, version="v2"):
+        kind = event["event"]
+        # Only the agent node's tokens are the answer, a summarizing pre-model hook streams too
+        if kind == "on_chat_model_stream" and event["metadata"].get("langgraph_node") == "agent":
+            token = event["data"]["chunk"].content
+            if token:
+                answer += token
+                yield reply()
+        elif kind == "on_tool_start":
+            progress[event["run_id"]] = gr.ChatMessage(
+                content="", metadata={"title": describe_tool_call(event["name"], event["data"].get("input") or {}), "status": "pending"},
+            )
+            yield reply()
+        elif kind == "on_tool_end" and event["run_id"] in progress:
+            progress[event["run_id"]].metadata["status"] = "done"
+            yield reply()
+        elif kind == "on_chain_end" and event["name"] == "fast_path" and (event["data"].get("output") or {}).get("messages"):
+            last = event["data"]["output"]["messages"][-1]
+            intent = last.response_metadata["intent"]
+            answer = last.content
+            yield reply()
+
+    stats.record(intent, time.perf_counter() - start)
+    logger.info("Intent fast path: %s", stats.summary())
+
+def limit_concurrency(tools, max_concurrency: int = TOOL_CONCURRENCY):
+    """Copies of the tools that run at most max_concurrency calls at once per conversation.
+
+    A conversation runs one turn at a time, so this caps the calls of the turn being run without making other
+    conversations' calls wait. Conversations are told apart by the thread_id of the config the tools run with.
+    """
+    # A conversation's semaphore lives only as long as one of its calls holds on to it
+    semaphores = WeakValueDictionary()
+
+    def limited(coroutine):
+        # wraps keeps the signature the tool inspects to decide which arguments to pass
+        @wraps(coroutine)
+        async def run(*args, **kwargs):
+            try:
+                thread_id = get_config().get("configurable", {}).get("thread_id")
+            except RuntimeError:
+                thread_id = None
+            semaphore = semaphores.get(thread_id)
+            if semaphore is None:
+                semaphore = semaphores[thread_id] = asyncio.Semaphore(max(1, max_concurrency))
+            async with semaphore:
+                return await coroutine(*args, **kwargs)
+        return run
+
+    return [tool.model_copy(update={"coroutine": limited(tool.coroutine)}) if getattr(tool, "coroutine", None) else tool for tool in tools]
+
+def create_agent(
+    llm, tools, checkpointer, summary_llm=None, policy: str = CHAT_HISTORY_POLICY, max_tokens: int = CHAT_HISTORY_MAX_TOKENS,
+    fast_path: bool = INTENT_FAST_PATH, tool_concurrency: int = TOOL_CONCURRENCY,
+):
+    """Create the React agent, persisting its state in checkpointer.
+
+    The tool calls of one model turn run concurrently, up to tool_concurrency at a time per conversation.
+    With fast_path, a router node in front of the agent answers formulaic commands itself and hands everything else to the agent.
+    """
+    def build_react_agent(**kwargs):
+        return create_react_agent(
+            llm.bind_tools(tools, parallel_tool_calls=True), limit_concurrency(tools, tool_concurrency),
+            prompt=PROMPT, pre_model_hook=history_hook(summary_llm or llm, policy, max_tokens), **kwargs,
+        )
+
+    if not fast_path:
+        return build_react_agent(checkpointer=checkpointer)
+
+    react_agent = build_react_agent()
+
+    async def run_agent(state):
+        result = await react_agent.ainvoke(state)
+        # The agent's messages replace the conversation, so that a summarizing history hook's removals stick
+        return {"messages": [RemoveMessage(id=REMOVE_ALL_MESSAGES), *result["messages"]]}
+
+    def route(state):
+        return END if state["messages"][-1].type == "ai" else "react_agent"
+
+    graph = StateGraph(MessagesState)
+    graph.add_node("fast_path", fast_path_node(tools))
+    graph.add_node("react_agent", run_agent)
+    graph.add_edge(START, "fast_path")
+    graph.add_conditional_edges("fast_path", route, ["react_agent", END])
+    graph.add_edge("react_agent", END)
+    return graph.compile(checkpointer=checkpointer)
+
+def load_model_and_tools():
+    """The chat model and the MCP session pool (not connected yet), importing their libraries and, for the memory transport, server.main."""
+    from langchain.chat_models import init_chat_model
+    from mcp_pool import MCPSessionPool
+
+    llm = init_chat_model(model="gpt-4.1-mini", model_provider="openai")
+    mcp_server = None
+    if MCP_TRANSPORT == "memory":
+        from server.main import mcp
+        mcp_server = mcp.server
+    return llm, MCPSessionPool(MCP_SERVER_URL, transport=MCP_TRANSPORT, size=MCP_POOL_SIZE, keepalive=MCP_KEEPALIVE, server=mcp_server)
+
+async def chatbot():
+    """Create a LangGraph React agent with tools."""
+    if not os.getenv("OPENAI_API_KEY"):
+        raise ValueError("Must provide OPENAI_API_KEY environment variable")
+
+    import gradio as gr
+    from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+
+    loaded = Future()
+
+    def load():
+        try:
+            loaded.set_result(load_model_and_tools())
+        except Exception as e:
+            loaded.set_exception(e)
+
+    if not FAST_STARTUP:
+        load()
+        loaded.result()
+
+    async with AsyncSqliteSaver.from_conn_string(CHECKPOINT_DB) as checkpointer:
+        # Create the React agent, again whenever the server's tool list changes
+        agents = {}
+
+        async def current_agent():
+            llm, mcp_pool = await asyncio.wrap_future(loaded)
+            # Gradio calls chat_with_agent on its own event loop, the pool's sessions have to live on that loop
+            await mcp_pool.start()
+            tools = await mcp_pool.get_tools()
+            if mcp_pool.catalog_version not in agents:
+                agents.clear()
+                agents[mcp_pool.catalog_version] = create_agent(llm, tools, checkpointer)
+            return agents[mcp_pool.catalog_version]
+
+        async def chat_with_agent(message, history, request: gr.Request):
+            """Chat function that interfaces with the LangGraph agent, streaming its reply."""
+            # The checkpointer already has the conversation so far, only the new message is sent
+            async for reply in stream_agent_reply(await current_agent(), message, request.session_hash):
+                yield reply
+
+        """Create and return the Gradio chat interface."""
+        # Create the chat interface
+        chat_interface = gr.ChatInterface(
+            fn=chat_with_agent,
+            title="🤖 Shopping List Agent",
+            description="Chat with an AI agent that can manage your shopping list.",
+            examples=[
+                "I need to buy a watermelon",
+                "What's in my shopping list?",
+                "Let's add spaghetti and tomato sauce",
+                "I just bought the watermelon",
+                "Remove the tomato sauce",
+                "I need an extra spaghetti",
+            ],
+            type="messages",
+        )
+        if FAST_STARTUP:
+            chat_interface.launch(prevent_thread_lock=True)
+            threading.Thread(target=load, daemon=True).start()
+            chat_interface.block_thread()
+        else:
+            chat_interface.launch()
 
 if __name__ == "__main__":
+    logging.basicConfig()
+    logger.setLevel(logging.INFO)
     asyncio.run(chatbot())
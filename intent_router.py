@@ -0,0 +1,244 @@
+"""Deterministic fast path for formulaic shopping list commands.
+
+"I need to buy X", "I just bought X", "Remove X" and "What's in my shopping list?" are
+matched against a fixed set of patterns and carried out by calling the MCP tools
+directly, without asking the model. Anything the patterns don't match with certainty
+(several items, pronouns, "an extra X", idioms like "I need a break", more than one list,
+an item name that matches zero or several items, ...) is left to the agent.
+"""
+import json
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+from uuid import uuid4
+
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+
+# Fillers stripped from both ends of an utterance before matching
+_LEADING_FILLER = re.compile(r"^(?:(?:ok|okay|hey|hi|so|and|also|oh|please)\b[,\s]*)+")
+_TRAILING_FILLER = re.compile(r"[\s,]*(?:please|thanks|thank you)?[\s.!?]*$")
+
+_LIST = r"(?:my|the|our) (?:shopping )?list"
+
+# Patterns per intent, the first full match wins
+INTENT_PATTERNS = {
+    "show": [
+        rf"(?:what's|whats|what is) (?:in|on) {_LIST}",
+        rf"(?:show|list|read) (?:me )?{_LIST}",
+        r"what do (?:i|we) (?:still )?need(?: to buy)?",
+    ],
+    "add": [
+        rf"(?:i|we) (?:need|have|want) to (?:buy|get) (?P<item>.+?)(?: (?:to|on) {_LIST})?",
+        rf"(?:i|we) need (?P<item>.+?)(?: (?:to|on) {_LIST})?",
+        rf"(?:let's |lets )?(?:add|put) (?P<item>.+?)(?: (?:to|on) {_LIST})?",
+    ],
+    "bought": [
+        r"(?:i|we) (?:just |already )?(?:bought|got|picked up|grabbed) (?P<item>.+?)",
+        rf"(?:check|tick|cross) (?P<item>.+?) off(?: {_LIST})?",
+        rf"(?:check|tick|cross) off (?P<item>.+?)(?: (?:on|from) {_LIST})?",
+        r"mark (?P<item>.+?) as (?:done|bought|completed|purchased)",
+    ],
+    "remove": [
+        rf"(?:remove|delete|drop) (?P<item>.+?)(?: (?:from|off) {_LIST})?",
+        rf"take (?P<item>.+?) (?:off|from) {_LIST}",
+    ],
+}
+_COMPILED = {intent: [re.compile(pattern) for pattern in patterns] for intent, patterns in INTENT_PATTERNS.items()}
+
+_NUMBERS = {"one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6, "seven": 7, "eight": 8, "nine": 9, "ten": 10, "a couple of": 2}
+_QUANTITY = re.compile(rf"^(?P<quantity>\d+|{'|'.join(_NUMBERS)}) (?P<item>.+)$")
+_ARTICLE = re.compile(r"^(?:a|an|the|some|my|our) ")
+# Items containing any of these words need the model: several items, pronouns, relative amounts, vague nouns
+_AMBIGUOUS = re.compile(
+    r"\b(?:and|or|with|without|but|to|for|from|it|them|that|this|those|these|everything|all|list|item|items|extra|more|another|other"
+    r"|less|fewer|instead|usual|help|something|anything|nothing|stuff|things)\b|[,;&/]"
+)
+# An item is a noun phrase: a verb particle or preposition ("rid of", "kettle on", "get going", "got home") means
+# the words after the verb are an idiom or a sentence, and so do nouns no shopping list holds ("a break", "a problem")
+_NOT_A_NOUN_PHRASE = re.compile(
+    r"\b(?:of|on|off|in|into|at|by|up|out|down|away|over|back|about|around|through|here|there|home|going|rid|ready|done|lost"
+    r"|you|me|him|her|us|break|minute|moment|second|sec|while|rest|sleep|nap|time|chance|problem|question|idea|hand|word|lift|ride)\b"
+)
+MAX_ITEM_WORDS = 4
+
+@dataclass
+class Intent:
+    name: str
+    item: Optional[str] = None
+    quantity: int = 1
+
+def _normalize(message: str) -> str:
+    text = " ".join(message.lower().replace("’", "'").split())
+    text = _LEADING_FILLER.sub("", text)
+    return _TRAILING_FILLER.sub("", text)
+
+def _parse_item(text: str) -> Optional[tuple]:
+    quantity = 1
+    match = _QUANTITY.match(text)
+    if match:
+        quantity = int(match["quantity"]) if match["quantity"].isdigit() else _NUMBERS[match["quantity"]]
+        text = match["item"]
+    text = _ARTICLE.sub("", text)
+    if not text or _AMBIGUOUS.search(text) or _NOT_A_NOUN_PHRASE.search(text) or re.search(r"\d", text) or len(text.split()) > MAX_ITEM_WORDS:
+        return None
+    return text, quantity
+
+def parse_intent(message: str) -> Optional[Intent]:
+    """The intent of message if it is one of the formulaic commands, None otherwise."""
+    text = _normalize(message)
+    for name, patterns in _COMPILED.items():
+        for pattern in patterns:
+            match = pattern.fullmatch(text)
+            if match is None:
+                continue
+            if "item" not in pattern.groupindex:
+                return Intent(name)
+            parsed = _parse_item(match["item"])
+            if parsed is None:
+                return None
+            item, quantity = parsed
+            # Only adding says how many
+            if quantity != 1 and name != "add":
+                return None
+            return Intent(name, item, quantity)
+    return None
+
+def _singular(name: str) -> str:
+    name = name.lower().strip()
+    if name.endswith("ies"):
+        return name[:-3] + "y"
+    if name.endswith(("ches", "shes", "sses", "xes", "oes")):
+        return name[:-2]
+    if name.endswith("s") and not name.endswith("ss"):
+        return name[:-1]
+    return name
+
+def _matching_items(items: List[dict], name: str) -> List[dict]:
+    return [item for item in items if _singular(item["name"]) == _singular(name)]
+
+class _Fallback(Exception):
+    """The fast path can't handle the request with certainty."""
+
+class _ToolRunner:
+    """Calls tools the way the agent would, keeping the tool call and result messages for the conversation."""
+
+    def __init__(self, tools: Dict[str, object]):
+        self.tools = tools
+        self.messages = []
+
+    async def __call__(self, name: str, args: dict):
+        if name not in self.tools:
+            raise _Fallback(f"no {name} tool")
+        call = {"name": name, "args": args, "id": f"call_fast_{uuid4().hex[:16]}", "type": "tool_call"}
+        try:
+            result: ToolMessage = await self.tools[name].ainvoke(call)
+            content = json.loads(result.content)
+        except Exception as e:
+            raise _Fallback(str(e))
+        self.messages += [AIMessage(content="", tool_calls=[call]), result]
+        return content
+
+async def _only_list(run: _ToolRunner) -> dict:
+    page = await run("get_shopping_lists", {"limit": 2})
+    if len(page["items"]) != 1:
+        raise _Fallback("not exactly one shopping list")
+    return page["items"][0]
+
+async def _find_items(run: _ToolRunner, shopping_list: dict, name: str, is_completed: Optional[bool] = None) -> List[dict]:
+    """The list's items named name, looked up with the search tool rather than reading the whole list."""
+    args = {"shopping_list_id": shopping_list["id"], "q": name, "limit": 10}
+    if is_completed is not None:
+        args["is_completed"] = is_completed
+    return _matching_items(await run("search_shopping_items", args), name)
+
+def _format_item(item: dict) -> str:
+    quantity = f"{item['quantity']} {item['unit'] + ' ' if item.get('unit') else ''}× " if item["quantity"] != 1 or item.get("unit") else ""
+    return f"- {quantity}{item['name']}{' ✓' if item['is_completed'] else ''}"
+
+async def _show(run: _ToolRunner, intent: Intent) -> str:
+    shopping_list = await run("get_shopping_list", {"shopping_list_id": (await _only_list(run))["id"]})
+    if not shopping_list["items"]:
+        return f"Your {shopping_list['name']} list is empty."
+    return f"Here's your {shopping_list['name']} list:\n" + "\n".join(_format_item(item) for item in shopping_list["items"])
+
+async def _add(run: _ToolRunner, intent: Intent) -> str:
+    shopping_list = await _only_list(run)
+    # Already there: more of it, or a mistake? Let the model decide
+    if await _find_items(run, shopping_list, intent.item):
+        raise _Fallback(f"{intent.item} is already on the list")
+    item = await run("create_shopping_item", {"name": intent.item, "quantity": intent.quantity, "shopping_list_id": shopping_list["id"]})
+    amount = f"{item['quantity']} " if item["quantity"] != 1 else ""
+    return f"Added {amount}{item['name']} to your {shopping_list['name']} list."
+
+async def _bought(run: _ToolRunner, intent: Intent) -> str:
+    shopping_list = await _only_list(run)
+    matches = await _find_items(run, shopping_list, intent.item, is_completed=False)
+    if len(matches) != 1:
+        raise _Fallback(f"{len(matches)} open items named {intent.item}")
+    item = await run("toggle_item_completion", {"item_id": matches[0]["id"]})
+    return f"Checked off {item['name']} on your {shopping_list['name']} list."
+
+async def _remove(run: _ToolRunner, intent: Intent) -> str:
+    shopping_list = await _only_list(run)
+    matches = await _find_items(run, shopping_list, intent.item)
+    if len(matches) != 1:
+        raise _Fallback(f"{len(matches)} items named {intent.item}")
+    await run("delete_shopping_item", {"item_id": matches[0]["id"]})
+    return f"Removed {matches[0]['name']} from your {shopping_list['name']} list."
+
+HANDLERS = {"show": _show, "add": _add, "bought": _bought, "remove": _remove}
+
+def fast_path_node(tools: list):
+    """The graph node that handles a formulaic last message itself, adding the tool calls and the reply.
+
+    Returns no update when the agent has to take over.
+    """
+    tools_by_name = {tool.name: tool for tool in tools}
+
+    async def fast_path(state):
+        message = state["messages"][-1]
+        intent = parse_intent(message.content) if isinstance(message, HumanMessage) and isinstance(message.content, str) else None
+        if intent is None:
+            return {}
+        run = _ToolRunner(tools_by_name)
+        try:
+            reply = await HANDLERS[intent.name](run, intent)
+        except _Fallback:
+            return {}
+        return {"messages": run.messages + [AIMessage(content=reply, response_metadata={"intent": intent.name})]}
+
+    return fast_path
+
+@dataclass
+class RouterStats:
+    """How many turns the fast path answered and how much time that saved compared to the agent."""
+    hits: Dict[str, int] = field(default_factory=dict)
+    misses: int = 0
+    hit_seconds: float = 0.0
+    miss_seconds: float = 0.0
+
+    def record(self, intent: Optional[str], seconds: float) -> None:
+        if intent is None:
+            self.misses += 1
+            self.miss_seconds += seconds
+        else:
+            self.hits[intent] = self.hits.get(intent, 0) + 1
+            self.hit_seconds += seconds
+
+    def summary(self) -> dict:
+        hits = sum(self.hits.values())
+        turns = hits + self.misses
+        hit_ms = self.hit_seconds / hits * 1000 if hits else None
+        miss_ms = self.miss_seconds / self.misses * 1000 if self.misses else None
+        # Estimated as if every fast path turn had taken as long as an average agent turn
+        saved_ms = (miss_ms - hit_ms) * hits if hits and self.misses else None
+        return {
+            "turns": turns,
+            "hit_rate": round(hits / turns, 3) if turns else None,
+            "hits": dict(self.hits),
+            "fast_path_turn_ms": round(hit_ms, 1) if hit_ms is not None else None,
+            "agent_turn_ms": round(miss_ms, 1) if miss_ms is not None else None,
+            "latency_saved_ms": round(saved_ms, 1) if saved_ms is not None else None,
+        }
+
+router_stats = RouterStats()
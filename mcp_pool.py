@@ -0,0 +1,240 @@
+"""Long-lived, pooled MCP client sessions with a cached tool catalog.
+
+MultiServerMCPClient.get_tools() returns tools that open a new session (connect +
+initialize handshake) for every call. MCPSessionPool keeps a few sessions open instead,
+pings them to keep them alive, reconnects them with backoff when the server goes away
+and lists the server's tools again only when they may have changed: on reconnect and
+when the server sends a tools/list_changed notification.
+
+With the memory transport the sessions talk to an mcp Server object in the same process
+over in-memory streams, without any sockets.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+from contextlib import AsyncExitStack, asynccontextmanager
+from datetime import timedelta
+from functools import partial
+from itertools import count
+from typing import Any, Dict, List, Optional
+
+import anyio
+import httpx
+from langchain_core.tools import BaseTool
+from langchain_mcp_adapters.tools import convert_mcp_tool_to_langchain_tool
+from mcp import ClientSession, McpError, types
+from mcp.client.sse import sse_client
+from mcp.client.streamable_http import streamablehttp_client
+from mcp.server import Server
+from mcp.shared.memory import create_client_server_memory_streams
+
+logger = logging.getLogger(__name__)
+
+# Path of the MCP endpoint per transport, relative to the server's base URL
+TRANSPORT_PATHS = {"sse": "/mcp", "streamable_http": "/mcp-http/"}
+TRANSPORTS = (*TRANSPORT_PATHS, "memory")
+
+# Failures that mean a request never left the client, so it is safe to send it again on another session
+_NOT_SENT_ERRORS = (anyio.ClosedResourceError, anyio.BrokenResourceError, anyio.EndOfStream)
+
+@asynccontextmanager
+async def memory_streams(server: Server):
+    """Client read/write streams to server, which runs in a background task until the context exits."""
+    async with create_client_server_memory_streams() as (client_streams, (server_read, server_write)):
+        async with anyio.create_task_group() as tg:
+            tg.start_soon(lambda: server.run(server_read, server_write, server.create_initialization_options(), raise_exceptions=False))
+            try:
+                yield client_streams
+            finally:
+                tg.cancel_scope.cancel()
+
+class _Connection:
+    """One connected session of the pool, and whether and how it was lost."""
+
+    def __init__(self):
+        self.session: Optional[ClientSession] = None
+        self.lost = asyncio.Event()
+        # Set when the server refused a request for not knowing the session (it restarted), so it ran none of them
+        self.rejected = False
+
+class MCPSessionPool:
+    """A fixed number of MCP sessions to one server, shared by every caller.
+
+    Calls are spread round-robin over the connected sessions, a session multiplexes
+    concurrent requests. Each session is owned by its own task, which keeps it alive
+    with pings and reconnects it when it breaks. The memory transport needs the
+    in-process server instead of a base_url.
+    """
+
+    def __init__(
+        self, base_url: Optional[str] = None, transport: str = "sse", size: int = 2, keepalive: float = 30.0,
+        call_timeout: float = 30.0, max_reconnect_delay: float = 10.0, server: Optional[Server] = None,
+    ):
+        if transport not in TRANSPORTS:
+            raise ValueError(f"Unknown MCP transport {transport!r}, expected one of {', '.join(TRANSPORTS)}")
+        if (transport == "memory") != (server is not None):
+            raise ValueError("The memory transport, and only it, needs a server")
+        self.url = f"memory://{server.name}" if transport == "memory" else base_url.rstrip("/") + TRANSPORT_PATHS[transport]
+        self.transport = transport
+        self.server = server
+        self.size = size
+        self.keepalive = keepalive
+        self.call_timeout = call_timeout
+        self.max_reconnect_delay = max_reconnect_delay
+        self.catalog_version = 0
+        self._connections: List[Optional[_Connection]] = [None] * size
+        self._connected = asyncio.Event()
+        self._next = count()
+        self._tasks: List[asyncio.Task] = []
+        self._tools: List[BaseTool] = []
+        self._fingerprint: Optional[str] = None
+        self._tools_stale = True
+        self._tools_lock = asyncio.Lock()
+
+    async def __aenter__(self) -> "MCPSessionPool":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def start(self) -> None:
+        """Open the sessions and load the tool catalog, if not done already."""
+        if not self._tasks:
+            self._tasks = [asyncio.create_task(self._maintain(slot)) for slot in range(self.size)]
+        await self.get_tools()
+
+    async def close(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def _open(self, stack: AsyncExitStack, connection: _Connection):
+        if self.transport == "memory":
+            return stack.enter_async_context(memory_streams(self.server))
+        if self.transport == "sse":
+            return stack.enter_async_context(sse_client(self.url))
+        return stack.enter_async_context(streamablehttp_client(self.url, httpx_client_factory=partial(self._http_client, connection)))
+
+    @staticmethod
+    def _http_client(connection: _Connection, headers=None, timeout=None, auth=None) -> httpx.AsyncClient:
+        """The Streamable HTTP transport's client, noting when the server refuses the session's requests."""
+        async def on_response(response: httpx.Response) -> None:
+            if response.request.method == "POST" and response.status_code in (400, 404) and "mcp-session-id" in response.request.headers:
+                connection.rejected = True
+
+        return httpx.AsyncClient(
+            headers=headers, timeout=timeout or httpx.Timeout(30), auth=auth, follow_redirects=True, event_hooks={"response": [on_response]},
+        )
+
+    async def _maintain(self, slot: int) -> None:
+        """Keep the session in slot connected until the pool is closed."""
+        delay = 0.1
+        while True:
+            connection = _Connection()
+            try:
+                async with AsyncExitStack() as stack:
+                    read, write, *_ = await self._open(stack, connection)
+                    connection.session = await stack.enter_async_context(ClientSession(
+                        read, write, read_timeout_seconds=timedelta(seconds=self.call_timeout), message_handler=partial(self._on_message, connection),
+                    ))
+                    await connection.session.initialize()
+                    self._connections[slot] = connection
+                    self._connected.set()
+                    delay = 0.1
+                    while not connection.lost.is_set():
+                        try:
+                            await asyncio.wait_for(connection.lost.wait(), self.keepalive)
+                        except asyncio.TimeoutError:
+                            await connection.session.send_ping()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("MCP session %d to %s lost, reconnecting in %.1fs: %s", slot, self.url, delay, e)
+            finally:
+                # Wakes up the calls still waiting for a response on this session
+                connection.lost.set()
+                self._connections[slot] = None
+                if not any(self._connections):
+                    self._connected.clear()
+                # The server may have restarted with different tools
+                self._tools_stale = True
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.max_reconnect_delay)
+
+    async def _on_message(self, connection: _Connection, message) -> None:
+        if isinstance(message, Exception):
+            # The transport broke (e.g. the SSE stream ended with the server): reconnect now, not at the next ping
+            connection.lost.set()
+        elif isinstance(message, types.ServerNotification) and isinstance(message.root, types.ToolListChangedNotification):
+            self._tools_stale = True
+
+    async def _session(self) -> _Connection:
+        """A connected session, waiting for one if they are all reconnecting."""
+        while True:
+            for _ in range(self.size):
+                connection = self._connections[next(self._next) % self.size]
+                if connection is not None and not connection.lost.is_set():
+                    return connection
+            self._connected.clear()
+            await asyncio.wait_for(self._connected.wait(), self.call_timeout)
+
+    async def call_tool(self, name: str, arguments: Dict[str, Any]) -> types.CallToolResult:
+        rejections = 0
+        while True:
+            connection = await self._session()
+            # A session whose transport fails may never answer, so the call also ends when the session is lost
+            call = asyncio.ensure_future(connection.session.call_tool(name, arguments))
+            lost = asyncio.ensure_future(connection.lost.wait())
+            try:
+                await asyncio.wait((call, lost), return_when=asyncio.FIRST_COMPLETED)
+            finally:
+                lost.cancel()
+                if not call.done():
+                    call.cancel()
+                    await asyncio.gather(call, return_exceptions=True)
+            if call.cancelled():
+                if connection.rejected and rejections < self.size:
+                    # The server restarted and refused the request without running it: send it on a reconnected session
+                    rejections += 1
+                    continue
+                raise McpError(types.ErrorData(code=types.CONNECTION_CLOSED, message="Connection closed"))
+            try:
+                return call.result()
+            except _NOT_SENT_ERRORS:
+                # The request never reached the server: retire the session and send it on another one,
+                # once every session is retired this waits for a reconnect
+                connection.lost.set()
+
+    async def get_tools(self) -> List[BaseTool]:
+        """The server's tools as LangChain tools, listed again only when they may have changed."""
+        if not self._tools_stale:
+            return self._tools
+        async with self._tools_lock:
+            if not self._tools_stale:
+                return self._tools
+            session = (await self._session()).session
+            # Cleared before listing so a tools/list_changed arriving meanwhile marks the result stale again
+            self._tools_stale = False
+            tools = []
+            cursor = None
+            try:
+                while True:
+                    page = await session.list_tools(cursor=cursor)
+                    tools.extend(page.tools)
+                    cursor = page.nextCursor
+                    if cursor is None:
+                        break
+            except BaseException:
+                self._tools_stale = True
+                raise
+            fingerprint = hashlib.sha256(json.dumps([tool.model_dump(mode="json") for tool in tools], sort_keys=True).encode()).hexdigest()
+            if fingerprint != self._fingerprint:
+                # The pool stands in for the session: the converted tools only call its call_tool()
+                self._tools = [convert_mcp_tool_to_langchain_tool(self, tool) for tool in tools]
+                self._fingerprint = fingerprint
+                self.catalog_version += 1
+                logger.info("Loaded %d MCP tools from %s", len(self._tools), self.url)
+            return self._tools
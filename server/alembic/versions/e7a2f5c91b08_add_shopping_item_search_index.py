@@ -0,0 +1,47 @@
+"""Add shopping item search index
+
+Revision ID: e7a2f5c91b08
+Revises: d41e8a6c3b72
+Create Date: 2026-10-16 22:41:09.317254
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7a2f5c91b08'
+down_revision: Union[str, None] = 'd41e8a6c3b72'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # FTS5 is SQLite only, other databases fall back to LIKE matching
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    op.execute(
+        "CREATE VIRTUAL TABLE shopping_items_fts USING fts5(name, notes, content='shopping_items', content_rowid='id', tokenize='trigram')"
+    )
+    op.execute("""CREATE TRIGGER shopping_items_fts_insert AFTER INSERT ON shopping_items BEGIN
+        INSERT INTO shopping_items_fts(rowid, name, notes) VALUES (new.id, new.name, new.notes);
+    END""")
+    op.execute("""CREATE TRIGGER shopping_items_fts_delete AFTER DELETE ON shopping_items BEGIN
+        INSERT INTO shopping_items_fts(shopping_items_fts, rowid, name, notes) VALUES ('delete', old.id, old.name, old.notes);
+    END""")
+    op.execute("""CREATE TRIGGER shopping_items_fts_update AFTER UPDATE OF name, notes ON shopping_items BEGIN
+        INSERT INTO shopping_items_fts(shopping_items_fts, rowid, name, notes) VALUES ('delete', old.id, old.name, old.notes);
+        INSERT INTO shopping_items_fts(rowid, name, notes) VALUES (new.id, new.name, new.notes);
+    END""")
+    # Index the items that already exist
+    op.execute("INSERT INTO shopping_items_fts(shopping_items_fts) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    op.execute("DROP TRIGGER shopping_items_fts_update")
+    op.execute("DROP TRIGGER shopping_items_fts_delete")
+    op.execute("DROP TRIGGER shopping_items_fts_insert")
+    op.execute("DROP TABLE shopping_items_fts")
@@ -0,0 +1,134 @@
+import os
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, NamedTuple, Optional, Tuple
+
+# Response cache settings
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "1024"))
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "60"))
+
+def shopping_list_key(shopping_list_id: int) -> str:
+    return f"shopping_list:{shopping_list_id}"
+
+def shopping_item_key(item_id: int) -> str:
+    return f"shopping_item:{item_id}"
+
+class CachedResponse(NamedTuple):
+    etag: str
+    content: bytes
+
+    def to_bytes(self) -> bytes:
+        return self.etag.encode() + b"\n" + self.content
+
+    @classmethod
+    def from_bytes(cls, value: bytes) -> "CachedResponse":
+        etag, content = value.split(b"\n", 1)
+        return cls(etag.decode(), content)
+
+class CacheBackend(ABC):
+    """Storage for serialized responses. Implement this to share the cache between processes."""
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[bytes]:
+        ...
+
+    @abstractmethod
+    async def set(self, key: str, value: bytes) -> None:
+        ...
+
+    @abstractmethod
+    async def delete(self, *keys: str) -> None:
+        ...
+
+    @abstractmethod
+    async def clear(self) -> None:
+        ...
+
+    @abstractmethod
+    def stats(self) -> Dict[str, int]:
+        ...
+
+class LRUCacheBackend(CacheBackend):
+    """In-process cache evicting the least recently used entry once max_entries is reached and expiring entries after ttl seconds."""
+
+    def __init__(self, max_entries: int = RESPONSE_CACHE_MAX_ENTRIES, ttl: float = RESPONSE_CACHE_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    async def get(self, key: str) -> Optional[bytes]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    async def set(self, key: str, value: bytes) -> None:
+        if self.max_entries <= 0:
+            return
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    async def delete(self, *keys: str) -> None:
+        for key in keys:
+            self._entries.pop(key, None)
+
+    async def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions, "entries": len(self._entries)}
+
+class ResponseCache:
+    """Read-through cache of serialized GET responses, invalidated by the write paths in crud.py."""
+
+    def __init__(self, backend: CacheBackend):
+        self.backend = backend
+        self._invalidations = 0
+        # Off when other processes write to the same database without telling this one
+        self.enabled = True
+        # Set by the cluster bus to pass invalidations on to the other processes
+        self.relay: Optional[Callable[[Tuple[str, ...]], None]] = None
+
+    async def get_or_load(self, key: str, loader: Callable[[], Awaitable[Optional[CachedResponse]]]) -> Optional[CachedResponse]:
+        """Return the cached response for key, or call loader and cache its result unless it's None."""
+        if not self.enabled:
+            return await loader()
+        value = await self.backend.get(key)
+        if value is not None:
+            return CachedResponse.from_bytes(value)
+        invalidations = self._invalidations
+        response = await loader()
+        # Skip caching if a write was invalidated while loading: the loaded value may predate that write
+        if response is not None and invalidations == self._invalidations:
+            await self.backend.set(key, response.to_bytes())
+        return response
+
+    async def invalidate(self, *keys: str, relay: bool = True) -> None:
+        self._invalidations += 1
+        await self.backend.delete(*keys)
+        if relay and self.relay is not None:
+            self.relay(keys)
+
+    async def clear(self) -> None:
+        self._invalidations += 1
+        await self.backend.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return self.backend.stats()
+
+response_cache = ResponseCache(LRUCacheBackend())
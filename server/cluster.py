@@ -0,0 +1,211 @@
+import asyncio
+import json
+import logging
+import os
+from abc import ABC, abstractmethod
+from typing import List, Optional, Set, Tuple
+from uuid import uuid4
+
+from sqlalchemy.engine import make_url
+
+from .cache import ResponseCache
+from .events import EventBroker, ListEvent, list_event
+
+logger = logging.getLogger(__name__)
+
+# Cluster settings: how the worker processes behind one DATABASE_URL tell each other about writes
+CLUSTER_CHANNEL = os.getenv("CLUSTER_CHANNEL", "shopping_list_changes")
+CLUSTER_RECONNECT_DELAY = float(os.getenv("CLUSTER_RECONNECT_DELAY", "1"))
+# Postgres rejects NOTIFY payloads of 8000 bytes or more
+MAX_NOTIFY_BYTES = 7900
+
+class ClusterBus(ABC):
+    """Relays the response cache invalidations and change feed events of this process's writes to the other processes.
+
+    Everything relayed while the event loop is busy goes out as one message. Incoming
+    messages invalidate the local cache first and then publish their events to the local
+    subscribers, so a client refetching on an event never gets the stale cached list.
+    """
+
+    def __init__(self, cache: ResponseCache, broker: EventBroker):
+        self.cache = cache
+        self.broker = broker
+        self.node_id = uuid4().hex
+        self._keys: List[str] = []
+        self._events: List[Tuple[int, ListEvent]] = []
+        self._flush_task: Optional[asyncio.Task] = None
+        self.sent = 0
+        self.received = 0
+
+    @property
+    @abstractmethod
+    def connected(self) -> bool:
+        ...
+
+    @abstractmethod
+    async def start(self) -> None:
+        ...
+
+    @abstractmethod
+    async def close(self) -> None:
+        ...
+
+    @abstractmethod
+    async def send(self, payload: str) -> None:
+        ...
+
+    def attach(self) -> None:
+        self.cache.relay = self.relay_invalidation
+        self.broker.relay = self.relay_event
+
+    def detach(self) -> None:
+        self.cache.relay = None
+        self.broker.relay = None
+
+    def relay_invalidation(self, keys: Tuple[str, ...]) -> None:
+        self._keys.extend(keys)
+        self._schedule_flush()
+
+    def relay_event(self, shopping_list_id: int, event: ListEvent) -> None:
+        self._events.append((shopping_list_id, event))
+        self._schedule_flush()
+
+    def _schedule_flush(self) -> None:
+        if self._flush_task is None:
+            self._flush_task = asyncio.get_running_loop().create_task(self._flush())
+
+    async def _flush(self) -> None:
+        try:
+            while self._keys or self._events:
+                keys, self._keys = self._keys, []
+                events, self._events = self._events, []
+                for payload in self._payloads(keys, events):
+                    try:
+                        await self.send(payload)
+                        self.sent += 1
+                    except Exception as e:
+                        # The other processes resync when the bus reconnects
+                        logger.warning("Could not relay changes to the cluster: %s", e)
+        finally:
+            self._flush_task = None
+
+    def _payloads(self, keys: List[str], events: List[Tuple[int, ListEvent]]) -> List[str]:
+        """Messages of at most MAX_NOTIFY_BYTES, invalidations first. An event too big for a message becomes a resync."""
+        entries = [json.dumps(["key", key]) for key in dict.fromkeys(keys)]
+        for shopping_list_id, event in events:
+            entry = json.dumps(["event", shopping_list_id, event.type, event.data.decode()])
+            if len(entry.encode()) > MAX_NOTIFY_BYTES // 2:
+                entry = json.dumps(["event", shopping_list_id, "resync", list_event("resync", shopping_list_id).data.decode()])
+            entries.append(entry)
+        header = f'{{"node":"{self.node_id}","entries":['
+        payloads, batch, size = [], [], len(header) + 2
+        for entry in entries:
+            entry_size = len(entry.encode()) + 1
+            if batch and size + entry_size > MAX_NOTIFY_BYTES:
+                payloads.append(header + ",".join(batch) + "]}")
+                batch, size = [], len(header) + 2
+            batch.append(entry)
+            size += entry_size
+        if batch:
+            payloads.append(header + ",".join(batch) + "]}")
+        return payloads
+
+    async def receive(self, payload: str) -> None:
+        message = json.loads(payload)
+        if message["node"] == self.node_id:
+            return
+        self.received += 1
+        keys = [entry[1] for entry in message["entries"] if entry[0] == "key"]
+        if keys:
+            await self.cache.invalidate(*keys, relay=False)
+        for entry in message["entries"]:
+            if entry[0] == "event":
+                _, shopping_list_id, event_type, data = entry
+                self.broker.publish(shopping_list_id, ListEvent(event_type, data.encode()), relay=False)
+                if event_type == "list_deleted":
+                    self.broker.close_list(shopping_list_id)
+
+    async def resync(self) -> None:
+        """After missing messages: forget every cached response and tell every subscriber to refetch."""
+        await self.cache.clear()
+        for shopping_list_id in self.broker.subscribed_lists():
+            self.broker.publish(shopping_list_id, list_event("resync", shopping_list_id), relay=False)
+
+    def stats(self) -> dict:
+        return {"connected": int(self.connected), "sent": self.sent, "received": self.received}
+
+class PostgresNotifyBus(ClusterBus):
+    """ClusterBus over Postgres LISTEN/NOTIFY on a dedicated asyncpg connection, reconnecting when it drops."""
+
+    def __init__(self, database_url: str, cache: ResponseCache, broker: EventBroker, channel: str = CLUSTER_CHANNEL):
+        super().__init__(cache, broker)
+        self.dsn = make_url(database_url).set(drivername="postgresql").render_as_string(hide_password=False)
+        self.channel = channel
+        self._connection = None
+        self._task: Optional[asyncio.Task] = None
+        # The loop only keeps weak references to tasks, hold on to the ones handling notifications until they finish
+        self._receive_tasks: Set[asyncio.Task] = set()
+        self._started = asyncio.Event()
+
+    @property
+    def connected(self) -> bool:
+        return self._connection is not None and not self._connection.is_closed()
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._maintain())
+            self.attach()
+        await asyncio.wait_for(self._started.wait(), 10)
+
+    async def close(self) -> None:
+        self.detach()
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def send(self, payload: str) -> None:
+        if not self.connected:
+            raise ConnectionError("not connected")
+        await self._connection.execute("SELECT pg_notify($1, $2)", self.channel, payload)
+
+    def _on_notify(self, connection, pid, channel, payload) -> None:
+        task = asyncio.get_running_loop().create_task(self.receive(payload))
+        self._receive_tasks.add(task)
+        task.add_done_callback(self._receive_tasks.discard)
+
+    async def _maintain(self) -> None:
+        import asyncpg
+
+        first = True
+        while True:
+            lost = asyncio.Event()
+            try:
+                self._connection = await asyncpg.connect(self.dsn)
+                # Bound now: terminating this connection later must not set the next connection's event
+                self._connection.add_termination_listener(lambda connection, lost=lost: lost.set())
+                await self._connection.add_listener(self.channel, self._on_notify)
+                if not first:
+                    # Writes of the other processes may have been missed while disconnected
+                    await self.resync()
+                first = False
+                self._started.set()
+                await lost.wait()
+                logger.warning("Cluster bus connection lost, reconnecting")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Cluster bus connection failed: %s", e)
+            finally:
+                if self._connection is not None:
+                    self._connection.terminate()
+                    self._connection = None
+            await asyncio.sleep(CLUSTER_RECONNECT_DELAY)
+
+def create_cluster_bus(database_url: str, cache: ResponseCache, broker: EventBroker) -> Optional[ClusterBus]:
+    """The bus for database_url's backend, None where processes can't share one (SQLite)."""
+    if os.getenv("CLUSTER_BUS", "auto").lower() in ("0", "false", "no", "none"):
+        return None
+    if make_url(database_url).get_backend_name() == "postgresql":
+        return PostgresNotifyBus(database_url, cache, broker)
+    return None
@@ -1,54 +1,196 @@
-from sqlalchemy import select
+import base64
+import binascii
+import json
+from datetime import datetime, timezone
+from sqlalchemy import select, insert, update, delete, case, literal, func, or_, table, column, text
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List, Optional
-from .models import ShoppingList, ShoppingItem
-from .schemas import ShoppingListCreate, ShoppingListUpdate, ShoppingItemCreate, ShoppingItemUpdate
+from sqlalchemy.orm import load_only, raiseload
+from typing import AsyncIterator, Collection, Dict, Iterable, List, Optional, Set, Tuple
+from .cache import response_cache, shopping_list_key, shopping_item_key
+from .events import event_broker, list_event
+from .models import ShoppingList, ShoppingItem, SHOPPING_ITEM_FTS_TABLE
+from .schemas import (
+    ShoppingListCreate, ShoppingListUpdate, ShoppingListResponse, ShoppingItemCreate, ShoppingItemUpdate, ShoppingItemBulkUpdateEntry, ShoppingItemResponse,
+    ShoppingListRecord, ShoppingItemRecord
+)
+
+class VersionConflictError(Exception):
+    """Raised by conditional writes when the stored version doesn't match any of the expected ones."""
+
+async def _conditional_update(db: AsyncSession, model, object_id: int, values: dict, expected_versions: Optional[Collection[int]], *options):
+    """UPDATE one row by ID and bump its version in a single statement, optionally only if its version is expected.
+
+    Returns the updated object, or None if the row doesn't exist.
+    """
+    query = update(model).where(model.id == object_id).values(**values, version=model.version + 1)
+    if expected_versions is not None:
+        query = query.where(model.version.in_(expected_versions))
+    result = await db.execute(
+        query.returning(model).options(*options).execution_options(synchronize_session=False, populate_existing=True)
+    )
+    db_object = result.scalars().first()
+    if db_object is None and expected_versions is not None:
+        result = await db.execute(select(model.id).where(model.id == object_id))
+        if result.scalar() is not None:
+            raise VersionConflictError()
+    return db_object
+
+async def _touch_shopping_lists(db: AsyncSession, shopping_list_ids: Iterable[int]) -> Dict[int, int]:
+    """Bump the version and updated_at of lists whose items changed, so their ETags change too.
+
+    Returns the new versions of the lists that exist by ID, which doubles as the foreign key check for new items.
+    """
+    shopping_list_ids = set(shopping_list_ids)
+    if not shopping_list_ids:
+        return {}
+    result = await db.execute(
+        update(ShoppingList)
+        .where(ShoppingList.id.in_(shopping_list_ids))
+        .values(version=ShoppingList.version + 1, updated_at=func.now())
+        .returning(ShoppingList.id, ShoppingList.version)
+        .execution_options(synchronize_session=False)
+    )
+    return dict(result.all())
+
+async def _invalidate_items(items: Iterable[Tuple[int, int]]) -> None:
+    """Drop cached responses for the given (item_id, shopping_list_id) pairs and their lists."""
+    keys = set()
+    for item_id, shopping_list_id in items:
+        keys.update((shopping_item_key(item_id), shopping_list_key(shopping_list_id)))
+    if keys:
+        await response_cache.invalidate(*keys)
+
+def _publish_items(event_type: str, items: Iterable[ShoppingItem], list_versions: Dict[int, int], changes=None) -> None:
+    """Push an event per item to the subscribers of its list: the whole item, or only the changed fields (plus id) if changes(item) is given."""
+    for item in items:
+        if not event_broker.has_subscribers(item.shopping_list_id):
+            continue
+        if changes is None:
+            payload = ShoppingItemResponse.model_validate(item).model_dump(mode="json")
+        else:
+            payload = {"id": item.id, **changes(item)}
+        event_broker.publish(item.shopping_list_id, list_event(event_type, item.shopping_list_id, list_versions.get(item.shopping_list_id), item=payload))
+
+def _publish_deleted_items(deleted: Iterable[Tuple[int, int]], list_versions: Dict[int, int]) -> None:
+    for item_id, shopping_list_id in deleted:
+        if event_broker.has_subscribers(shopping_list_id):
+            event_broker.publish(shopping_list_id, list_event("item_deleted", shopping_list_id, list_versions.get(shopping_list_id), item={"id": item_id}))
 
 # Shopping List CRUD operations
 async def create_shopping_list(db: AsyncSession, shopping_list: ShoppingListCreate) -> ShoppingList:
-    db_shopping_list = ShoppingList(**shopping_list.model_dump())
-    db.add(db_shopping_list)
+    result = await db.execute(
+        insert(ShoppingList).values(**shopping_list.model_dump()).returning(ShoppingList).options(raiseload(ShoppingList.items))
+    )
+    db_shopping_list = result.scalars().one()
     await db.commit()
-    await db.refresh(db_shopping_list)
     return db_shopping_list
 
+async def get_shopping_list_version(db: AsyncSession, shopping_list_id: int) -> Optional[int]:
+    result = await db.execute(select(ShoppingList.version).where(ShoppingList.id == shopping_list_id))
+    return result.scalar()
+
 async def get_shopping_list(db: AsyncSession, shopping_list_id: int) -> Optional[ShoppingList]:
     result = await db.execute(
         select(ShoppingList).where(ShoppingList.id == shopping_list_id)
     )
     return result.scalars().first()
 
-async def get_shopping_lists(db: AsyncSession, skip: int = 0, limit: int = 100) -> List[ShoppingList]:
-    result = await db.execute(select(ShoppingList).offset(skip).limit(limit))
-    return result.scalars().all()
+def encode_cursor(last_id: int) -> str:
+    """Encode the keyset position after the given row ID as an opaque cursor."""
+    return base64.urlsafe_b64encode(json.dumps({"id": last_id}).encode()).decode()
+
+def decode_cursor(cursor: str) -> int:
+    """Decode a cursor created by encode_cursor. Raises ValueError for malformed cursors."""
+    try:
+        last_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))["id"]
+    except (binascii.Error, UnicodeDecodeError, json.JSONDecodeError, KeyError, TypeError) as e:
+        raise ValueError("Invalid cursor") from e
+    if not isinstance(last_id, int):
+        raise ValueError("Invalid cursor")
+    return last_id
+
+async def get_shopping_lists(db: AsyncSession, cursor: Optional[str] = None, limit: int = 100) -> Tuple[List[ShoppingList], Optional[str]]:
+    """Return a page of shopping lists ordered by ID and the cursor of the next page.
+
+    Only the list columns are loaded, items are never fetched.
+    """
+    query = (
+        select(ShoppingList)
+        .options(
+            load_only(ShoppingList.id, ShoppingList.name, ShoppingList.description, ShoppingList.created_at, ShoppingList.updated_at),
+            raiseload(ShoppingList.items),
+        )
+        .order_by(ShoppingList.id)
+        .limit(limit + 1)
+    )
+    if cursor is not None:
+        query = query.where(ShoppingList.id > decode_cursor(cursor))
+    result = await db.execute(query)
+    shopping_lists = list(result.scalars().all())
+    if len(shopping_lists) > limit:
+        shopping_lists = shopping_lists[:limit]
+        return shopping_lists, encode_cursor(shopping_lists[-1].id)
+    return shopping_lists, None
 
-async def update_shopping_list(db: AsyncSession, shopping_list_id: int, shopping_list: ShoppingListUpdate) -> Optional[ShoppingList]:
-    result = await db.execute(select(ShoppingList).filter(ShoppingList.id == shopping_list_id))
-    db_shopping_list = result.scalars().first()
+async def get_shopping_list_counts(db: AsyncSession, shopping_list_ids: List[int]) -> Dict[int, Tuple[int, int]]:
+    """Return (item_count, completed_count) per shopping list ID from a single aggregate query."""
+    result = await db.execute(
+        select(
+            ShoppingItem.shopping_list_id,
+            func.count(ShoppingItem.id),
+            func.coalesce(func.sum(case((ShoppingItem.is_completed, 1), else_=0)), 0),
+        )
+        .where(ShoppingItem.shopping_list_id.in_(shopping_list_ids))
+        .group_by(ShoppingItem.shopping_list_id)
+    )
+    counts = {shopping_list_id: (0, 0) for shopping_list_id in shopping_list_ids}
+    for shopping_list_id, item_count, completed_count in result.all():
+        counts[shopping_list_id] = (item_count, completed_count)
+    return counts
+
+async def update_shopping_list(db: AsyncSession, shopping_list_id: int, shopping_list: ShoppingListUpdate, expected_versions: Optional[Collection[int]] = None) -> Optional[ShoppingList]:
+    db_shopping_list = await _conditional_update(
+        db, ShoppingList, shopping_list_id, shopping_list.model_dump(exclude_unset=True), expected_versions, raiseload(ShoppingList.items)
+    )
     if db_shopping_list:
-        update_data = shopping_list.model_dump(exclude_unset=True)
-        for key, value in update_data.items():
-            setattr(db_shopping_list, key, value)
         await db.commit()
-        await db.refresh(db_shopping_list)
+        await response_cache.invalidate(shopping_list_key(shopping_list_id))
+        event_broker.publish(shopping_list_id, list_event(
+            "list_updated", shopping_list_id, db_shopping_list.version, list=shopping_list.model_dump(mode="json", exclude_unset=True)
+        ))
         return db_shopping_list
     return None
 
 async def delete_shopping_list(db: AsyncSession, shopping_list_id: int) -> bool:
-    result = await db.execute(select(ShoppingList).filter(ShoppingList.id == shopping_list_id))
-    db_shopping_list = result.scalars().first()
-    if db_shopping_list:
-        await db.delete(db_shopping_list)
-        await db.commit()
-        return True
-    return False
+    # The foreign key has no ON DELETE CASCADE, so delete the list's items explicitly, before
+    # the list itself so databases enforcing the foreign key (Postgres) accept it
+    result = await db.execute(
+        delete(ShoppingItem).where(ShoppingItem.shopping_list_id == shopping_list_id).returning(ShoppingItem.id).execution_options(synchronize_session=False)
+    )
+    item_ids = result.scalars().all()
+    result = await db.execute(
+        delete(ShoppingList).where(ShoppingList.id == shopping_list_id).returning(ShoppingList.id).execution_options(synchronize_session=False)
+    )
+    if result.scalar() is None:
+        await db.rollback()
+        return False
+    await db.commit()
+    await response_cache.invalidate(shopping_list_key(shopping_list_id), *(shopping_item_key(item_id) for item_id in item_ids))
+    event_broker.publish(shopping_list_id, list_event("list_deleted", shopping_list_id))
+    event_broker.close_list(shopping_list_id)
+    return True
 
 # Shopping Item CRUD operations
-async def create_shopping_item(db: AsyncSession, shopping_item: ShoppingItemCreate) -> ShoppingItem:
-    db_shopping_item = ShoppingItem(**shopping_item.model_dump())
-    db.add(db_shopping_item)
+async def create_shopping_item(db: AsyncSession, shopping_item: ShoppingItemCreate) -> Optional[ShoppingItem]:
+    """Add an item to its list. Returns None if the shopping list doesn't exist."""
+    list_versions = await _touch_shopping_lists(db, [shopping_item.shopping_list_id])
+    if not list_versions:
+        return None
+    result = await db.execute(insert(ShoppingItem).values(**shopping_item.model_dump()).returning(ShoppingItem))
+    db_shopping_item = result.scalars().one()
     await db.commit()
-    await db.refresh(db_shopping_item)
+    await response_cache.invalidate(shopping_list_key(db_shopping_item.shopping_list_id))
+    _publish_items("item_added", [db_shopping_item], list_versions)
     return db_shopping_item
 
 async def get_shopping_item(db: AsyncSession, item_id: int) -> Optional[ShoppingItem]:
@@ -56,39 +198,271 @@ async def get_shopping_item(db: AsyncSession, item_id: int) -> Optional[Shopping
     return result.scalars().first()
 
 async def get_shopping_items(db: AsyncSession, shopping_list_id: Optional[int] = None, skip: int = 0, limit: int = 100) -> List[ShoppingItem]:
-    query = select(ShoppingItem).offset(skip).limit(limit)
+    query = select(ShoppingItem).order_by(ShoppingItem.id).offset(skip).limit(limit)
     if shopping_list_id:
         query = query.filter(ShoppingItem.shopping_list_id == shopping_list_id)
     result = await db.execute(query)
     return result.scalars().all()
 
-async def update_shopping_item(db: AsyncSession, item_id: int, shopping_item: ShoppingItemUpdate) -> Optional[ShoppingItem]:
-    result = await db.execute(select(ShoppingItem).filter(ShoppingItem.id == item_id))
-    db_shopping_item = result.scalars().first()
+# Lean reads: only the columns a response has, as plain dicts keyed in the order of the response schema's fields
+# so they serialize to the same JSON, without hydrating ORM objects or validating them into Pydantic models
+_LIST_FIELDS = tuple(ShoppingListResponse.model_fields)
+_ITEM_FIELDS = tuple(ShoppingItemResponse.model_fields)
+_list_columns = [getattr(ShoppingList, field) for field in _LIST_FIELDS]
+_item_columns = [getattr(ShoppingItem, field) for field in _ITEM_FIELDS]
+
+async def get_shopping_list_dict(db: AsyncSession, shopping_list_id: int) -> Optional[Tuple[dict, int]]:
+    """The list with its items as the dict form of ShoppingListWithItems, and its version. None if it doesn't exist."""
+    result = await db.execute(select(*_list_columns, ShoppingList.version).where(ShoppingList.id == shopping_list_id))
+    row = result.first()
+    if row is None:
+        return None
+    shopping_list = dict(zip(_LIST_FIELDS, row))
+    result = await db.execute(select(*_item_columns).where(ShoppingItem.shopping_list_id == shopping_list_id).order_by(ShoppingItem.id))
+    shopping_list["items"] = [dict(zip(_ITEM_FIELDS, item)) for item in result]
+    return shopping_list, row[-1]
+
+async def get_shopping_item_dict(db: AsyncSession, item_id: int) -> Optional[Tuple[dict, int]]:
+    """The item as the dict form of ShoppingItemResponse, and its version. None if it doesn't exist."""
+    result = await db.execute(select(*_item_columns, ShoppingItem.version).where(ShoppingItem.id == item_id))
+    row = result.first()
+    return (dict(zip(_ITEM_FIELDS, row)), row[-1]) if row is not None else None
+
+async def get_shopping_item_dicts(db: AsyncSession, shopping_list_id: Optional[int] = None, skip: int = 0, limit: int = 100) -> List[dict]:
+    """get_shopping_items as dicts in the form of ShoppingItemResponse."""
+    query = select(*_item_columns).order_by(ShoppingItem.id).offset(skip).limit(limit)
+    if shopping_list_id:
+        query = query.filter(ShoppingItem.shopping_list_id == shopping_list_id)
+    result = await db.execute(query)
+    return [dict(zip(_ITEM_FIELDS, item)) for item in result]
+
+# Item search: lists of up to SEARCH_SCAN_ITEMS items are ranked here whole, on longer ones an index first narrows the
+# list down to SEARCH_CANDIDATES items. The full-text index spans every list, so using it costs as much as there are
+# matches in the whole table, while reading a short list by shopping_list_id only costs as much as the list is long
+SEARCH_SCAN_ITEMS = 200
+SEARCH_CANDIDATES = 50
+SEARCH_MIN_SCORE = 0.1
+_shopping_items_fts = table(SHOPPING_ITEM_FTS_TABLE, column("rowid"))
+
+def _trigrams(text: str) -> Set[str]:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+def _match_score(query: str, item: ShoppingItem) -> float:
+    """Trigram similarity of the query to the item's name, plus bonuses for exact and prefix matches and for notes."""
+    name = item.name.lower()
+    query_trigrams, name_trigrams = _trigrams(query), _trigrams(name)
+    score = 2 * len(query_trigrams & name_trigrams) / (len(query_trigrams) + len(name_trigrams)) if query_trigrams and name_trigrams else 0.0
+    if name == query:
+        score += 1.0
+    elif name.startswith(query):
+        score += 0.5
+    elif any(word.startswith(query) for word in name.split()):
+        score += 0.3
+    if item.notes and query in item.notes.lower():
+        score += 0.2
+    return round(score, 3)
+
+def _search_candidates(db: AsyncSession, statement, query: str):
+    """statement narrowed down to the SEARCH_CANDIDATES items most likely to match query."""
+    statement = statement.limit(SEARCH_CANDIDATES)
+    if db.bind.dialect.name == "sqlite" and len(query) >= 3:
+        # Any shared trigram makes a candidate, bm25 puts the ones sharing the most (weighting the name over notes) first
+        match = " OR ".join('"' + trigram.replace('"', '""') + '"' for trigram in sorted(_trigrams(query)))
+        return (
+            statement.join(_shopping_items_fts, _shopping_items_fts.c.rowid == ShoppingItem.id)
+            .filter(text(f"{SHOPPING_ITEM_FTS_TABLE} MATCH :match").bindparams(match=match))
+            .order_by(text(f"bm25({SHOPPING_ITEM_FTS_TABLE}, 10.0, 1.0)"))
+        )
+    # Too short for trigrams (or no FTS5): substring match
+    return statement.filter(or_(
+        func.lower(ShoppingItem.name).contains(query, autoescape=True), func.lower(ShoppingItem.notes).contains(query, autoescape=True),
+    )).order_by(func.length(ShoppingItem.name))
+
+async def search_shopping_items(db: AsyncSession, shopping_list_id: int, query: str, limit: int = 5, is_completed: Optional[bool] = None) -> List[Tuple[ShoppingItem, float]]:
+    """The items of a list best matching query by name or notes, allowing for typos, with their scores.
+
+    Lists longer than SEARCH_SCAN_ITEMS are first narrowed down, with the FTS5 trigram index on SQLite and by substring on
+    other databases: there a misspelt query only finds items on lists up to that length.
+    """
+    query = " ".join(query.lower().split())
+    if not query:
+        return []
+    statement = select(ShoppingItem).filter(ShoppingItem.shopping_list_id == shopping_list_id)
+    if is_completed is not None:
+        statement = statement.filter(ShoppingItem.is_completed == is_completed)
+    # Counts no further than needed to tell whether the list is short, from the index alone
+    counted = statement.with_only_columns(ShoppingItem.id).limit(SEARCH_SCAN_ITEMS + 1).subquery()
+    if await db.scalar(select(func.count()).select_from(counted)) > SEARCH_SCAN_ITEMS:
+        statement = _search_candidates(db, statement, query)
+    else:
+        statement = statement.order_by(ShoppingItem.id)
+    result = await db.execute(statement)
+    scored = [(item, score) for item in result.scalars().all() if (score := _match_score(query, item)) >= SEARCH_MIN_SCORE]
+    scored.sort(key=lambda match: match[1], reverse=True)
+    return scored[:limit]
+
+async def update_shopping_item(db: AsyncSession, item_id: int, shopping_item: ShoppingItemUpdate, expected_versions: Optional[Collection[int]] = None) -> Optional[ShoppingItem]:
+    values = shopping_item.model_dump(exclude_unset=True)
+    db_shopping_item = await _conditional_update(db, ShoppingItem, item_id, values, expected_versions)
     if db_shopping_item:
-        update_data = shopping_item.model_dump(exclude_unset=True)
-        for field, value in update_data.items():
-            setattr(db_shopping_item, field, value)
+        list_versions = await _touch_shopping_lists(db, [db_shopping_item.shopping_list_id])
         await db.commit()
-        await db.refresh(db_shopping_item)
+        await _invalidate_items([(item_id, db_shopping_item.shopping_list_id)])
+        _publish_items("item_updated", [db_shopping_item], list_versions, lambda item: values)
         return db_shopping_item
     return None
 
 async def delete_shopping_item(db: AsyncSession, item_id: int) -> bool:
-    result = await db.execute(select(ShoppingItem).filter(ShoppingItem.id == item_id))
-    db_shopping_item = result.scalars().first()
-    if db_shopping_item:
-        await db.delete(db_shopping_item)
-        await db.commit()
-        return True
-    return False
+    result = await db.execute(
+        delete(ShoppingItem).where(ShoppingItem.id == item_id).returning(ShoppingItem.shopping_list_id).execution_options(synchronize_session=False)
+    )
+    shopping_list_id = result.scalar()
+    if shopping_list_id is None:
+        return False
+    list_versions = await _touch_shopping_lists(db, [shopping_list_id])
+    await db.commit()
+    await _invalidate_items([(item_id, shopping_list_id)])
+    _publish_deleted_items([(item_id, shopping_list_id)], list_versions)
+    return True
 
-async def toggle_item_completion(db: AsyncSession, item_id: int) -> Optional[ShoppingItem]:
-    result = await db.execute(select(ShoppingItem).filter(ShoppingItem.id == item_id))
-    db_shopping_item = result.scalars().first()
+async def toggle_item_completion(db: AsyncSession, item_id: int, expected_versions: Optional[Collection[int]] = None) -> Optional[ShoppingItem]:
+    db_shopping_item = await _conditional_update(db, ShoppingItem, item_id, {"is_completed": ~ShoppingItem.is_completed}, expected_versions)
     if db_shopping_item:
-        db_shopping_item.is_completed = not db_shopping_item.is_completed
+        list_versions = await _touch_shopping_lists(db, [db_shopping_item.shopping_list_id])
         await db.commit()
-        await db.refresh(db_shopping_item)
+        await _invalidate_items([(item_id, db_shopping_item.shopping_list_id)])
+        _publish_items("item_toggled", [db_shopping_item], list_versions, _completion)
         return db_shopping_item
-    return None 
\ No newline at end of file
+    return None
+
+def _completion(item: ShoppingItem) -> dict:
+    return {"is_completed": item.is_completed}
+
+# Bulk Shopping Item operations - each runs as a single transaction with set-based statements
+async def create_shopping_items(db: AsyncSession, shopping_items: List[ShoppingItemCreate]) -> List[Optional[ShoppingItem]]:
+    """Insert items in one statement. Returns one entry per input, None where the shopping list doesn't exist."""
+    list_versions = await _touch_shopping_lists(db, (item.shopping_list_id for item in shopping_items))
+    rows = [item.model_dump() for item in shopping_items if item.shopping_list_id in list_versions]
+    created = []
+    if rows:
+        result = await db.execute(
+            insert(ShoppingItem).returning(ShoppingItem, sort_by_parameter_order=True),
+            rows,
+        )
+        created = list(result.scalars().all())
+        await db.commit()
+        await response_cache.invalidate(*(shopping_list_key(shopping_list_id) for shopping_list_id in {item.shopping_list_id for item in created}))
+        _publish_items("item_added", created, list_versions)
+    created_iter = iter(created)
+    return [next(created_iter) if item.shopping_list_id in list_versions else None for item in shopping_items]
+
+async def update_shopping_items(db: AsyncSession, shopping_items: List[ShoppingItemBulkUpdateEntry]) -> Dict[int, ShoppingItem]:
+    """Apply per-item changes with a single UPDATE ... CASE statement. Returns the updated items by ID.
+
+    Only the first entry for an item ID is applied.
+    """
+    changes: Dict[int, dict] = {}
+    for entry in shopping_items:
+        changes.setdefault(entry.id, entry.model_dump(exclude_unset=True, exclude={"id"}))
+    values = {}
+    for field in {field for fields in changes.values() for field in fields}:
+        column = getattr(ShoppingItem, field)
+        whens = {item_id: literal(fields[field], column.type) for item_id, fields in changes.items() if field in fields}
+        values[field] = case(whens, value=ShoppingItem.id, else_=column)
+    if not values:
+        # Nothing to change, but still report which of the items exist
+        result = await db.execute(select(ShoppingItem).where(ShoppingItem.id.in_(changes)))
+        return {item.id: item for item in result.scalars().all()}
+    result = await db.execute(
+        update(ShoppingItem)
+        .where(ShoppingItem.id.in_(changes))
+        .values(**values, version=ShoppingItem.version + 1)
+        .returning(ShoppingItem)
+        .execution_options(synchronize_session=False, populate_existing=True)
+    )
+    updated = {item.id: item for item in result.scalars().all()}
+    list_versions = await _touch_shopping_lists(db, (item.shopping_list_id for item in updated.values()))
+    await db.commit()
+    await _invalidate_items((item.id, item.shopping_list_id) for item in updated.values())
+    _publish_items("item_updated", updated.values(), list_versions, lambda item: changes[item.id])
+    return updated
+
+async def toggle_items_completion(db: AsyncSession, item_ids: List[int]) -> Dict[int, ShoppingItem]:
+    """Flip the completion status of the given items in one statement. Returns the toggled items by ID."""
+    result = await db.execute(
+        update(ShoppingItem)
+        .where(ShoppingItem.id.in_(set(item_ids)))
+        .values(is_completed=~ShoppingItem.is_completed, version=ShoppingItem.version + 1)
+        .returning(ShoppingItem)
+        .execution_options(synchronize_session=False, populate_existing=True)
+    )
+    toggled = {item.id: item for item in result.scalars().all()}
+    list_versions = await _touch_shopping_lists(db, (item.shopping_list_id for item in toggled.values()))
+    await db.commit()
+    await _invalidate_items((item.id, item.shopping_list_id) for item in toggled.values())
+    _publish_items("item_toggled", toggled.values(), list_versions, _completion)
+    return toggled
+
+async def delete_shopping_items(db: AsyncSession, item_ids: List[int]) -> Set[int]:
+    """Delete the given items in one statement. Returns the IDs that were actually deleted."""
+    result = await db.execute(
+        delete(ShoppingItem)
+        .where(ShoppingItem.id.in_(set(item_ids)))
+        .returning(ShoppingItem.id, ShoppingItem.shopping_list_id)
+        .execution_options(synchronize_session=False)
+    )
+    deleted = result.all()
+    list_versions = await _touch_shopping_lists(db, (shopping_list_id for _, shopping_list_id in deleted))
+    await db.commit()
+    await _invalidate_items(deleted)
+    _publish_deleted_items(deleted, list_versions)
+    return {item_id for item_id, _ in deleted}
+
+# Export/Import operations
+async def export_shopping_data(db: AsyncSession, batch_size: int = 1000) -> AsyncIterator[List]:
+    """Yield batches of list records, then batches of item records, from server-side cursors.
+
+    Only plain column rows are fetched, so memory use is bounded by batch_size whatever the table sizes.
+    """
+    list_columns = (ShoppingList.id, ShoppingList.name, ShoppingList.description, ShoppingList.created_at, ShoppingList.updated_at)
+    result = await db.stream(select(*list_columns).order_by(ShoppingList.id).execution_options(yield_per=batch_size))
+    async for rows in result.partitions():
+        yield [ShoppingListRecord.model_validate(row) for row in rows]
+
+    item_columns = (
+        ShoppingItem.id, ShoppingItem.name, ShoppingItem.quantity, ShoppingItem.unit, ShoppingItem.notes, ShoppingItem.is_completed,
+        ShoppingItem.created_at, ShoppingItem.updated_at, ShoppingItem.shopping_list_id,
+    )
+    result = await db.stream(
+        select(*item_columns).order_by(ShoppingItem.shopping_list_id, ShoppingItem.id).execution_options(yield_per=batch_size)
+    )
+    async for rows in result.partitions():
+        yield [ShoppingItemRecord.model_validate(row) for row in rows]
+
+def _import_values(record) -> dict:
+    values = record.model_dump(exclude={"type", "id"})
+    # Naive UTC, like the func.now() column default
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    values["created_at"] = values["created_at"] or now
+    values["updated_at"] = values["updated_at"] or now
+    return values
+
+async def import_shopping_lists(db: AsyncSession, records: List[ShoppingListRecord]) -> Dict[int, int]:
+    """Insert one batch of lists in its own transaction. Returns a map of exported to new list IDs."""
+    result = await db.execute(
+        insert(ShoppingList).returning(ShoppingList.id, sort_by_parameter_order=True),
+        [_import_values(record) for record in records],
+    )
+    new_ids = result.scalars().all()
+    await db.commit()
+    return {record.id: new_id for record, new_id in zip(records, new_ids)}
+
+async def import_shopping_items(db: AsyncSession, records: List[ShoppingItemRecord], list_ids: Dict[int, int]) -> None:
+    """Insert one batch of items in its own transaction with a single executemany, remapping their list IDs."""
+    rows = []
+    for record in records:
+        values = _import_values(record)
+        values["shopping_list_id"] = list_ids[record.shopping_list_id]
+        rows.append(values)
+    await db.execute(insert(ShoppingItem), rows)
+    await db.commit()
@@ -1,20 +1,85 @@
 import os
 from dotenv import load_dotenv
+from sqlalchemy import event, text
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
 
+from .instrumentation import InstrumentedQueuePool, instrument_engine
+from .sqlite_writer import SQLiteWriter
+
 load_dotenv()
 
-# Database URL - defaults to SQLite for development
+# Database URL - defaults to SQLite for development, use postgresql+asyncpg://... for several workers or hosts
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite+aiosqlite:///./shopping_list.db")
+# Hosting platforms hand out plain postgres:// URLs, which would load the synchronous psycopg2 driver
+for _scheme in ("postgres://", "postgresql://"):
+    if DATABASE_URL.startswith(_scheme):
+        DATABASE_URL = "postgresql+asyncpg://" + DATABASE_URL[len(_scheme):]
+
+# SQLite production mode: WAL + tuned pragmas, read-only reader pool and a single group-committing writer
+SQLITE_TUNING = DATABASE_URL.startswith("sqlite") and os.getenv("SQLITE_TUNING", "false").lower() in ("1", "true", "yes")
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+SQLITE_CACHE_SIZE = int(os.getenv("SQLITE_CACHE_SIZE", "-65536"))  # negative means KiB, i.e. 64 MiB
+SQLITE_BUSY_TIMEOUT = int(os.getenv("SQLITE_BUSY_TIMEOUT", "5000"))  # milliseconds
+
+# Connection pool per worker process. WEB_CONCURRENCY is the worker count uvicorn --workers and gunicorn default to;
+# with DB_MAX_CONNECTIONS set, each worker gets a fixed pool of an equal share of it, so all of them together stay under the server's limit
+WEB_CONCURRENCY = max(1, int(os.getenv("WEB_CONCURRENCY", "1")))
+DB_MAX_CONNECTIONS = int(os.getenv("DB_MAX_CONNECTIONS", "0"))
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", str(max(1, DB_MAX_CONNECTIONS // WEB_CONCURRENCY) if DB_MAX_CONNECTIONS > 0 else 20)))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "0" if DB_MAX_CONNECTIONS > 0 else "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
 
 # Create engine
 async_engine = create_async_engine(
     DATABASE_URL,
     connect_args={"check_same_thread": False} if DATABASE_URL.startswith("sqlite") else {},
-    pool_size=20,
+    poolclass=InstrumentedQueuePool,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_timeout=DB_POOL_TIMEOUT,
     pool_recycle=3600,
+    # A database server can drop idle connections (restarts, failovers, proxies), check them before handing them out
+    pool_pre_ping=not DATABASE_URL.startswith("sqlite"),
 )
+instrument_engine(async_engine)
+
+def _set_sqlite_pragmas(dbapi_connection, read_only: bool) -> None:
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}")
+    cursor.execute(f"PRAGMA cache_size={SQLITE_CACHE_SIZE}")
+    cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT}")
+    if read_only:
+        cursor.execute("PRAGMA query_only=ON")
+    cursor.close()
+
+sqlite_writer = None
+if SQLITE_TUNING:
+    # async_engine becomes the read pool; all writes go through the writer engine's single connection
+    event.listen(async_engine.sync_engine, "connect", lambda dbapi_connection, _: _set_sqlite_pragmas(dbapi_connection, read_only=True))
+
+    async_write_engine = create_async_engine(
+        DATABASE_URL,
+        connect_args={"check_same_thread": False},
+        poolclass=InstrumentedQueuePool,
+        pool_size=1,
+        max_overflow=0,
+    )
+    instrument_engine(async_write_engine)
+
+    @event.listens_for(async_write_engine.sync_engine, "connect")
+    def _on_writer_connect(dbapi_connection, _):
+        _set_sqlite_pragmas(dbapi_connection, read_only=False)
+        # Let SQLAlchemy emit BEGIN itself so SAVEPOINTs work with the sqlite3 driver
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(async_write_engine.sync_engine, "begin")
+    def _on_writer_begin(connection):
+        connection.exec_driver_sql("BEGIN IMMEDIATE")
+
+    sqlite_writer = SQLiteWriter(async_write_engine)
 
 # Create SessionLocal class
 AsyncSessionLocal = async_sessionmaker(bind=async_engine, autocommit=False, autoflush=False, expire_on_commit=False)
@@ -31,4 +96,28 @@ async def get_db():
             await session.rollback()
             raise
         finally:
-            await session.close()
\ No newline at end of file
+            await session.close()
+
+def write_session():
+    """Session for writes: the group-committing writer in SQLite tuning mode, a regular session otherwise."""
+    return AsyncSessionLocal() if sqlite_writer is None else sqlite_writer.session()
+
+# Dependency to get a database session for writes
+async def get_write_db():
+    async with write_session() as session:
+        try:
+            yield session
+        except Exception:
+            await session.rollback()
+            raise
+
+async def ping_database() -> None:
+    """Run a trivial query, raising if the database can't be reached."""
+    async with async_engine.connect() as connection:
+        await connection.execute(text("SELECT 1"))
+
+async def dispose_engines():
+    if sqlite_writer is not None:
+        await sqlite_writer.close()
+        await sqlite_writer.engine.dispose()
+    await async_engine.dispose()
@@ -0,0 +1,152 @@
+import asyncio
+import json
+import os
+from collections import deque
+from typing import Callable, Deque, Dict, List, NamedTuple, Optional, Set
+
+# Change feed settings
+EVENT_QUEUE_SIZE = int(os.getenv("EVENT_QUEUE_SIZE", "256"))
+EVENT_DROP_POLICY = os.getenv("EVENT_DROP_POLICY", "drop_oldest")
+EVENT_KEEPALIVE = float(os.getenv("EVENT_KEEPALIVE", "15"))
+
+DROP_POLICIES = ("drop_oldest", "drop_newest", "disconnect")
+
+class ListEvent(NamedTuple):
+    type: str
+    data: bytes
+
+    def to_sse(self) -> bytes:
+        return b"event: " + self.type.encode() + b"\ndata: " + self.data + b"\n\n"
+
+def list_event(event_type: str, shopping_list_id: int, version: Optional[int] = None, **fields) -> ListEvent:
+    """Encode an event once, so fanning it out to every subscriber costs no further serialization."""
+    payload = {"type": event_type, "shopping_list_id": shopping_list_id, "version": version, **fields}
+    return ListEvent(event_type, json.dumps(payload, separators=(",", ":"), default=str).encode())
+
+class SubscriptionClosed(Exception):
+    """The subscription was closed and every event queued for it has been delivered."""
+
+class Subscription:
+    """Bounded queue of the events of one shopping list for one client.
+
+    Publishing never waits for a slow client: once max_queue events are waiting, the
+    policy drops the oldest queued event, drops the new one, or disconnects the client.
+    Whenever an event was dropped the client gets a resync event next, telling it to
+    fetch the list again.
+    """
+
+    def __init__(self, broker: "EventBroker", shopping_list_id: int, max_queue: int, policy: str):
+        if policy not in DROP_POLICIES:
+            raise ValueError(f"Unknown drop policy {policy!r}, expected one of {', '.join(DROP_POLICIES)}")
+        self.broker = broker
+        self.shopping_list_id = shopping_list_id
+        self.max_queue = max_queue
+        self.policy = policy
+        self._queue: Deque[ListEvent] = deque()
+        self._ready = asyncio.Event()
+        self.lagged = False
+        self.closed = False
+        self.dropped = 0
+
+    def offer(self, event: ListEvent) -> None:
+        if self.closed:
+            return
+        if len(self._queue) >= self.max_queue:
+            self.dropped += 1
+            self.broker.dropped += 1
+            self.lagged = True
+            if self.policy == "disconnect":
+                self._queue.clear()
+                self.close()
+                return
+            if self.policy == "drop_newest":
+                return
+            self._queue.popleft()
+        self._queue.append(event)
+        self._ready.set()
+
+    async def get(self, timeout: Optional[float] = None) -> Optional[ListEvent]:
+        """The next event, or None if none arrived within timeout seconds.
+
+        Raises SubscriptionClosed once the subscription is closed and drained.
+        """
+        if not (self._queue or self.lagged or self.closed):
+            self._ready.clear()
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                return None
+        if self.lagged:
+            self.lagged = False
+            return list_event("resync", self.shopping_list_id)
+        if self._queue:
+            self.broker.delivered += 1
+            return self._queue.popleft()
+        raise SubscriptionClosed()
+
+    def close(self) -> None:
+        self.closed = True
+        self._ready.set()
+        self.broker._remove(self)
+
+class EventBroker:
+    """In-process pub/sub of shopping list changes, fed by the write paths in crud.py."""
+
+    def __init__(self, max_queue: int = EVENT_QUEUE_SIZE, policy: str = EVENT_DROP_POLICY):
+        self.max_queue = max_queue
+        self.policy = policy
+        self._subscribers: Dict[int, Set[Subscription]] = {}
+        # Set by the cluster bus to pass events on to the subscribers of the other processes
+        self.relay: Optional[Callable[[int, ListEvent], None]] = None
+        self.published = 0
+        self.delivered = 0
+        self.dropped = 0
+        self.disconnects = 0
+
+    def subscribe(self, shopping_list_id: int) -> Subscription:
+        subscription = Subscription(self, shopping_list_id, self.max_queue, self.policy)
+        self._subscribers.setdefault(shopping_list_id, set()).add(subscription)
+        return subscription
+
+    def has_subscribers(self, shopping_list_id: int) -> bool:
+        """Whether events for the list have anyone to go to. Always true with a relay, other processes may have subscribers."""
+        return self.relay is not None or shopping_list_id in self._subscribers
+
+    def subscribed_lists(self) -> List[int]:
+        return list(self._subscribers)
+
+    def publish(self, shopping_list_id: int, event: ListEvent, relay: bool = True) -> None:
+        if relay and self.relay is not None:
+            self.relay(shopping_list_id, event)
+        subscriptions = self._subscribers.get(shopping_list_id)
+        if not subscriptions:
+            return
+        self.published += 1
+        for subscription in list(subscriptions):
+            subscription.offer(event)
+
+    def close_list(self, shopping_list_id: int) -> None:
+        """End every subscription to a list once their queued events are delivered, e.g. after it was deleted."""
+        for subscription in list(self._subscribers.get(shopping_list_id, ())):
+            subscription.close()
+
+    def _remove(self, subscription: Subscription) -> None:
+        subscriptions = self._subscribers.get(subscription.shopping_list_id)
+        if subscriptions is None or subscription not in subscriptions:
+            return
+        subscriptions.discard(subscription)
+        if not subscriptions:
+            del self._subscribers[subscription.shopping_list_id]
+        if subscription.policy == "disconnect" and subscription.dropped:
+            self.disconnects += 1
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "subscribers": sum(len(subscriptions) for subscriptions in self._subscribers.values()),
+            "published": self.published,
+            "delivered": self.delivered,
+            "dropped": self.dropped,
+            "disconnects": self.disconnects,
+        }
+
+event_broker = EventBroker()
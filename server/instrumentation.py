@@ -0,0 +1,168 @@
+import logging
+import os
+import re
+import time
+from collections import defaultdict
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+# Statements slower than this are logged with their normalized SQL and parameter shapes
+SLOW_QUERY_THRESHOLD_MS = float(os.getenv("SLOW_QUERY_THRESHOLD_MS", "100"))
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class RequestStats:
+    """Database work done while handling one request."""
+    scope: dict = field(default_factory=dict)
+    statements: int = 0
+    db_time: float = 0.0
+    pool_wait: float = 0.0
+    slow_queries: int = 0
+
+    @property
+    def operation_id(self) -> str:
+        """The route's operation_id, which is also the MCP tool name for calls made through FastApiMCP."""
+        route = self.scope.get("route")
+        return getattr(route, "operation_id", None) or getattr(route, "name", None) or "unmatched"
+
+_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+# SQL normalization for the slow-query log
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER_LIST = re.compile(r"\(\s*(?:\?|%s|\$\d+|:\w+)(?:\s*,\s*(?:\?|%s|\$\d+|:\w+))+\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+def normalize_sql(statement: str) -> str:
+    statement = _STRING_LITERAL.sub("?", statement)
+    statement = _NUMBER_LITERAL.sub("?", statement)
+    statement = _PLACEHOLDER_LIST.sub("(...)", statement)
+    return _WHITESPACE.sub(" ", statement).strip()
+
+def parameter_shape(parameters: Any, executemany: bool = False) -> str:
+    """Describe bound parameters by type only, so the log never contains user data."""
+    if executemany:
+        parameters = list(parameters)
+        return f"{len(parameters)} x {parameter_shape(parameters[0]) if parameters else '()'}"
+    if isinstance(parameters, dict):
+        return "{" + ", ".join(f"{key}: {type(value).__name__}" for key, value in parameters.items()) + "}"
+    if isinstance(parameters, (list, tuple)):
+        return "(" + ", ".join(type(value).__name__ for value in parameters) + ")"
+    return type(parameters).__name__
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_start_time"].pop()
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.statements += 1
+        stats.db_time += elapsed
+    if elapsed * 1000 >= SLOW_QUERY_THRESHOLD_MS:
+        if stats is not None:
+            stats.slow_queries += 1
+        logger.warning(
+            "Slow query (%.1f ms) in %s: %s params=%s",
+            elapsed * 1000, stats.operation_id if stats is not None else "-",
+            normalize_sql(statement), parameter_shape(parameters, executemany),
+        )
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    event.listen(engine.sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine.sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+def record_pool_wait(seconds: float) -> None:
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.pool_wait += seconds
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """Connection pool that reports how long each checkout waited."""
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            return super().connect()
+        finally:
+            record_pool_wait(time.perf_counter() - start)
+
+class Metrics:
+    """Per-operation request and database counters, rendered in the Prometheus text format."""
+
+    COUNTERS = {
+        "http_requests_total": "Requests handled",
+        "http_request_duration_seconds_total": "Time spent handling requests",
+        "db_statements_total": "SQL statements executed",
+        "db_time_seconds_total": "Time spent executing SQL statements",
+        "db_pool_wait_seconds_total": "Time spent waiting for a database connection",
+        "db_slow_queries_total": "SQL statements slower than SLOW_QUERY_THRESHOLD_MS",
+    }
+
+    def __init__(self):
+        self._values: Dict[str, Dict[str, float]] = {name: defaultdict(float) for name in self.COUNTERS}
+        self.gauges: Dict[str, Any] = {}
+
+    def observe(self, stats: RequestStats, duration: float) -> None:
+        operation_id = stats.operation_id
+        for name, value in (
+            ("http_requests_total", 1),
+            ("http_request_duration_seconds_total", duration),
+            ("db_statements_total", stats.statements),
+            ("db_time_seconds_total", stats.db_time),
+            ("db_pool_wait_seconds_total", stats.pool_wait),
+            ("db_slow_queries_total", stats.slow_queries),
+        ):
+            self._values[name][operation_id] += value
+
+    def render(self) -> str:
+        lines = []
+        for name, help_text in self.COUNTERS.items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} counter")
+            for operation_id, value in sorted(self._values[name].items()):
+                lines.append(f'{name}{{operation_id="{operation_id}"}} {value:g}')
+        for name, (help_text, collect) in self.gauges.items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} gauge")
+            lines.append(f"{name} {collect():g}")
+        return "\n".join(lines) + "\n"
+
+metrics = Metrics()
+
+class QueryInstrumentationMiddleware:
+    """Collects per-request database stats, adds them as a Server-Timing header and records them in metrics."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats(scope=scope)
+        token = _request_stats.set(stats)
+        start = time.perf_counter()
+
+        async def send_with_server_timing(message):
+            if message["type"] == "http.response.start":
+                server_timing = (
+                    f'db;dur={stats.db_time * 1000:.2f};desc="{stats.statements} statements", '
+                    f"db-pool;dur={stats.pool_wait * 1000:.2f}"
+                )
+                message.setdefault("headers", [])
+                message["headers"] = list(message["headers"]) + [(b"server-timing", server_timing.encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_server_timing)
+        finally:
+            _request_stats.reset(token)
+            metrics.observe(stats, time.perf_counter() - start)
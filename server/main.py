@@ -1,99 +1,355 @@
 from contextlib import asynccontextmanager
-from typing import Annotated, List
-from fastapi import FastAPI, Depends, HTTPException
+from datetime import datetime
+from typing import Annotated, List, Optional, Tuple, Union
+import asyncio
+import logging
+import os
+import orjson
+from fastapi import FastAPI, Depends, HTTPException, Query, Request, Response, Header, WebSocket, WebSocketDisconnect, WebSocketException
+from fastapi.responses import ORJSONResponse, PlainTextResponse, StreamingResponse
 from fastapi_mcp import FastApiMCP
+from mcp.server.streamable_http_manager import StreamableHTTPSessionManager
+from pydantic import Field, TypeAdapter, ValidationError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from .database import get_db, async_engine
+from .cache import CachedResponse, response_cache, shopping_list_key, shopping_item_key
+from .events import EVENT_KEEPALIVE, ListEvent, Subscription, SubscriptionClosed, event_broker, list_event
+from .cluster import create_cluster_bus
+from .database import DATABASE_URL, WEB_CONCURRENCY, AsyncSessionLocal, get_db, get_write_db, write_session, dispose_engines, ping_database
+from .instrumentation import QueryInstrumentationMiddleware, metrics
+from .mcp_manifest import CachedFastApiMCP
 from .models import Base
 from .schemas import (
-    ShoppingListCreate, ShoppingListResponse, ShoppingListUpdate, ShoppingListWithItems,
-    ShoppingItemCreate, ShoppingItemResponse, ShoppingItemUpdate
+    ShoppingListCreate, ShoppingListResponse, ShoppingListUpdate, ShoppingListWithItems, ShoppingListSummary, ShoppingListPage,
+    ShoppingItemCreate, ShoppingItemResponse, ShoppingItemUpdate, ShoppingItemMatch,
+    ShoppingItemBulkCreate, ShoppingItemBulkUpdate, ShoppingItemBulkIds, ShoppingItemBulkResult, ShoppingItemBulkResponse,
+    ShoppingListRecord, ShoppingItemRecord, ImportResult
 )
 from .crud import (
-    create_shopping_list, get_shopping_list, get_shopping_lists, update_shopping_list, delete_shopping_list,
-    create_shopping_item, get_shopping_item, get_shopping_items, update_shopping_item, delete_shopping_item, toggle_item_completion
+    create_shopping_list, get_shopping_list, get_shopping_list_dict, get_shopping_list_version, get_shopping_lists, get_shopping_list_counts, update_shopping_list, delete_shopping_list,
+    create_shopping_item, get_shopping_item, get_shopping_item_dict, get_shopping_items, get_shopping_item_dicts, search_shopping_items, update_shopping_item, delete_shopping_item, toggle_item_completion,
+    create_shopping_items, update_shopping_items, toggle_items_completion, delete_shopping_items,
+    export_shopping_data, import_shopping_lists, import_shopping_items,
+    VersionConflictError
 )
 
+logger = logging.getLogger(__name__)
+
+# Several workers: MCP Streamable HTTP runs without sessions so any worker can answer any POST
+MCP_HTTP_STATELESS = os.getenv("MCP_HTTP_STATELESS", str(WEB_CONCURRENCY > 1)).lower() in ("1", "true", "yes")
+READINESS_TIMEOUT = float(os.getenv("READINESS_TIMEOUT", "2"))
+# Cold-start budget mode: reuse the MCP tools cached on disk (MCP_MANIFEST_PATH) instead of generating them at import
+FAST_STARTUP = os.getenv("FAST_STARTUP", "false").lower() in ("1", "true", "yes")
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """
     Function that handles startup and shutdown events.
     """
-    yield
-    await async_engine.dispose()
+    # Share cache invalidations and change feed events with the other worker processes
+    app.state.cluster_bus = create_cluster_bus(DATABASE_URL, response_cache, event_broker)
+    if app.state.cluster_bus is not None:
+        await app.state.cluster_bus.start()
+    elif WEB_CONCURRENCY > 1:
+        # A worker's cached responses would outlive the writes of the other workers
+        response_cache.enabled = False
+        logger.warning(
+            "%d workers without a cluster bus (DATABASE_URL isn't Postgres): the response cache is off and each worker's "
+            "change feed only sees the writes that worker handled", WEB_CONCURRENCY
+        )
+    # A session manager runs only once, a new one is needed every time the app starts
+    app.state.mcp_http = StreamableHTTPSessionManager(mcp.server, json_response=True, stateless=MCP_HTTP_STATELESS)
+    async with app.state.mcp_http.run():
+        app.state.ready = True
+        yield
+        # Fail readiness first so load balancers stop sending requests while this worker shuts down
+        app.state.ready = False
+    if app.state.cluster_bus is not None:
+        await app.state.cluster_bus.close()
+    await dispose_engines()
         
 app = FastAPI(description="REST api for managing shopping lists.", lifespan=lifespan)
+app.add_middleware(QueryInstrumentationMiddleware)
+
+# Lean serialization: GET /shopping-lists/{id}, /shopping-items/ and /shopping-items/{id} read plain rows and dump them with
+# orjson instead of loading ORM objects and validating them through the response models. The JSON and OpenAPI schema don't change
+LEAN_SERIALIZATION = os.getenv("LEAN_SERIALIZATION", "false").lower() in ("1", "true", "yes")
 
 db_dependency = Annotated[AsyncSession, Depends(get_db)]
+write_db_dependency = Annotated[AsyncSession, Depends(get_write_db)]
+
+# ETag helpers - ETags are strong and encode the object's version, which every write bumps
+def make_etag(version: int, updated_at: datetime) -> str:
+    return f'"{version}-{updated_at:%Y%m%d%H%M%S}"'
+
+def _parse_etags(header: str) -> List[str]:
+    return [etag.strip().removeprefix("W/") for etag in header.split(",") if etag.strip()]
+
+def _expected_versions(if_match: Optional[str]) -> Optional[List[int]]:
+    """Versions an If-Match header allows, or None when any version will do."""
+    if if_match is None or if_match.strip() == "*":
+        return None
+    versions = []
+    for etag in _parse_etags(if_match):
+        version = etag.strip('"').split("-", 1)[0]
+        if version.isdigit():
+            versions.append(int(version))
+    return versions
+
+def _conditional_response(cached: CachedResponse, if_none_match: Optional[str]) -> Response:
+    """Return 304 if the client's If-None-Match covers the current ETag, the cached JSON otherwise."""
+    if if_none_match is not None and (if_none_match.strip() == "*" or cached.etag in _parse_etags(if_none_match)):
+        return Response(status_code=304, headers={"ETag": cached.etag})
+    return Response(content=cached.content, media_type="application/json", headers={"ETag": cached.etag})
 
 @app.post("/shopping-lists/", response_model=ShoppingListResponse, operation_id="create_shopping_list", summary="Create a new shopping list")
-async def create_list(shopping_list: ShoppingListCreate, db: db_dependency):
+async def create_list(shopping_list: ShoppingListCreate, db: write_db_dependency):
     """Create a new shopping list with the given name and description."""
     return await create_shopping_list(db=db, shopping_list=shopping_list)
 
-@app.get("/shopping-lists/", response_model=List[ShoppingListResponse], operation_id="get_shopping_lists", summary="Get all shopping lists")
-async def read_lists(db: db_dependency,skip: int = 0, limit: int = 100):
-    """Retrieve all shopping lists with optional pagination."""
-    shopping_lists = await get_shopping_lists(db, skip=skip, limit=limit)
-    return shopping_lists
+@app.get("/shopping-lists/", response_model=ShoppingListPage, operation_id="get_shopping_lists", summary="Get all shopping lists")
+async def read_lists(db: db_dependency, cursor: str = None, limit: int = Query(100, ge=1, le=1000), include_counts: bool = False):
+    """Retrieve shopping lists page by page. Pass the returned next_cursor to get the following page, set include_counts to get item counts per list."""
+    try:
+        shopping_lists, next_cursor = await get_shopping_lists(db, cursor=cursor, limit=limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    summaries = [ShoppingListSummary.model_validate(shopping_list) for shopping_list in shopping_lists]
+    if include_counts and summaries:
+        counts = await get_shopping_list_counts(db, [summary.id for summary in summaries])
+        for summary in summaries:
+            summary.item_count, summary.completed_count = counts[summary.id]
+    return ShoppingListPage(items=summaries, next_cursor=next_cursor)
 
 @app.get("/shopping-lists/{shopping_list_id}", response_model=ShoppingListWithItems, operation_id="get_shopping_list", summary="Get a specific shopping list with items")
-async def read_list(shopping_list_id: int, db: db_dependency):
+async def read_list(shopping_list_id: int, db: db_dependency, if_none_match: Annotated[Optional[str], Header()] = None):
     """Retrieve a specific shopping list by ID along with all its items."""
-    db_shopping_list = await get_shopping_list(db, shopping_list_id=shopping_list_id)
-    if db_shopping_list is None:
+    async def load():
+        if LEAN_SERIALIZATION:
+            loaded = await get_shopping_list_dict(db, shopping_list_id=shopping_list_id)
+            if loaded is None:
+                return None
+            shopping_list, version = loaded
+            return CachedResponse(make_etag(version, shopping_list["updated_at"]), orjson.dumps(shopping_list))
+        db_shopping_list = await get_shopping_list(db, shopping_list_id=shopping_list_id)
+        if db_shopping_list is None:
+            return None
+        content = ShoppingListWithItems.model_validate(db_shopping_list).model_dump_json().encode()
+        return CachedResponse(make_etag(db_shopping_list.version, db_shopping_list.updated_at), content)
+
+    cached = await response_cache.get_or_load(shopping_list_key(shopping_list_id), load)
+    if cached is None:
         raise HTTPException(status_code=404, detail="Shopping list not found")
-    return db_shopping_list
+    return _conditional_response(cached, if_none_match)
 
 @app.put("/shopping-lists/{shopping_list_id}", response_model=ShoppingListResponse, operation_id="update_shopping_list", summary="Update a shopping list")
-async def update_list(shopping_list_id: int, shopping_list: ShoppingListUpdate, db: db_dependency):
+async def update_list(shopping_list_id: int, shopping_list: ShoppingListUpdate, db: write_db_dependency, response: Response, if_match: Annotated[Optional[str], Header()] = None):
     """Update an existing shopping list's name and/or description."""
-    db_shopping_list = await update_shopping_list(db, shopping_list_id=shopping_list_id, shopping_list=shopping_list)
+    try:
+        db_shopping_list = await update_shopping_list(db, shopping_list_id=shopping_list_id, shopping_list=shopping_list, expected_versions=_expected_versions(if_match))
+    except VersionConflictError:
+        raise HTTPException(status_code=412, detail="Shopping list was modified")
     if db_shopping_list is None:
         raise HTTPException(status_code=404, detail="Shopping list not found")
+    response.headers["ETag"] = make_etag(db_shopping_list.version, db_shopping_list.updated_at)
     return db_shopping_list
 
 @app.delete("/shopping-lists/{shopping_list_id}", operation_id="delete_shopping_list", summary="Delete a shopping list")
-async def delete_list(shopping_list_id: int, db: db_dependency):
+async def delete_list(shopping_list_id: int, db: write_db_dependency):
     """Delete a shopping list and all its items."""
     success = await delete_shopping_list(db, shopping_list_id=shopping_list_id)
     if not success:
         raise HTTPException(status_code=404, detail="Shopping list not found")
     return {"message": "Shopping list deleted successfully"}
 
+# Change feed - pushes what changed on a list instead of clients polling GET /shopping-lists/{id}
+async def _subscribe(shopping_list_id: int) -> Optional[Tuple[Subscription, ListEvent]]:
+    """Subscribe to a list's events, returning the subscription and a first event with the list's current version.
+
+    Subscribes before reading the version so no write can fall in between. Returns None if the list doesn't exist.
+    """
+    subscription = event_broker.subscribe(shopping_list_id)
+    try:
+        version = await _list_version(shopping_list_id)
+    except BaseException:
+        subscription.close()
+        raise
+    if version is None:
+        subscription.close()
+        return None
+    return subscription, list_event("subscribed", shopping_list_id, version)
+
+async def _list_version(shopping_list_id: int) -> Optional[int]:
+    # A session of our own: the stream outlives the request, and shouldn't hold a connection while it's open
+    async with AsyncSessionLocal() as db:
+        return await get_shopping_list_version(db, shopping_list_id)
+
+@app.get("/shopping-lists/{shopping_list_id}/events", operation_id="stream_shopping_list_events", summary="Stream changes to a shopping list", response_class=StreamingResponse)
+async def stream_list_events(shopping_list_id: int):
+    """Server-sent events for every change to a shopping list (item added, updated, toggled or deleted, list updated or deleted)."""
+    if await _list_version(shopping_list_id) is None:
+        raise HTTPException(status_code=404, detail="Shopping list not found")
+
+    async def generate():
+        # Subscribed once the body is being sent, so the finally below runs for every subscription: a generator
+        # that is never iterated (the client left before the response started) never runs it
+        subscribed = await _subscribe(shopping_list_id)
+        if subscribed is None:
+            # Deleted since the check above
+            return
+        subscription, first_event = subscribed
+        try:
+            yield first_event.to_sse()
+            while True:
+                event = await subscription.get(EVENT_KEEPALIVE)
+                # A comment line keeps proxies from timing out an idle stream
+                yield b": keepalive\n\n" if event is None else event.to_sse()
+        except SubscriptionClosed:
+            pass
+        finally:
+            subscription.close()
+
+    return StreamingResponse(generate(), media_type="text/event-stream", headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@app.websocket("/shopping-lists/{shopping_list_id}/ws")
+async def list_events_websocket(websocket: WebSocket, shopping_list_id: int):
+    """The events of /shopping-lists/{id}/events as WebSocket text messages."""
+    subscribed = await _subscribe(shopping_list_id)
+    if subscribed is None:
+        raise WebSocketException(code=1008, reason="Shopping list not found")
+    subscription, first_event = subscribed
+
+    async def wait_for_disconnect():
+        try:
+            while (await websocket.receive())["type"] != "websocket.disconnect":
+                pass
+        finally:
+            subscription.close()
+
+    try:
+        await websocket.accept()
+    except BaseException:
+        subscription.close()
+        raise
+    disconnect = asyncio.create_task(wait_for_disconnect())
+    try:
+        await websocket.send_text(first_event.data.decode())
+        while True:
+            event = await subscription.get()
+            await websocket.send_text(event.data.decode())
+    except SubscriptionClosed:
+        # Closed on our side (list deleted, or too slow under the disconnect policy) rather than by the client
+        if not disconnect.done():
+            await websocket.close()
+    except WebSocketDisconnect:
+        pass
+    finally:
+        disconnect.cancel()
+        subscription.close()
+
 @app.post("/shopping-items/", response_model=ShoppingItemResponse, operation_id="create_shopping_item", summary="Add an item to a shopping list")
-async def create_item(shopping_item: ShoppingItemCreate, db: db_dependency):
+async def create_item(shopping_item: ShoppingItemCreate, db: write_db_dependency):
     """Add a new item to a shopping list."""
-    shopping_list = await get_shopping_list(db, shopping_item.shopping_list_id)
-    if not shopping_list:
+    db_item = await create_shopping_item(db=db, shopping_item=shopping_item)
+    if db_item is None:
         raise HTTPException(status_code=404, detail="Shopping list not found")
-    return await create_shopping_item(db=db, shopping_item=shopping_item)
+    return db_item
 
 @app.get("/shopping-items/", response_model=List[ShoppingItemResponse], operation_id="get_shopping_items", summary="Get all shopping items")
 async def read_items(db: db_dependency, skip: int = 0, limit: int = 100, shopping_list_id: int = None):
     """Retrieve all shopping items with optional filtering by shopping list."""
+    if LEAN_SERIALIZATION:
+        return ORJSONResponse(await get_shopping_item_dicts(db, shopping_list_id=shopping_list_id, skip=skip, limit=limit))
     items = await get_shopping_items(db, shopping_list_id=shopping_list_id, skip=skip, limit=limit)
     return items
 
+# Search and bulk routes must be declared before the /shopping-items/{item_id} routes so "search" and "bulk" aren't parsed as item IDs
+@app.get("/shopping-items/search", response_model=List[ShoppingItemMatch], operation_id="search_shopping_items", summary="Find items in a shopping list by name")
+async def search_items(
+    db: db_dependency, shopping_list_id: int, q: str = Query(..., min_length=1, max_length=255),
+    limit: int = Query(5, ge=1, le=50), is_completed: Optional[bool] = None,
+):
+    """Find the items of a shopping list whose name (or notes) best match q, tolerating typos and partial names, best match first. Set is_completed to only search open or completed items."""
+    matches = await search_shopping_items(db, shopping_list_id=shopping_list_id, query=q, limit=limit, is_completed=is_completed)
+    return [ShoppingItemMatch(**ShoppingItemResponse.model_validate(item).model_dump(), score=score) for item, score in matches]
+
+def _bulk_results(item_ids: List[int], items: dict) -> ShoppingItemBulkResponse:
+    """Build per-operation results for a batch keyed by item ID. Only the first operation on an ID is applied, later ones fail."""
+    results, seen = [], set()
+    for index, item_id in enumerate(item_ids):
+        if item_id in seen:
+            results.append(ShoppingItemBulkResult(index=index, success=False, item_id=item_id, error="Duplicate shopping item ID"))
+        elif item_id in items:
+            results.append(ShoppingItemBulkResult(index=index, success=True, item_id=item_id, item=items[item_id]))
+        else:
+            results.append(ShoppingItemBulkResult(index=index, success=False, item_id=item_id, error="Shopping item not found"))
+        seen.add(item_id)
+    return ShoppingItemBulkResponse(results=results)
+
+@app.post("/shopping-items/bulk", response_model=ShoppingItemBulkResponse, operation_id="create_shopping_items", summary="Add several items to shopping lists")
+async def create_items(shopping_items: ShoppingItemBulkCreate, db: write_db_dependency):
+    """Add multiple items in one transaction. Items whose shopping list doesn't exist are reported as failed, the rest are still added."""
+    created = await create_shopping_items(db, shopping_items=shopping_items.items)
+    return ShoppingItemBulkResponse(results=[
+        ShoppingItemBulkResult(index=index, success=True, item_id=item.id, item=item)
+        if item is not None else
+        ShoppingItemBulkResult(index=index, success=False, error="Shopping list not found")
+        for index, item in enumerate(created)
+    ])
+
+@app.put("/shopping-items/bulk", response_model=ShoppingItemBulkResponse, operation_id="update_shopping_items", summary="Update several shopping items")
+async def update_items(shopping_items: ShoppingItemBulkUpdate, db: write_db_dependency):
+    """Update multiple items in one transaction. Unknown item IDs and repeats of an ID are reported as failed, the rest are still updated."""
+    updated = await update_shopping_items(db, shopping_items=shopping_items.items)
+    return _bulk_results([entry.id for entry in shopping_items.items], updated)
+
+@app.patch("/shopping-items/bulk/toggle", response_model=ShoppingItemBulkResponse, operation_id="toggle_items_completion", summary="Toggle completion status of several items")
+async def toggle_completions(shopping_items: ShoppingItemBulkIds, db: write_db_dependency):
+    """Toggle the completion status of multiple items in one transaction. Unknown item IDs and repeats of an ID are reported as failed."""
+    toggled = await toggle_items_completion(db, item_ids=shopping_items.item_ids)
+    return _bulk_results(shopping_items.item_ids, toggled)
+
+@app.post("/shopping-items/bulk/delete", response_model=ShoppingItemBulkResponse, operation_id="delete_shopping_items", summary="Delete several shopping items")
+async def delete_items(shopping_items: ShoppingItemBulkIds, db: write_db_dependency):
+    """Delete multiple items in one transaction. Unknown item IDs and repeats of an ID are reported as failed."""
+    deleted = await delete_shopping_items(db, item_ids=shopping_items.item_ids)
+    return _bulk_results(shopping_items.item_ids, {item_id: None for item_id in deleted})
+
 @app.get("/shopping-items/{item_id}", response_model=ShoppingItemResponse, operation_id="get_shopping_item", summary="Get a specific shopping item")
-async def read_item(item_id: int, db: db_dependency):
+async def read_item(item_id: int, db: db_dependency, if_none_match: Annotated[Optional[str], Header()] = None):
     """Retrieve a specific shopping item by ID."""
-    db_item = await get_shopping_item(db, item_id=item_id)
-    if db_item is None:
+    async def load():
+        if LEAN_SERIALIZATION:
+            loaded = await get_shopping_item_dict(db, item_id=item_id)
+            if loaded is None:
+                return None
+            item, version = loaded
+            return CachedResponse(make_etag(version, item["updated_at"]), orjson.dumps(item))
+        db_item = await get_shopping_item(db, item_id=item_id)
+        if db_item is None:
+            return None
+        content = ShoppingItemResponse.model_validate(db_item).model_dump_json().encode()
+        return CachedResponse(make_etag(db_item.version, db_item.updated_at), content)
+
+    cached = await response_cache.get_or_load(shopping_item_key(item_id), load)
+    if cached is None:
         raise HTTPException(status_code=404, detail="Shopping item not found")
-    return db_item
+    return _conditional_response(cached, if_none_match)
 
 @app.put("/shopping-items/{item_id}", response_model=ShoppingItemResponse, operation_id="update_shopping_item", summary="Update a shopping item")
-async def update_item(item_id: int, shopping_item: ShoppingItemUpdate, db: db_dependency):
+async def update_item(item_id: int, shopping_item: ShoppingItemUpdate, db: write_db_dependency, response: Response, if_match: Annotated[Optional[str], Header()] = None):
     """Update an existing shopping item's details."""
-    db_item = await update_shopping_item(db, item_id=item_id, shopping_item=shopping_item)
+    try:
+        db_item = await update_shopping_item(db, item_id=item_id, shopping_item=shopping_item, expected_versions=_expected_versions(if_match))
+    except VersionConflictError:
+        raise HTTPException(status_code=412, detail="Shopping item was modified")
     if db_item is None:
         raise HTTPException(status_code=404, detail="Shopping item not found")
+    response.headers["ETag"] = make_etag(db_item.version, db_item.updated_at)
     return db_item
 
 @app.delete("/shopping-items/{item_id}", operation_id="delete_shopping_item", summary="Delete a shopping item")
-async def delete_item(item_id: int, db: db_dependency):
+async def delete_item(item_id: int, db: write_db_dependency):
     """Delete a shopping item from its list."""
     success = await delete_shopping_item(db, item_id=item_id)
     if not success:
@@ -101,14 +357,156 @@ async def delete_item(item_id: int, db: db_dependency):
     return {"message": "Shopping item deleted successfully"}
 
 @app.patch("/shopping-items/{item_id}/toggle", response_model=ShoppingItemResponse, operation_id="toggle_item_completion", summary="Toggle item completion status")
-async def toggle_completion(item_id: int, db: db_dependency):
+async def toggle_completion(item_id: int, db: write_db_dependency, response: Response, if_match: Annotated[Optional[str], Header()] = None):
     """Toggle the completion status of a shopping item (mark as completed/uncompleted)."""
-    db_item = await toggle_item_completion(db, item_id=item_id)
+    try:
+        db_item = await toggle_item_completion(db, item_id=item_id, expected_versions=_expected_versions(if_match))
+    except VersionConflictError:
+        raise HTTPException(status_code=412, detail="Shopping item was modified")
     if db_item is None:
         raise HTTPException(status_code=404, detail="Shopping item not found")
+    response.headers["ETag"] = make_etag(db_item.version, db_item.updated_at)
     return db_item 
 
-# Turn FastAPI app into an MCP server - must call after route declarations:
-mcp = FastApiMCP(app)
+# Export/Import - records are streamed and written in batches so memory stays flat for any data size
+EXPORT_BATCH_SIZE = 1000
+IMPORT_BATCH_SIZE = 1000
+MAX_IMPORT_ERRORS = 100
+
+_record_adapter = TypeAdapter(Annotated[Union[ShoppingListRecord, ShoppingItemRecord], Field(discriminator="type")])
+
+@app.get("/export", operation_id="export_shopping_lists", summary="Export all shopping lists and items as NDJSON", response_class=StreamingResponse)
+async def export_lists():
+    """Stream every shopping list followed by every item as newline-delimited JSON, one record per line."""
+    async def generate():
+        # The request's session dependency is closed before the body is streamed, so use a session of our own
+        async with AsyncSessionLocal() as db:
+            async for records in export_shopping_data(db, batch_size=EXPORT_BATCH_SIZE):
+                yield b"".join(record.model_dump_json().encode() + b"\n" for record in records)
+
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
+
+@app.post(
+    "/import", response_model=ImportResult, operation_id="import_shopping_lists", summary="Import shopping lists and items from NDJSON",
+    openapi_extra={"requestBody": {"content": {"application/x-ndjson": {"schema": {"type": "string"}}}, "required": True}},
+)
+async def import_lists(request: Request):
+    """Import the NDJSON produced by /export. Lists get new IDs and their items are attached to them; invalid lines are skipped and reported."""
+    list_ids = {}
+    pending_lists, pending_items = [], []
+    result = ImportResult(lists=0, items=0)
+
+    def report(line_number: int, error: str):
+        if len(result.errors) < MAX_IMPORT_ERRORS:
+            result.errors.append(f"line {line_number}: {error}")
+
+    async def flush_lists():
+        async with write_session() as db:
+            list_ids.update(await import_shopping_lists(db, pending_lists))
+        result.lists += len(pending_lists)
+        pending_lists.clear()
+
+    async def flush_items():
+        async with write_session() as db:
+            await import_shopping_items(db, pending_items, list_ids)
+        result.items += len(pending_items)
+        pending_items.clear()
+
+    async def handle(line_number: int, line: bytes):
+        if not line.strip():
+            return
+        try:
+            record = _record_adapter.validate_json(line)
+        except ValidationError as e:
+            report(line_number, e.errors()[0]["msg"])
+            return
+        if isinstance(record, ShoppingListRecord):
+            pending_lists.append(record)
+            if len(pending_lists) >= IMPORT_BATCH_SIZE:
+                await flush_lists()
+            return
+        if pending_lists:
+            await flush_lists()
+        if record.shopping_list_id not in list_ids:
+            report(line_number, f"shopping list {record.shopping_list_id} not found in the import")
+            return
+        pending_items.append(record)
+        if len(pending_items) >= IMPORT_BATCH_SIZE:
+            await flush_items()
+
+    buffer = b""
+    line_number = 0
+    async for chunk in request.stream():
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            line_number += 1
+            await handle(line_number, line)
+    await handle(line_number + 1, buffer)
+    if pending_lists:
+        await flush_lists()
+    if pending_items:
+        await flush_items()
+    return result
+
+@app.get("/cache/stats", include_in_schema=False)
+async def read_cache_stats():
+    """Hit/miss/eviction counters of the response cache."""
+    return response_cache.stats()
+
+for _counter in ("hits", "misses", "evictions", "entries"):
+    metrics.gauges[f"response_cache_{_counter}"] = (f"Response cache {_counter}", lambda counter=_counter: response_cache.stats()[counter])
+
+@app.get("/events/stats", include_in_schema=False)
+async def read_event_stats():
+    """Subscriber and delivery counters of the change feed."""
+    return event_broker.stats()
+
+for _counter in ("subscribers", "published", "delivered", "dropped", "disconnects"):
+    metrics.gauges[f"change_feed_{_counter}"] = (f"Change feed {_counter}", lambda counter=_counter: event_broker.stats()[counter])
+
+@app.get("/healthz", include_in_schema=False)
+async def read_health():
+    """Liveness: the process is up and serving requests."""
+    return {"status": "ok"}
+
+@app.get("/readyz", include_in_schema=False)
+async def read_readiness():
+    """Readiness: started, the database answers and, on Postgres, the cluster bus is connected."""
+    checks = {"started": getattr(app.state, "ready", False)}
+    try:
+        await asyncio.wait_for(ping_database(), READINESS_TIMEOUT)
+        checks["database"] = True
+    except Exception as e:
+        logger.warning("Readiness check: database unavailable: %s", e)
+        checks["database"] = False
+    if getattr(app.state, "cluster_bus", None) is not None:
+        checks["cluster_bus"] = app.state.cluster_bus.connected
+    ready = all(checks.values())
+    return ORJSONResponse({"status": "ready" if ready else "unavailable", "checks": checks, "pid": os.getpid()}, status_code=200 if ready else 503)
+
+def _cluster_stat(name: str) -> float:
+    bus = getattr(app.state, "cluster_bus", None)
+    return bus.stats()[name] if bus is not None else 0
+
+for _counter in ("connected", "sent", "received"):
+    metrics.gauges[f"cluster_bus_{_counter}"] = (f"Cluster bus {_counter}", lambda counter=_counter: _cluster_stat(counter))
+
+@app.get("/metrics", include_in_schema=False, response_class=PlainTextResponse)
+async def read_metrics():
+    """Request and database metrics per operation in the Prometheus text format."""
+    return metrics.render()
+
+# Turn FastAPI app into an MCP server - must call after route declarations, creating it generates the tools
+# (the routes mount() adds aren't in the schema, so they don't need generating again afterwards)
+mcp = (CachedFastApiMCP if FAST_STARTUP else FastApiMCP)(
+    app, exclude_operations=["export_shopping_lists", "import_shopping_lists", "stream_shopping_list_events"]
+)
 mcp.mount()
-mcp.setup_server()
\ No newline at end of file
+
+# The same MCP server over Streamable HTTP at /mcp-http/: each message is a single POST answered with JSON,
+# instead of a POST plus a reply pushed down the long-lived SSE stream
+async def handle_mcp_http(scope, receive, send):
+    await app.state.mcp_http.handle_request(scope, receive, send)
+
+app.mount("/mcp-http", handle_mcp_http)
\ No newline at end of file
@@ -0,0 +1,97 @@
+"""On-disk cache of the MCP tools FastApiMCP derives from the app's OpenAPI schema.
+
+Generating the OpenAPI schema and converting it to tools is the costliest part of
+importing server.main after the libraries themselves. The result only changes with the
+server's code or the libraries generating it, so CachedFastApiMCP stores it next to a
+hash of those and reuses it while the hash matches.
+"""
+import hashlib
+import json
+import logging
+import os
+import sys
+from importlib.metadata import version
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+from fastapi_mcp import FastApiMCP
+from fastapi_mcp.types import HTTPRequestInfo
+from mcp import types
+from mcp.server.lowlevel.server import Server
+
+logger = logging.getLogger(__name__)
+
+MCP_MANIFEST_PATH = os.getenv("MCP_MANIFEST_PATH", "mcp_manifest.json")
+
+# Libraries whose versions change the schema or the tools generated from it
+_GENERATORS = ("fastapi", "fastapi-mcp", "mcp", "pydantic")
+
+def code_hash(*extra: str) -> str:
+    """Hash of the Python version, the generating libraries' versions, the server package's source and extra."""
+    digest = hashlib.sha256(sys.version.encode())
+    for name in _GENERATORS:
+        digest.update(f"{name}=={version(name)}\n".encode())
+    for path in sorted(Path(__file__).parent.glob("*.py")):
+        digest.update(path.name.encode() + b"\n" + path.read_bytes())
+    for value in extra:
+        digest.update(value.encode())
+    return digest.hexdigest()
+
+class CachedFastApiMCP(FastApiMCP):
+    """FastApiMCP loading its tools and operation map from manifest_path instead of generating them, when they are current."""
+
+    def __init__(self, *args, manifest_path: str = MCP_MANIFEST_PATH, **kwargs):
+        self.manifest_path = manifest_path
+        super().__init__(*args, **kwargs)
+
+    def _manifest_key(self) -> str:
+        options = (self._describe_all_responses, self._describe_full_response_schema, self._include_operations, self._exclude_operations, self._include_tags, self._exclude_tags)
+        return code_hash(self.name, self.description or "", json.dumps(options))
+
+    def setup_server(self) -> None:
+        key = self._manifest_key()
+        manifest = self._load_manifest(key)
+        if manifest is None:
+            super().setup_server()
+            self._save_manifest(key)
+            return
+        self.tools = [types.Tool.model_validate(tool) for tool in manifest["tools"]]
+        self.operation_map = manifest["operation_map"]
+        self.server = self._create_server()
+
+    def _load_manifest(self, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self.manifest_path) as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return manifest if manifest.get("key") == key else None
+
+    def _save_manifest(self, key: str) -> None:
+        manifest = {"key": key, "tools": [tool.model_dump(mode="json") for tool in self.tools], "operation_map": self.operation_map}
+        # Several workers may start at once: write aside and rename, so nobody reads a half-written file
+        temp_path = f"{self.manifest_path}.{os.getpid()}.tmp"
+        try:
+            with open(temp_path, "w") as f:
+                json.dump(manifest, f)
+            os.replace(temp_path, self.manifest_path)
+        except OSError as e:
+            logger.warning("Could not cache the MCP manifest at %s: %s", self.manifest_path, e)
+
+    def _create_server(self) -> Server:
+        """The MCP server serving self.tools, as FastApiMCP.setup_server creates it."""
+        mcp_server = Server(self.name, self.description)
+
+        @mcp_server.list_tools()
+        async def handle_list_tools() -> List[types.Tool]:
+            return self.tools
+
+        @mcp_server.call_tool()
+        async def handle_call_tool(
+            name: str, arguments: Dict[str, Any], http_request_info: Optional[HTTPRequestInfo] = None
+        ) -> List[Union[types.TextContent, types.ImageContent, types.EmbeddedResource]]:
+            return await self._execute_api_tool(
+                client=self._http_client, tool_name=name, arguments=arguments, operation_map=self.operation_map, http_request_info=http_request_info,
+            )
+
+        return mcp_server
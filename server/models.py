@@ -1,6 +1,6 @@
 from datetime import datetime
 from typing import Optional
-from sqlalchemy import Integer, String, Boolean, DateTime, ForeignKey, Text
+from sqlalchemy import DDL, Integer, String, Boolean, DateTime, ForeignKey, Text, Index, event
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship, Mapped, mapped_column
@@ -15,12 +15,21 @@ class ShoppingList(Base):
     description: Mapped[Optional[str]] = mapped_column(Text)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=func.now())
     updated_at: Mapped[datetime] = mapped_column(DateTime, default=func.now(), onupdate=func.now())
+    # Bumped on every change to the list or any of its items, used for ETags
+    version: Mapped[int] = mapped_column(Integer, default=1, server_default="1")
     
-    # Relationship to items
-    items: Mapped[list["ShoppingItem"]] = relationship("ShoppingItem", back_populates="shopping_list", cascade="all, delete-orphan", lazy="selectin")
+    # Relationship to items, in ID order (without order_by the planner may pick the is_completed index and group items by status)
+    items: Mapped[list["ShoppingItem"]] = relationship(
+        "ShoppingItem", back_populates="shopping_list", cascade="all, delete-orphan", lazy="selectin", order_by="ShoppingItem.id"
+    )
 
 class ShoppingItem(Base):
     __tablename__ = "shopping_items"
+    __table_args__ = (
+        # Item reads by list (optionally filtered by completion), the selectin load of ShoppingList.items and cascade deletes
+        Index("ix_shopping_items_shopping_list_id_is_completed", "shopping_list_id", "is_completed"),
+        Index("ix_shopping_items_shopping_list_id_id", "shopping_list_id", "id"),
+    )
     
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     name: Mapped[str] = mapped_column(String(255))
@@ -29,8 +38,30 @@ class ShoppingItem(Base):
     notes: Mapped[Optional[str]] = mapped_column(Text)
     is_completed: Mapped[bool] = mapped_column(Boolean, default=False)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=func.now())
-    updated_at: Mapped[datetime] = mapped_column(DateTime, default=func.now(), onupdate=func.now())
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=func.now(), onupdate=func.now(), index=True)
+    # Bumped on every change to the item, used for ETags
+    version: Mapped[int] = mapped_column(Integer, default=1, server_default="1")
     
     # Foreign key to shopping list
     shopping_list_id: Mapped[int] = mapped_column(Integer, ForeignKey("shopping_lists.id"))
-    shopping_list: Mapped[ShoppingList] = relationship("ShoppingList", back_populates="items") 
\ No newline at end of file
+    shopping_list: Mapped[ShoppingList] = relationship("ShoppingList", back_populates="items")
+
+# Full-text index of item names and notes for item search, SQLite only. The trigram tokenizer matches any substring
+# and lets a misspelt query still share most trigrams with the name; the triggers keep the index in sync with
+# every write path, bulk statements and imports included
+SHOPPING_ITEM_FTS_TABLE = "shopping_items_fts"
+SHOPPING_ITEM_FTS_DDL = [
+    f"CREATE VIRTUAL TABLE {SHOPPING_ITEM_FTS_TABLE} USING fts5(name, notes, content='shopping_items', content_rowid='id', tokenize='trigram')",
+    f"""CREATE TRIGGER shopping_items_fts_insert AFTER INSERT ON shopping_items BEGIN
+        INSERT INTO {SHOPPING_ITEM_FTS_TABLE}(rowid, name, notes) VALUES (new.id, new.name, new.notes);
+    END""",
+    f"""CREATE TRIGGER shopping_items_fts_delete AFTER DELETE ON shopping_items BEGIN
+        INSERT INTO {SHOPPING_ITEM_FTS_TABLE}({SHOPPING_ITEM_FTS_TABLE}, rowid, name, notes) VALUES ('delete', old.id, old.name, old.notes);
+    END""",
+    f"""CREATE TRIGGER shopping_items_fts_update AFTER UPDATE OF name, notes ON shopping_items BEGIN
+        INSERT INTO {SHOPPING_ITEM_FTS_TABLE}({SHOPPING_ITEM_FTS_TABLE}, rowid, name, notes) VALUES ('delete', old.id, old.name, old.notes);
+        INSERT INTO {SHOPPING_ITEM_FTS_TABLE}(rowid, name, notes) VALUES (new.id, new.name, new.notes);
+    END""",
+]
+for _statement in SHOPPING_ITEM_FTS_DDL:
+    event.listen(ShoppingItem.__table__, "after_create", DDL(_statement).execute_if(dialect="sqlite"))
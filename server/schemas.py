@@ -1,6 +1,6 @@
-from typing import Optional, List
+from typing import Literal, Optional, List
 from datetime import datetime
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
 
 # Shopping List Schemas
 class ShoppingListBase(BaseModel):
@@ -22,6 +22,14 @@ class ShoppingListResponse(ShoppingListBase):
     class Config:
         from_attributes = True
 
+class ShoppingListSummary(ShoppingListResponse):
+    item_count: Optional[int] = Field(None, description="Number of items on the list, only set when counts are requested")
+    completed_count: Optional[int] = Field(None, description="Number of completed items on the list, only set when counts are requested")
+
+class ShoppingListPage(BaseModel):
+    items: List[ShoppingListSummary]
+    next_cursor: Optional[str] = Field(None, description="Opaque cursor for the next page, null on the last page")
+
 # Shopping Item Schemas
 class ShoppingItemBase(BaseModel):
     name: str = Field(..., min_length=1, max_length=255, description="Name of the item")
@@ -40,6 +48,14 @@ class ShoppingItemUpdate(BaseModel):
     notes: Optional[str] = None
     is_completed: Optional[bool] = None
 
+    @field_validator("name", "quantity", "is_completed")
+    @classmethod
+    def not_null(cls, value):
+        # Leave a field out to keep it; these columns can't be cleared
+        if value is None:
+            raise ValueError("may be omitted but not null")
+        return value
+
 class ShoppingItemResponse(ShoppingItemBase):
     id: int
     shopping_list_id: int
@@ -49,9 +65,60 @@ class ShoppingItemResponse(ShoppingItemBase):
     class Config:
         from_attributes = True
 
+class ShoppingItemMatch(ShoppingItemResponse):
+    score: float = Field(..., description="How well the item matches the search, higher is better")
+
 # Combined Response Schemas
 class ShoppingListWithItems(ShoppingListResponse):
     items: List[ShoppingItemResponse] = []
     
     class Config:
-        from_attributes = True 
\ No newline at end of file
+        from_attributes = True 
+
+# Bulk Item Schemas
+class ShoppingItemBulkCreate(BaseModel):
+    items: List[ShoppingItemCreate] = Field(..., min_length=1, description="Items to add, possibly across several shopping lists")
+
+class ShoppingItemBulkUpdateEntry(ShoppingItemUpdate):
+    id: int = Field(..., description="ID of the shopping item to update")
+
+class ShoppingItemBulkUpdate(BaseModel):
+    items: List[ShoppingItemBulkUpdateEntry] = Field(..., min_length=1, description="Per-item changes; only the given fields are updated")
+
+class ShoppingItemBulkIds(BaseModel):
+    item_ids: List[int] = Field(..., min_length=1, description="IDs of the shopping items to operate on")
+
+class ShoppingItemBulkResult(BaseModel):
+    index: int = Field(..., description="Position of the operation in the request")
+    success: bool
+    item_id: Optional[int] = None
+    item: Optional[ShoppingItemResponse] = None
+    error: Optional[str] = None
+
+class ShoppingItemBulkResponse(BaseModel):
+    results: List[ShoppingItemBulkResult]
+
+# Export/Import Schemas - one NDJSON line per record, all lists before their items
+class ShoppingListRecord(ShoppingListBase):
+    type: Literal["list"] = "list"
+    id: int
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+class ShoppingItemRecord(ShoppingItemBase):
+    type: Literal["item"] = "item"
+    id: int
+    shopping_list_id: int
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+class ImportResult(BaseModel):
+    lists: int = Field(..., description="Number of shopping lists imported")
+    items: int = Field(..., description="Number of shopping items imported")
+    errors: List[str] = Field([], description="Lines that couldn't be imported (first 100)")
@@ -0,0 +1,103 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, List, Optional
+
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, AsyncSession
+
+from .instrumentation import record_pool_wait
+
+class GroupCommitSession(AsyncSession):
+    """Session running inside a SAVEPOINT of the writer's shared transaction.
+
+    commit() releases the savepoint, lets the next writer in and then waits until the
+    batch containing this session's changes is durably committed.
+    """
+
+    def __init__(self, writer: "SQLiteWriter", **kwargs):
+        super().__init__(**kwargs)
+        self._writer = writer
+        self._holds_lock = True
+
+    async def commit(self) -> None:
+        await super().commit()
+        self._release()
+        await self._writer._wait_for_commit()
+
+    def _release(self) -> None:
+        if self._holds_lock:
+            self._holds_lock = False
+            self._writer._lock.release()
+
+class SQLiteWriter:
+    """Single writer connection that group-commits the writes of concurrent requests.
+
+    Requests take turns on the connection, each in its own SAVEPOINT so a failing request
+    only rolls back its own changes. Whoever is queued when the batch is flushed shares
+    one COMMIT, so N concurrent writes cost one fsync instead of N.
+    """
+
+    def __init__(self, engine: AsyncEngine):
+        self.engine = engine
+        self._lock = asyncio.Lock()
+        self._connection: Optional[AsyncConnection] = None
+        self._pending: List[asyncio.Future] = []
+        self._flush_task: Optional[asyncio.Task] = None
+        self.batches = 0
+        self.commits = 0
+
+    @asynccontextmanager
+    async def session(self) -> AsyncIterator[AsyncSession]:
+        start = time.perf_counter()
+        await self._lock.acquire()
+        record_pool_wait(time.perf_counter() - start)
+        session = None
+        try:
+            if self._connection is None:
+                self._connection = await self.engine.connect()
+            if not self._connection.in_transaction():
+                await self._connection.begin()
+            session = GroupCommitSession(
+                self, bind=self._connection, join_transaction_mode="create_savepoint", autoflush=False, expire_on_commit=False
+            )
+            yield session
+        finally:
+            if session is not None:
+                # Rolls back to the savepoint unless the session already committed
+                await session.close()
+                session._release()
+            else:
+                self._lock.release()
+
+    async def _wait_for_commit(self) -> None:
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append(future)
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush())
+        await future
+
+    async def _flush(self) -> None:
+        # The lock is FIFO, so every writer queued before this point gets to add its changes first
+        async with self._lock:
+            pending, self._pending = self._pending, []
+            self._flush_task = None
+            try:
+                await self._connection.commit()
+            except Exception as e:
+                await self._connection.rollback()
+                for future in pending:
+                    if not future.done():
+                        future.set_exception(e)
+                return
+            self.batches += 1
+            self.commits += len(pending)
+            for future in pending:
+                if not future.done():
+                    future.set_result(None)
+
+    async def close(self) -> None:
+        if self._flush_task is not None:
+            await self._flush_task
+        if self._connection is not None:
+            await self._connection.close()
+            self._connection = None
@@ -0,0 +1,45 @@
+"""Point the server at a throwaway SQLite database before any test imports it."""
+import asyncio
+import os
+import tempfile
+
+import pytest
+
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{tempfile.mkdtemp(prefix='shopping-tests-')}/test.db"
+for _flag in ("SQLITE_TUNING", "LEAN_SERIALIZATION", "FAST_STARTUP", "WEB_CONCURRENCY"):
+    os.environ.pop(_flag, None)
+
+async def _reset_database(create: bool) -> None:
+    """Create the schema or empty its tables, through an engine of its own so no connection is shared with the app's event loop."""
+    from sqlalchemy import delete
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    from server.database import DATABASE_URL
+    from server.models import Base, ShoppingItem, ShoppingList
+
+    engine = create_async_engine(DATABASE_URL)
+    async with engine.begin() as conn:
+        if create:
+            await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(delete(ShoppingItem))
+        await conn.execute(delete(ShoppingList))
+    await engine.dispose()
+
+@pytest.fixture(scope="session")
+def app():
+    from server.main import app
+
+    asyncio.run(_reset_database(create=True))
+    return app
+
+@pytest.fixture
+def client(app):
+    """TestClient of the app over empty tables and an empty response cache."""
+    from fastapi.testclient import TestClient
+
+    from server.cache import response_cache
+
+    asyncio.run(_reset_database(create=False))
+    asyncio.run(response_cache.clear())
+    with TestClient(app) as client:
+        yield client
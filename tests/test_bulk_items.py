@@ -0,0 +1,38 @@
+"""Per-operation results of the bulk item routes."""
+
+def _create_items(client, *names) -> list:
+    shopping_list_id = client.post("/shopping-lists/", json={"name": "Groceries"}).json()["id"]
+    items = [{"name": name, "shopping_list_id": shopping_list_id} for name in names]
+    return [result["item_id"] for result in client.post("/shopping-items/bulk", json={"items": items}).json()["results"]]
+
+def _outcomes(response) -> list:
+    return [(result["success"], result["error"]) for result in response.json()["results"]]
+
+def test_toggle_applies_a_repeated_id_once(client):
+    milk, eggs = _create_items(client, "Milk", "Eggs")
+    response = client.patch("/shopping-items/bulk/toggle", json={"item_ids": [milk, eggs, milk, 0]})
+    assert _outcomes(response) == [(True, None), (True, None), (False, "Duplicate shopping item ID"), (False, "Shopping item not found")]
+    assert client.get(f"/shopping-items/{milk}").json()["is_completed"] is True
+
+def test_delete_reports_a_repeated_id_as_failed(client):
+    milk, = _create_items(client, "Milk")
+    response = client.post("/shopping-items/bulk/delete", json={"item_ids": [milk, milk]})
+    assert _outcomes(response) == [(True, None), (False, "Duplicate shopping item ID")]
+    assert client.get(f"/shopping-items/{milk}").status_code == 404
+
+def test_update_applies_only_the_first_entry_for_an_id(client):
+    milk, = _create_items(client, "Milk")
+    response = client.put("/shopping-items/bulk", json={"items": [{"id": milk, "quantity": 2}, {"id": milk, "name": "Oat milk", "quantity": 3}]})
+    assert _outcomes(response) == [(True, None), (False, "Duplicate shopping item ID")]
+    item = client.get(f"/shopping-items/{milk}").json()
+    assert (item["name"], item["quantity"]) == ("Milk", 2)
+
+def test_update_rejects_null_for_required_fields(client):
+    milk, = _create_items(client, "Milk")
+    for field in ("name", "quantity", "is_completed"):
+        assert client.put("/shopping-items/bulk", json={"items": [{"id": milk, field: None}]}).status_code == 422
+        assert client.put(f"/shopping-items/{milk}", json={field: None}).status_code == 422
+    response = client.put("/shopping-items/bulk", json={"items": [{"id": milk, "unit": None, "notes": None}]})
+    assert _outcomes(response) == [(True, None)]
+    item = client.get(f"/shopping-items/{milk}").json()
+    assert (item["name"], item["quantity"], item["is_completed"]) == ("Milk", 1, False)
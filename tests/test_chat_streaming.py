@@ -0,0 +1,65 @@
+"""Time to first feedback of a streamed chatbot turn, against a scripted model so no network is needed."""
+import asyncio
+import json
+import time
+
+from langchain_core.messages import AIMessage
+from langchain_core.tools import tool
+from langgraph.checkpoint.memory import InMemorySaver
+
+from benchmarks.fake_llm import ScriptedChatModel
+from chatbot import create_agent, stream_agent_reply
+
+ANSWER = "I've added a watermelon to your shopping list. You now have 3 items on it: watermelon, spaghetti and tomato sauce. Anything else?"
+MESSAGE = "I need to buy a watermelon"
+
+def _make_agent():
+    # Generating the answer takes longer than everything before its first token, as it does with a real model
+    llm = ScriptedChatModel(
+        script=[
+            AIMessage(content="", tool_calls=[{"name": "create_shopping_item", "args": {"name": "watermelon", "shopping_list_id": 1}, "id": "call_1"}]),
+            AIMessage(content=ANSWER),
+        ],
+        first_token_delay=0.1,
+        token_delay=0.05,
+    )
+
+    @tool
+    async def create_shopping_item(name: str, shopping_list_id: int) -> str:
+        """Create a new shopping item."""
+        await asyncio.sleep(0.1)
+        return json.dumps({"id": 1, "name": name, "shopping_list_id": shopping_list_id, "is_completed": False})
+
+    return create_agent(llm, [create_shopping_item], InMemorySaver(), policy="none", fast_path=False)
+
+async def _stream_turn(agent, thread_id: str) -> dict:
+    """Seconds until the first tool progress message, the first answer token and the end of the turn."""
+    start = time.perf_counter()
+    timings = {"progress": None, "token": None}
+    async for reply in stream_agent_reply(agent, MESSAGE, thread_id):
+        now = time.perf_counter() - start
+        if timings["progress"] is None and any(message.metadata.get("title") and message.metadata.get("status") for message in reply):
+            timings["progress"] = now
+        if timings["token"] is None and any(not message.metadata for message in reply):
+            timings["token"] = now
+    timings["complete"] = time.perf_counter() - start
+    timings["answer"] = reply[-1].content
+    return timings
+
+def test_streamed_turn_shows_progress_and_first_token_before_it_ends():
+    async def run():
+        agent = _make_agent()
+        start = time.perf_counter()
+        result = await agent.ainvoke({"messages": [{"role": "user", "content": MESSAGE}]}, {"configurable": {"thread_id": "blocking"}})
+        blocking = time.perf_counter() - start
+        assert result["messages"][-1].content == ANSWER
+
+        # The first turn imports gradio, keep that out of the measured one
+        await _stream_turn(agent, "warm-up")
+        return blocking, await _stream_turn(agent, "streaming")
+
+    blocking, timings = asyncio.run(run())
+    assert timings["answer"] == ANSWER
+    assert timings["progress"] is not None and timings["progress"] < timings["token"]
+    assert timings["token"] < timings["complete"] / 2
+    assert timings["token"] < blocking / 2
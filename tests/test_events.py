@@ -0,0 +1,10 @@
+"""Subscriptions of the change feed routes."""
+from server import main
+from server.events import event_broker
+
+def test_event_stream_never_sent_leaves_no_subscriber(client):
+    shopping_list_id = client.post("/shopping-lists/", json={"name": "Groceries"}).json()["id"]
+    # The client went away before the response started: its body is never iterated
+    response = client.portal.call(main.stream_list_events, shopping_list_id)
+    assert response.status_code == 200
+    assert shopping_list_id not in event_broker.subscribed_lists()
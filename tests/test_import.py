@@ -0,0 +1,31 @@
+"""Timestamps of imported records."""
+import json
+import time
+from datetime import datetime
+
+import pytest
+
+@pytest.fixture
+def local_time_ahead_of_utc(monkeypatch):
+    """Run in a local time zone 9 hours ahead of UTC, so local timestamps can't pass for UTC ones."""
+    monkeypatch.setenv("TZ", "Asia/Tokyo")
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+def _exported(client) -> list:
+    return [json.loads(line) for line in client.get("/export").text.splitlines()]
+
+def test_missing_timestamps_match_the_column_default(client, local_time_ahead_of_utc):
+    client.post("/shopping-lists/", json={"name": "Created"})
+    body = json.dumps({"type": "list", "id": 1, "name": "Imported"}) + "\n" + json.dumps({"type": "item", "id": 1, "name": "Milk", "shopping_list_id": 1})
+    assert client.post("/import", content=body, headers={"Content-Type": "application/x-ndjson"}).json()["items"] == 1
+
+    created, imported, item = _exported(client)
+    assert imported["name"] == "Imported" and item["name"] == "Milk"
+    # Both clocks are UTC, so the imported record is seconds, not the local UTC offset, away from the created one
+    default = datetime.fromisoformat(created["created_at"])
+    for record in (imported, item):
+        for column in ("created_at", "updated_at"):
+            assert abs((datetime.fromisoformat(record[column]) - default).total_seconds()) < 60
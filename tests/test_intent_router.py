@@ -0,0 +1,15 @@
+"""The intent fast path against the labelled corpus the benchmark uses."""
+import pytest
+
+from benchmarks.intent_router import check_corpus, load_corpus
+from intent_router import parse_intent
+
+CORPUS = load_corpus()
+
+@pytest.mark.parametrize("example", [example for example in CORPUS if example["intent"] is None], ids=lambda example: example["text"])
+def test_utterances_for_the_model_never_become_tool_calls(example):
+    # Every fast path intent but show changes the list, so any match here would be a mutation nobody asked for
+    assert parse_intent(example["text"]) is None
+
+def test_corpus_is_parsed_as_labelled():
+    assert check_corpus(CORPUS)["mismatches"] == []
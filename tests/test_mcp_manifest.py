@@ -0,0 +1,25 @@
+"""CachedFastApiMCP serves the same MCP server as FastApiMCP, whether it generated its manifest or loaded it."""
+from fastapi_mcp import FastApiMCP
+
+from server.mcp_manifest import CachedFastApiMCP
+
+EXCLUDE_OPERATIONS = ["export_shopping_lists", "import_shopping_lists", "stream_shopping_list_events"]
+
+def _served(mcp) -> tuple:
+    return (
+        [tool.model_dump(mode="json") for tool in mcp.tools],
+        mcp.operation_map,
+        sorted(handler.__name__ for handler in mcp.server.request_handlers),
+        (mcp.server.name, mcp.server.instructions),
+    )
+
+def test_cached_manifest_matches_a_freshly_generated_one(app, tmp_path):
+    manifest_path = str(tmp_path / "mcp_manifest.json")
+    fresh = FastApiMCP(app, exclude_operations=EXCLUDE_OPERATIONS)
+    generated = CachedFastApiMCP(app, exclude_operations=EXCLUDE_OPERATIONS, manifest_path=manifest_path)
+    loaded = CachedFastApiMCP(app, exclude_operations=EXCLUDE_OPERATIONS, manifest_path=manifest_path)
+
+    assert loaded._load_manifest(loaded._manifest_key()) is not None
+    assert fresh.tools
+    assert _served(generated) == _served(fresh)
+    assert _served(loaded) == _served(fresh)
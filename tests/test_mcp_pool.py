@@ -0,0 +1,34 @@
+"""Tool catalog caching of MCPSessionPool, over the memory transport."""
+import asyncio
+
+import pytest
+from mcp import McpError, types
+from mcp.server import Server
+
+from mcp_pool import MCPSessionPool
+
+def _flaky_server(failures: int) -> Server:
+    """A server whose first failures tools/list requests fail."""
+    server = Server("flaky")
+    attempts = []
+
+    @server.list_tools()
+    async def list_tools():
+        attempts.append(None)
+        if len(attempts) <= failures:
+            raise RuntimeError("catalog unavailable")
+        return [types.Tool(name="get_shopping_lists", description="Get all shopping lists.", inputSchema={"type": "object"})]
+
+    return server
+
+def test_failed_listing_is_retried_on_the_next_call():
+    async def run():
+        pool = MCPSessionPool(transport="memory", server=_flaky_server(failures=1), size=1)
+        try:
+            with pytest.raises(McpError):
+                await pool.start()
+            return [tool.name for tool in await pool.get_tools()], pool.catalog_version
+        finally:
+            await pool.close()
+
+    assert asyncio.run(run()) == (["get_shopping_lists"], 1)
@@ -0,0 +1,101 @@
+"""EXPLAIN QUERY PLAN of the statements the crud functions send for item access by list.
+
+Each case runs crud functions against a fresh SQLite file, capturing the statements they
+execute, and fails if SQLite would answer any of them by scanning shopping_items (or
+shopping_lists) instead of searching one of their indexes.
+"""
+import asyncio
+import re
+import sqlite3
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import event, insert
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from server import crud
+from server.models import Base, ShoppingItem, ShoppingList
+from server.schemas import ShoppingItemCreate
+
+# A full scan of either table, as opposed to "SCAN <table> USING [COVERING] INDEX ..." or a SEARCH
+TABLE_SCAN = re.compile(r"^SCAN (shopping_items|shopping_lists)( |$)(?!.*USING)")
+
+LISTS = 20
+ITEMS_PER_LIST = 50
+
+async def _by_list_item_reads(db):
+    await crud.get_shopping_items(db, shopping_list_id=3)
+    await crud.get_shopping_item_dicts(db, shopping_list_id=3, skip=10, limit=10)
+    await crud.get_shopping_list_dict(db, 3)
+
+async def _items_selectin(db):
+    shopping_list = await crud.get_shopping_list(db, 3)
+    assert len(shopping_list.items) == ITEMS_PER_LIST
+
+async def _count_aggregate(db):
+    await crud.get_shopping_list_counts(db, [1, 2, 3])
+
+async def _list_delete(db):
+    assert await crud.delete_shopping_list(db, 4)
+
+async def _touch_shopping_lists(db):
+    await crud.create_shopping_item(db, ShoppingItemCreate(name="Basil", shopping_list_id=5))
+    await crud.toggle_items_completion(db, [5 * ITEMS_PER_LIST, 5 * ITEMS_PER_LIST - 1])
+
+async def _search(db):
+    assert await crud.search_shopping_items(db, 6, "item 12")
+    await crud.search_shopping_items(db, 6, "it", is_completed=False)
+
+async def _search_long_list(db):
+    # Every list counts as long, so the full-text index narrows it down
+    with patch.object(crud, "SEARCH_SCAN_ITEMS", 0):
+        await _search(db)
+
+CASES = {
+    "by_list_item_reads": _by_list_item_reads,
+    "items_selectin": _items_selectin,
+    "count_aggregate": _count_aggregate,
+    "list_delete": _list_delete,
+    "touch_shopping_lists": _touch_shopping_lists,
+    "search": _search,
+    "search_long_list": _search_long_list,
+}
+
+async def _seed(engine) -> None:
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(insert(ShoppingList), [{"name": f"List {i}"} for i in range(LISTS)])
+        await conn.execute(insert(ShoppingItem), [
+            {"name": f"Item {i}", "notes": "fresh" if i % 2 else None, "is_completed": bool(i % 3), "shopping_list_id": list_id}
+            for list_id in range(1, LISTS + 1) for i in range(ITEMS_PER_LIST)
+        ])
+
+async def _capture(path: str, case) -> list:
+    """The (statement, parameters) crud sent to the database while running case, executemany batches left out."""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    await _seed(engine)
+    statements = []
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if not executemany:
+            statements.append((statement, parameters))
+
+    async with async_sessionmaker(engine, expire_on_commit=False)() as db:
+        await case(db)
+    await engine.dispose()
+    return statements
+
+def _table_scans(connection: sqlite3.Connection, statement: str, parameters) -> list:
+    plan = [row[3] for row in connection.execute(f"EXPLAIN QUERY PLAN {statement}", parameters)]
+    return [detail for detail in plan if TABLE_SCAN.match(detail)]
+
+@pytest.mark.parametrize("case", list(CASES))
+def test_item_access_paths_use_an_index(case, tmp_path):
+    path = str(tmp_path / "plans.db")
+    statements = [(statement, parameters) for statement, parameters in asyncio.run(_capture(path, CASES[case])) if "shopping_" in statement]
+    assert statements, f"{case} sent no statement to the shopping tables"
+    with sqlite3.connect(path) as connection:
+        for statement, parameters in statements:
+            scans = _table_scans(connection, statement, parameters)
+            assert not scans, f"{statement} plans {scans}"
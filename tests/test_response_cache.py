@@ -0,0 +1,101 @@
+"""No GET served from the response cache misses a write that came before it."""
+import pytest
+
+from server import crud, main
+from server.database import AsyncSessionLocal
+from server.schemas import ShoppingItemUpdate
+
+def _create_list(client) -> tuple:
+    """A list with two items, its ID and the items' IDs."""
+    shopping_list = client.post("/shopping-lists/", json={"name": "Groceries"}).json()
+    item_ids = [
+        client.post("/shopping-items/", json={"name": name, "shopping_list_id": shopping_list["id"]}).json()["id"]
+        for name in ("Milk", "Eggs")
+    ]
+    return shopping_list["id"], item_ids
+
+def _prime(client, shopping_list_id: int, item_id: int) -> None:
+    """Read the list and item twice, the second time from the cache."""
+    for path in (f"/shopping-lists/{shopping_list_id}", f"/shopping-items/{item_id}"):
+        hits = client.get("/cache/stats").json()["hits"]
+        assert client.get(path).status_code == 200
+        assert client.get(path).status_code == 200
+        assert client.get("/cache/stats").json()["hits"] == hits + 1
+
+def _item_names(client, shopping_list_id: int) -> list:
+    return [item["name"] for item in client.get(f"/shopping-lists/{shopping_list_id}").json()["items"]]
+
+def _list_item(client, shopping_list_id: int, item_id: int) -> dict:
+    return next(item for item in client.get(f"/shopping-lists/{shopping_list_id}").json()["items"] if item["id"] == item_id)
+
+def _create_item(client, shopping_list_id, item_id):
+    client.post("/shopping-items/", json={"name": "Basil", "shopping_list_id": shopping_list_id}).raise_for_status()
+    assert "Basil" in _item_names(client, shopping_list_id)
+
+def _update_item(client, shopping_list_id, item_id):
+    client.put(f"/shopping-items/{item_id}", json={"name": "Oat milk"}).raise_for_status()
+    assert client.get(f"/shopping-items/{item_id}").json()["name"] == "Oat milk"
+    assert _list_item(client, shopping_list_id, item_id)["name"] == "Oat milk"
+
+def _toggle_item(client, shopping_list_id, item_id):
+    client.patch(f"/shopping-items/{item_id}/toggle").raise_for_status()
+    assert client.get(f"/shopping-items/{item_id}").json()["is_completed"] is True
+    assert _list_item(client, shopping_list_id, item_id)["is_completed"] is True
+
+def _delete_item(client, shopping_list_id, item_id):
+    client.delete(f"/shopping-items/{item_id}").raise_for_status()
+    assert client.get(f"/shopping-items/{item_id}").status_code == 404
+    assert "Milk" not in _item_names(client, shopping_list_id)
+
+def _bulk_create(client, shopping_list_id, item_id):
+    items = [{"name": name, "shopping_list_id": shopping_list_id} for name in ("Basil", "Garlic")]
+    client.post("/shopping-items/bulk", json={"items": items}).raise_for_status()
+    assert {"Basil", "Garlic"} <= set(_item_names(client, shopping_list_id))
+
+def _bulk_update(client, shopping_list_id, item_id):
+    client.put("/shopping-items/bulk", json={"items": [{"id": item_id, "quantity": 7}]}).raise_for_status()
+    assert client.get(f"/shopping-items/{item_id}").json()["quantity"] == 7
+    assert _list_item(client, shopping_list_id, item_id)["quantity"] == 7
+
+def _bulk_toggle(client, shopping_list_id, item_id):
+    client.patch("/shopping-items/bulk/toggle", json={"item_ids": [item_id]}).raise_for_status()
+    assert client.get(f"/shopping-items/{item_id}").json()["is_completed"] is True
+    assert _list_item(client, shopping_list_id, item_id)["is_completed"] is True
+
+def _bulk_delete(client, shopping_list_id, item_id):
+    client.post("/shopping-items/bulk/delete", json={"item_ids": [item_id]}).raise_for_status()
+    assert client.get(f"/shopping-items/{item_id}").status_code == 404
+    assert "Milk" not in _item_names(client, shopping_list_id)
+
+def _update_list(client, shopping_list_id, item_id):
+    client.put(f"/shopping-lists/{shopping_list_id}", json={"name": "Weekend"}).raise_for_status()
+    assert client.get(f"/shopping-lists/{shopping_list_id}").json()["name"] == "Weekend"
+
+def _delete_list(client, shopping_list_id, item_id):
+    client.delete(f"/shopping-lists/{shopping_list_id}").raise_for_status()
+    assert client.get(f"/shopping-lists/{shopping_list_id}").status_code == 404
+    assert client.get(f"/shopping-items/{item_id}").status_code == 404
+
+WRITES = [_create_item, _update_item, _toggle_item, _delete_item, _bulk_create, _bulk_update, _bulk_toggle, _bulk_delete, _update_list, _delete_list]
+
+@pytest.mark.parametrize("write", WRITES, ids=[write.__name__.lstrip("_") for write in WRITES])
+def test_write_invalidates_cached_reads(client, write):
+    shopping_list_id, (item_id, _) = _create_list(client)
+    _prime(client, shopping_list_id, item_id)
+    write(client, shopping_list_id, item_id)
+
+def test_read_overlapping_a_write_is_not_cached(client, monkeypatch):
+    shopping_list_id, (item_id, _) = _create_list(client)
+    read_item = main.get_shopping_item
+
+    async def read_then_write(db, item_id):
+        # The item is read, then renamed by another request before this one caches what it read
+        db_item = await read_item(db, item_id=item_id)
+        async with AsyncSessionLocal() as write_db:
+            await crud.update_shopping_item(write_db, item_id, ShoppingItemUpdate(name="Oat milk"))
+        return db_item
+
+    monkeypatch.setattr(main, "get_shopping_item", read_then_write)
+    assert client.get(f"/shopping-items/{item_id}").json()["name"] == "Milk"
+    monkeypatch.undo()
+    assert client.get(f"/shopping-items/{item_id}").json()["name"] == "Oat milk"
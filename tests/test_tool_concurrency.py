@@ -0,0 +1,38 @@
+"""The tool concurrency cap applies per conversation, not across conversations."""
+import asyncio
+
+from langchain_core.messages import AIMessage
+from langchain_core.tools import tool
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.config import get_config
+
+from benchmarks.fake_llm import ScriptedChatModel
+from chatbot import create_agent
+
+def test_one_conversation_does_not_hold_up_another():
+    running, peaks = {}, {"all": 0}
+
+    @tool
+    async def get_shopping_item(item_id: int) -> str:
+        """Get a specific shopping item."""
+        thread_id = get_config()["configurable"]["thread_id"]
+        running[thread_id] = running.get(thread_id, 0) + 1
+        peaks[thread_id] = max(peaks.get(thread_id, 0), running[thread_id])
+        peaks["all"] = max(peaks["all"], sum(running.values()))
+        await asyncio.sleep(0.05)
+        running[thread_id] -= 1
+        return "{}"
+
+    calls = AIMessage(content="", tool_calls=[{"name": "get_shopping_item", "args": {"item_id": i}, "id": f"call_{i}"} for i in range(3)])
+    # Both turns start together, so each gets the tool calls first and the answer once their results are in
+    llm = ScriptedChatModel(script=[calls, calls, AIMessage(content="Done."), AIMessage(content="Done.")], first_token_delay=0.01, token_delay=0)
+    agent = create_agent(llm, [get_shopping_item], InMemorySaver(), policy="none", fast_path=False, tool_concurrency=2)
+
+    async def run():
+        await asyncio.gather(*(
+            agent.ainvoke({"messages": [{"role": "user", "content": "Look up my items"}]}, {"configurable": {"thread_id": thread_id}})
+            for thread_id in ("a", "b")
+        ))
+
+    asyncio.run(run())
+    assert peaks == {"all": 4, "a": 2, "b": 2}